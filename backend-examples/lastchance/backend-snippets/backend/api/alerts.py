@@ -9,6 +9,7 @@ from models.alert import (Alert, AlertChannel, AlertHistory, AlertStatus,
 from models.user import User
 from schemas.alerts import (AlertCreate, AlertHistoryResponse, AlertResponse,
                             AlertSummaryResponse, AlertUpdate)
+from services.alert_engine import alert_engine
 from services.alert_service import alert_service
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -33,6 +34,7 @@ async def create_alert(
             message=alert_data.message,
             expires_at=alert_data.expires_at,
         )
+        await alert_engine.announce(alert)
 
         return AlertResponse.from_orm(alert)
 
@@ -101,6 +103,8 @@ async def update_alert(
         if not alert:
             raise HTTPException(status_code=404, detail="Alert not found")
 
+        await alert_engine.announce(alert)
+
         return AlertResponse.from_orm(alert)
 
     except HTTPException:
@@ -122,6 +126,8 @@ async def delete_alert(
         if not success:
             raise HTTPException(status_code=404, detail="Alert not found")
 
+        await alert_engine.announce_removal(alert_id)
+
         return {"message": "Alert deleted successfully"}
 
     except HTTPException:
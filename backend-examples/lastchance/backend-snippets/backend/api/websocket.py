@@ -15,10 +15,23 @@ router = APIRouter(prefix="/api/v1", tags=["WebSocket"])
 logger = logging.getLogger(__name__)
 
 
+@router.on_event("startup")
+async def start_websocket_monitoring():
+    """Start leader election, the alert engine and the update monitors."""
+    await connection_manager.start_monitoring()
+
+
+@router.on_event("shutdown")
+async def stop_websocket_monitoring():
+    """Stop the update monitors."""
+    await connection_manager.stop_monitoring()
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket, token: str = None):
     """WebSocket endpoint for real-time updates."""
     user_id = None
+    connection_id = None
 
     try:
         # Authenticate user
@@ -35,17 +48,19 @@ async def websocket_endpoint(websocket: WebSocket, token: str = None):
             await websocket.close(code=1008, reason="Invalid token")
             return
 
-        # Connect user
-        await connection_manager.connect(websocket, user_id)
+        # Connect user; each socket is a separate session of that user
+        connection_id = await connection_manager.connect(websocket, user_id)
 
-        # Send welcome message
-        await websocket.send_text(
+        # Send welcome message (queued behind the connection's writer task)
+        await connection_manager.send_to_connection(
             {
                 "type": "welcome",
                 "message": "Connected to Bolt AI Crypto WebSocket",
                 "user_id": user_id,
+                "connection_id": connection_id,
                 "available_channels": list(connection_manager.channels.keys()),
-            }
+            },
+            connection_id,
         )
 
         # Handle messages
@@ -53,25 +68,33 @@ async def websocket_endpoint(websocket: WebSocket, token: str = None):
             try:
                 data = await websocket.receive_text()
                 message = json.loads(data)
-                await connection_manager.handle_message(user_id, message)
+                await connection_manager.handle_message(connection_id, message)
 
             except WebSocketDisconnect:
                 break
             except json.JSONDecodeError:
-                await websocket.send_text(
-                    {"type": "error", "message": "Invalid JSON format"}
+                await connection_manager.send_to_connection(
+                    {"type": "error", "message": "Invalid JSON format"},
+                    connection_id,
                 )
             except Exception as e:
-                logger.error(f"WebSocket error for user {user_id}: {e}")
-                await websocket.send_text(
-                    {"type": "error", "message": "Internal server error"}
+                logger.error(f"WebSocket error for connection {connection_id}: {e}")
+                await connection_manager.send_to_connection(
+                    {"type": "error", "message": "Internal server error"},
+                    connection_id,
                 )
 
     except Exception as e:
         logger.error(f"WebSocket connection error: {e}")
     finally:
-        if user_id:
-            connection_manager.disconnect(user_id)
+        if connection_id:
+            connection_manager.disconnect(connection_id)
+
+
+@router.get("/ws/stats")
+async def websocket_stats():
+    """Get WebSocket delivery counters (dropped, conflated, slow consumers)."""
+    return connection_manager.get_stats()
 
 
 @router.get("/ws/info")
@@ -87,10 +110,23 @@ async def websocket_info():
             "alerts",
             "portfolio",
         ],
-        "message_types": ["subscribe", "unsubscribe", "request_data", "ping"],
+        "topics": "channel:symbol[:timeframe], e.g. market_data:BTC or signals:ETH:4h",
+        "market_data_protocol": {
+            "snapshot": "market_data_snapshot with the full state and seq",
+            "delta": "market_data_delta with changed fields, removed fields and seq",
+            "gap": "send resync for the topic when seq is not previous seq + 1",
+        },
+        "message_types": ["subscribe", "unsubscribe", "resync", "request_data", "ping"],
         "example_messages": {
-            "subscribe": {"type": "subscribe", "channel": "market_data"},
-            "unsubscribe": {"type": "unsubscribe", "channel": "market_data"},
+            "subscribe": {"type": "subscribe", "topic": "market_data:BTC"},
+            "subscribe_channel": {
+                "type": "subscribe",
+                "channel": "predictions",
+                "symbol": "ETH",
+                "timeframe": "4h",
+            },
+            "unsubscribe": {"type": "unsubscribe", "topic": "market_data:BTC"},
+            "resync": {"type": "resync", "topic": "market_data:BTC"},
             "request_data": {
                 "type": "request_data",
                 "channel": "predictions",
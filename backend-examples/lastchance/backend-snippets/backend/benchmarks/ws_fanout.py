@@ -0,0 +1,383 @@
+"""
+WebSocket fan-out benchmark for ``ConnectionManager``.
+
+Starts the ``/api/v1/ws`` endpoint in-process with uvicorn, opens many
+simulated clients with a configurable subscription mix and pushes synthetic
+market updates through the manager's delta encoding and broadcast path:
+
+    python -m benchmarks.ws_fanout --clients 2000 --symbols 50 --topics 5
+
+The benchmark stands in for the market data monitor; the other monitors and
+the alert engine are not started. Updates travel over the configured message
+bus, so set ``MESSAGE_BUS_BACKEND=memory`` to leave Redis out of the numbers.
+
+Reports delivery latency percentiles, throughput, memory per connection and
+event-loop lag. Clients share the server's process and event loop, so the
+absolute numbers are pessimistic; compare runs with each other (``--json``)
+to size deployments and to catch fan-out regressions. Opening thousands of
+sockets needs a matching ``ulimit -n``.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import aiohttp
+import uvicorn
+from api.websocket import router
+from fastapi import FastAPI
+from jose import jwt
+from websocket.manager import connection_manager
+
+from config import settings
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+MARKET_MESSAGES = ("market_data_snapshot", "market_data_delta")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def make_token(user_id: int) -> str:
+    """Access token accepted by the WebSocket endpoint."""
+    payload = {"sub": str(user_id), "exp": datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+class SyntheticMarket:
+    """Random-walk tickers shaped like ``MarketService.get_market_data`` items."""
+
+    def __init__(self, symbols: List[str], seed: int = 0):
+        self.random = random.Random(seed)
+        self.prices = {symbol: self.random.uniform(1, 50000) for symbol in symbols}
+        self.volumes = {symbol: self.random.uniform(1e6, 1e9) for symbol in symbols}
+
+    def tick(self, symbol: str) -> Dict:
+        price = self.prices[symbol] * (1 + self.random.gauss(0, 0.001))
+        self.prices[symbol] = price
+        self.volumes[symbol] *= 1 + abs(self.random.gauss(0, 0.0005))
+        return {
+            "id": symbol.lower(),
+            "symbol": symbol,
+            "name": symbol,
+            "price": price,
+            "change_24h": price * 0.01,
+            "change_percent_24h": 1.0,
+            "volume_24h": self.volumes[symbol],
+            "market_cap": price * 1e7,
+            "high_24h": price * 1.02,
+            "low_24h": price * 0.98,
+            "timestamp": int(time.time() * 1000),
+        }
+
+
+class FanoutBenchmark:
+    """Drives one benchmark run and collects its measurements."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.symbols = [f"S{i:03d}" for i in range(args.symbols)]
+        # Zipf-like popularity: symbol i is watched with weight 1 / (i + 1)^skew
+        self.weights = [1 / (i + 1) ** args.skew for i in range(args.symbols)]
+        self.market = SyntheticMarket(self.symbols, args.seed)
+
+        self.latencies: List[float] = []
+        self.loop_lag: List[float] = []
+        self.received = 0
+        self.expected = 0
+        self.published = 0
+        self.sequence_gaps = 0
+        self.failed_connections = 0
+        self.measuring = False
+
+    def subscription_mix(self) -> List[str]:
+        """Distinct market data topics for one client."""
+        count = min(self.args.topics, len(self.symbols))
+        chosen: List[str] = []
+        while len(chosen) < count:
+            symbol = self.random.choices(self.symbols, self.weights)[0]
+            if symbol not in chosen:
+                chosen.append(symbol)
+        return [f"market_data:{symbol}" for symbol in chosen]
+
+    async def run_client(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        user_id: int,
+        topics: List[str],
+        ready: asyncio.Event,
+    ):
+        try:
+            ws = await session.ws_connect(
+                url, params={"token": make_token(user_id)}, max_msg_size=0
+            )
+        except Exception as e:
+            logger.debug(f"Client {user_id} failed to connect: {e}")
+            self.failed_connections += 1
+            ready.set()
+            return
+
+        for topic in topics:
+            await ws.send_json({"type": "subscribe", "topic": topic})
+
+        pending = len(topics)
+        sequences: Dict[str, int] = {}
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                message = json.loads(msg.data)
+                message_type = message.get("type")
+
+                if message_type == "subscription":
+                    pending -= 1
+                    if pending == 0:
+                        ready.set()
+                    continue
+                if message_type not in MARKET_MESSAGES:
+                    continue
+
+                topic = message["topic"]
+                if message_type == "market_data_delta":
+                    if message["seq"] != sequences.get(topic, 0) + 1:
+                        self.sequence_gaps += 1
+                sequences[topic] = message["seq"]
+
+                if self.measuring:
+                    sent_at = datetime.fromisoformat(message["timestamp"])
+                    latency = (datetime.utcnow() - sent_at).total_seconds()
+                    self.latencies.append(latency)
+                    self.received += 1
+        finally:
+            ready.set()
+            await ws.close()
+
+    async def connect_clients(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> List[asyncio.Task]:
+        """Open every client, a limited number at a time."""
+        tasks = []
+        for start in range(0, self.args.clients, self.args.connect_batch):
+            batch = []
+            end = min(start + self.args.connect_batch, self.args.clients)
+            for index in range(start, end):
+                ready = asyncio.Event()
+                user_id = index % self.args.users + 1
+                tasks.append(
+                    asyncio.create_task(
+                        self.run_client(
+                            session, url, user_id, self.subscription_mix(), ready
+                        )
+                    )
+                )
+                batch.append(ready.wait())
+            await asyncio.gather(*batch)
+        return tasks
+
+    async def measure_loop_lag(self, interval: float = 0.01):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            if self.measuring:
+                self.loop_lag.append(time.perf_counter() - started - interval)
+
+    async def drive_updates(self):
+        """Push one update per subscribed topic every ``--interval`` seconds."""
+        deadline = time.perf_counter() + self.args.duration
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            for topic in connection_manager.topics.topics("market_data"):
+                symbol = topic.split(":")[1]
+                self.expected += len(connection_manager.topics.subscribers(topic))
+                await connection_manager._broadcast_market_delta(
+                    topic, self.market.tick(symbol)
+                )
+                self.published += 1
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(max(self.args.interval - elapsed, 0))
+
+    async def run(self) -> Dict:
+        # Run only the delivery side of the manager; updates come from here.
+        # Marking it running also keeps the router's startup hook from
+        # starting the monitors and the alert engine.
+        connection_manager.is_running = True
+        app = FastAPI()
+        app.include_router(router)
+        server = uvicorn.Server(
+            uvicorn.Config(
+                app,
+                host="127.0.0.1",
+                port=self.args.port,
+                log_level="warning",
+                ws_per_message_deflate=not self.args.no_deflate,
+            )
+        )
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+        background = [
+            asyncio.create_task(connection_manager._coordinate()),
+            asyncio.create_task(connection_manager._consume_broadcasts()),
+            asyncio.create_task(self.measure_loop_lag()),
+        ]
+        url = f"ws://127.0.0.1:{self.args.port}/api/v1/ws"
+
+        gc.collect()
+        rss_before = rss_bytes()
+        connect_started = time.perf_counter()
+
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            clients = await self.connect_clients(session, url)
+            connect_time = time.perf_counter() - connect_started
+            gc.collect()
+            rss_connected = rss_bytes()
+
+            self.measuring = True
+            drive_started = time.perf_counter()
+            await self.drive_updates()
+            drive_time = time.perf_counter() - drive_started
+            await asyncio.sleep(self.args.drain)
+            self.measuring = False
+
+            stats = connection_manager.get_stats()
+            for task in clients:
+                task.cancel()
+            await asyncio.gather(*clients, return_exceptions=True)
+
+        await connection_manager.stop_monitoring()
+        for task in background:
+            task.cancel()
+        server.should_exit = True
+        await server_task
+
+        connected = self.args.clients - self.failed_connections
+        delivery_ratio = self.received / self.expected if self.expected else 0.0
+        return {
+            "clients": self.args.clients,
+            "connected": connected,
+            "users": self.args.users,
+            "topics": len(self.symbols),
+            "topics_per_client": self.args.topics,
+            "connect_seconds": round(connect_time, 3),
+            "updates_published": self.published,
+            "messages_expected": self.expected,
+            "messages_received": self.received,
+            "delivery_ratio": round(delivery_ratio, 4),
+            "throughput_msgs_per_sec": round(self.received / drive_time, 1),
+            "latency_ms": {
+                f"p{pct}": round(percentile(self.latencies, pct) * 1000, 2)
+                for pct in (50, 90, 99, 99.9)
+            },
+            "latency_max_ms": round(max(self.latencies, default=0) * 1000, 2),
+            "loop_lag_ms": {
+                "p50": round(percentile(self.loop_lag, 50) * 1000, 2),
+                "p99": round(percentile(self.loop_lag, 99) * 1000, 2),
+                "max": round(max(self.loop_lag, default=0) * 1000, 2),
+            },
+            # Includes the in-process client side, so it is an upper bound
+            "memory_per_connection_kb": round(
+                (rss_connected - rss_before) / max(connected, 1) / 1024, 1
+            ),
+            "sequence_gaps": self.sequence_gaps,
+            "manager": stats,
+        }
+
+
+def print_report(result: Dict):
+    print(
+        f"clients: {result['connected']}/{result['clients']} connected "
+        f"({result['users']} users) in {result['connect_seconds']}s"
+    )
+    print(
+        f"topics: {result['topics']} symbols, "
+        f"{result['topics_per_client']} per client"
+    )
+    print(
+        f"delivered: {result['messages_received']}/{result['messages_expected']} "
+        f"({result['delivery_ratio']:.2%}), "
+        f"{result['throughput_msgs_per_sec']} msg/s"
+    )
+    latency = ", ".join(f"{k} {v}" for k, v in result["latency_ms"].items())
+    print(f"latency ms: {latency}, max {result['latency_max_ms']}")
+    lag = ", ".join(f"{k} {v}" for k, v in result["loop_lag_ms"].items())
+    print(f"event-loop lag ms: {lag}")
+    print(f"memory per connection: {result['memory_per_connection_kb']} KiB")
+    print(f"sequence gaps: {result['sequence_gaps']}")
+    manager = result["manager"]
+    print(
+        f"manager: dropped {manager.get('dropped')}, "
+        f"conflated {manager.get('conflated')}, "
+        f"slow consumers {manager.get('slow_consumer_disconnects')}"
+    )
+
+
+async def _run(args: argparse.Namespace):
+    result = await FanoutBenchmark(args).run()
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument(
+        "--users", type=int, default=None, help="Distinct users (default: clients)"
+    )
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--topics", type=int, default=3, help="Topics per client")
+    parser.add_argument(
+        "--skew", type=float, default=1.0, help="Zipf exponent, 0 for uniform"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=settings.MARKET_STREAM_PUSH_INTERVAL,
+        help="Seconds between update rounds",
+    )
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--drain", type=float, default=2.0)
+    parser.add_argument("--connect-batch", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-deflate", action="store_true", help="Disable permessage-deflate"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+    args.users = args.users or args.clients
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_run(args))
@@ -33,6 +33,18 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_CACHE_TTL: int = 300
 
+    # Message bus for cross-component events: "redis" or "memory"
+    MESSAGE_BUS_BACKEND: str = "redis"
+
+    # WebSocket workers coordinate through the message bus
+    CLUSTER_LEASE_SECONDS: float = 15.0
+    CLUSTER_HEARTBEAT_SECONDS: float = 5.0
+
+    # Market data cache (stale-while-revalidate)
+    MARKET_CACHE_SWR_ENABLED: bool = True
+    MARKET_CACHE_MAX_STALENESS: int = 60
+    MARKET_LIVE_BAR_TTL: int = 10
+
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     JWT_SECRET: str = "dev-secret-key-change-in-production"
@@ -54,6 +66,20 @@ class Settings(BaseSettings):
     BINANCE_API_URL: str = "https://api.binance.com/api/v3"
     BINANCE_WS_URL: str = "wss://stream.binance.com:9443/ws"
 
+    # Exchange streams
+    MARKET_STREAM_ENABLED: bool = True
+    MARKET_STREAM_MAX_AGE: int = 10  # Seconds before streamed data is stale
+    MARKET_STREAM_MAX_BACKOFF: int = 60
+    MARKET_STREAM_PUSH_INTERVAL: float = 1.0
+
+    # Alert evaluation
+    ALERT_VOLUME_INTERVAL: str = "1h"  # Candle interval for volume_spike alerts
+
+    # WebSocket delivery
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_OVERFLOW_POLICY: str = "drop_oldest"  # drop_oldest, conflate, disconnect
+    WS_DELTA_SNAPSHOT_EVERY: int = 30  # Full market snapshot every N updates
+
     # Telegram Bot
     TELEGRAM_BOT_TOKEN: str = ""
     TELEGRAM_CHAT_ID: str = ""
@@ -0,0 +1,548 @@
+import asyncio
+import logging
+from datetime import datetime
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from models.alert import Alert, AlertStatus
+from services.message_bus import (ALERT_INDEX_CHANNEL, message_bus,
+                                  publish_alert_notification)
+from services.stream_service import MarketState, MarketStreamService
+from sqlalchemy import (Column, Float, Integer, MetaData, Table, func, insert,
+                        select, update)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+ABOVE = "above"
+BELOW = "below"
+VOLUME = "volume"
+
+# Holder name of the engine's market streams
+STREAM_HOLDER = "alerts"
+TICKER_STREAM = "ticker"
+KLINE_STREAM = "kline"
+
+# Reference prices of price_change alerts, one row per alert
+# (scripts/migrate/2026-10-19_add_alert_reference_prices.sql)
+alert_reference_prices = Table(
+    "alert_reference_prices",
+    MetaData(),
+    Column("alert_id", Integer, primary_key=True),
+    Column("reference_price", Float, nullable=False),
+)
+
+
+@dataclass
+class IndexedAlert:
+    """An active alert as stored in the threshold index."""
+
+    alert_id: int
+    user_id: int
+    symbol: str
+    alert_type: str
+    threshold: float
+    reference_price: Optional[float] = None
+
+
+class ThresholdBook:
+    """
+    Alerts of one symbol and side, kept sorted by trigger level.
+
+    Levels and alerts are parallel lists so that the alerts crossed by a
+    move are a contiguous slice found with two binary searches.
+    """
+
+    def __init__(self):
+        self.levels: List[float] = []
+        self.alerts: List[IndexedAlert] = []
+
+    def add(self, level: float, alert: IndexedAlert):
+        index = bisect_right(self.levels, level)
+        self.levels.insert(index, level)
+        self.alerts.insert(index, alert)
+
+    def remove(self, level: float, alert_id: int) -> bool:
+        index = bisect_left(self.levels, level)
+        while index < len(self.levels) and self.levels[index] == level:
+            if self.alerts[index].alert_id == alert_id:
+                del self.levels[index]
+                del self.alerts[index]
+                return True
+            index += 1
+        return False
+
+    def pop_at_or_below(self, value: float) -> List[IndexedAlert]:
+        """Remove and return alerts with level <= value."""
+        index = bisect_right(self.levels, value)
+        crossed = self.alerts[:index]
+        del self.levels[:index]
+        del self.alerts[:index]
+        return crossed
+
+    def pop_at_or_above(self, value: float) -> List[IndexedAlert]:
+        """Remove and return alerts with level >= value."""
+        index = bisect_left(self.levels, value)
+        crossed = self.alerts[index:]
+        del self.levels[index:]
+        del self.alerts[index:]
+        return crossed
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+
+class AlertEngine:
+    """
+    Evaluates price and volume alerts against market ticks.
+
+    Alerts are indexed per symbol in sorted threshold books:
+
+    - ``price_above`` triggers once price >= threshold
+    - ``price_below`` triggers once price <= threshold
+    - ``price_change`` (threshold in %) becomes one level above and one below
+      its reference price; whichever is crossed first triggers it
+    - ``volume_spike`` triggers once a closed candle's volume is at least
+      ``threshold`` times the average of the previous candles
+
+    Alerts that have already triggered are removed from the index, so a tick
+    only touches the slice of levels between the previous and the new price.
+    Triggered alerts are marked ``TRIGGERED`` in the database and then
+    published with ``publish_alert_notification``.
+
+    Every worker keeps the same index, fed by changes announced on the
+    message bus, but only the active (leader) worker holds market streams,
+    evaluates ticks, and stores and publishes triggers and the reference
+    prices of ``price_change`` alerts. While active, ticker and kline
+    streams are subscribed when a symbol gets its first alert and released
+    when its last alert is gone.
+    """
+
+    def __init__(self, volume_window: int = 20):
+        self.books: Dict[Tuple[str, str], ThresholdBook] = {}
+        self.index: Dict[int, List[Tuple[str, str, float]]] = {}
+        self.volume_window = volume_window
+        self.volume_history: Dict[str, Deque[float]] = {}
+        self.last_prices: Dict[str, float] = {}
+
+        # price_change alerts waiting for a first price to use as reference
+        self.pending: Dict[str, Dict[int, IndexedAlert]] = {}
+
+        # Whether this worker evaluates and publishes alerts; see set_active
+        self.is_active = False
+
+        # Set by start(); without them nothing is stored or streamed
+        self.session_factory: Optional[Callable[[], AsyncSession]] = None
+        self.stream: Optional[MarketStreamService] = None
+
+        # Streams held per symbol, and symbols whose streams need updating
+        self.watched: Dict[str, Set[str]] = {}
+        self._dirty_symbols: Set[str] = set()
+        self._stream_task: Optional[asyncio.Task] = None
+
+    def add_alert(
+        self,
+        alert_id: int,
+        user_id: int,
+        symbol: str,
+        alert_type: str,
+        threshold: float,
+        reference_price: Optional[float] = None,
+    ) -> bool:
+        """
+        Index an active alert (replacing any previous version of it).
+
+        A price_change alert without a reference price takes the last seen
+        price of its symbol, or waits for the next one. The reference price
+        it gets is stored with the alert.
+
+        Returns:
+            False if the alert type is not threshold based
+        """
+        self.remove_alert(alert_id)
+
+        symbol = symbol.upper()
+        resolved = False
+        if alert_type == "price_change" and reference_price is None:
+            reference_price = self.last_prices.get(symbol)
+            resolved = reference_price is not None
+
+        alert = IndexedAlert(
+            alert_id, user_id, symbol, alert_type, threshold, reference_price
+        )
+
+        if alert_type == "price_above":
+            entries = [(ABOVE, threshold)]
+        elif alert_type == "price_below":
+            entries = [(BELOW, threshold)]
+        elif alert_type == "price_change" and reference_price:
+            change = abs(threshold) / 100
+            entries = [
+                (ABOVE, reference_price * (1 + change)),
+                (BELOW, reference_price * (1 - change)),
+            ]
+        elif alert_type == "price_change":
+            self.pending.setdefault(symbol, {})[alert_id] = alert
+            self._streams_changed(symbol)
+            return True
+        elif alert_type == "volume_spike":
+            entries = [(VOLUME, threshold)]
+        else:
+            return False
+
+        for side, level in entries:
+            self.books.setdefault((symbol, side), ThresholdBook()).add(level, alert)
+        self.index[alert_id] = [(symbol, side, level) for side, level in entries]
+
+        self._streams_changed(symbol)
+        if resolved and self.is_active and self.session_factory is not None:
+            self._spawn(self._store_reference(alert))
+        return True
+
+    def set_active(self, active: bool):
+        """
+        Start or stop evaluating alerts, e.g. on gaining or losing leadership.
+
+        Streams are subscribed for every indexed symbol on activation and
+        released on deactivation. Prices and volumes seen so far are dropped
+        then, as they go stale while inactive.
+        """
+        if active == self.is_active:
+            return
+        self.is_active = active
+        if not active:
+            self.last_prices.clear()
+            self.volume_history.clear()
+
+        symbols = {symbol for symbol, _ in self.books} | set(self.pending)
+        for symbol in symbols | set(self.watched):
+            self._streams_changed(symbol)
+
+    def index_alert(
+        self, alert: Alert, reference_price: Optional[float] = None
+    ) -> bool:
+        """Index an alert model if it is active, otherwise unindex it."""
+        if alert.status != AlertStatus.ACTIVE:
+            self.remove_alert(alert.id)
+            return False
+
+        return self.add_alert(
+            alert.id,
+            alert.user_id,
+            alert.symbol,
+            getattr(alert.alert_type, "value", alert.alert_type),
+            alert.threshold_value,
+            reference_price,
+        )
+
+    async def announce(self, alert: Alert):
+        """
+        Share a created or updated alert with every worker's engine.
+
+        A price_change alert is announced without its reference price; the
+        active worker looks up the stored one and shares it. Failures are
+        logged only: the alert is already stored, and engines pick it up when
+        they reload the index after the bus reconnects.
+        """
+        await self._announce(
+            {
+                "alert_id": alert.id,
+                "user_id": alert.user_id,
+                "symbol": alert.symbol,
+                "alert_type": getattr(alert.alert_type, "value", alert.alert_type),
+                "threshold": alert.threshold_value,
+                "active": alert.status == AlertStatus.ACTIVE,
+            }
+        )
+
+    async def announce_removal(self, alert_id: int):
+        """Share a deleted alert with every worker's engine."""
+        await self._announce({"alert_id": alert_id, "active": False})
+
+    async def _announce(self, change: Dict):
+        try:
+            await message_bus.publish(ALERT_INDEX_CHANNEL, change)
+        except Exception as e:
+            logger.error(f"Error announcing change of alert {change['alert_id']}: {e}")
+
+    async def sync(self, session_factory: Callable[[], AsyncSession]):
+        """
+        Apply alert changes announced by any worker.
+
+        The subscription is retried with exponential backoff when the bus
+        fails. Changes announced while it was down are lost, so after every
+        reconnect the index is reloaded from the database.
+        """
+        backoff = 1.0
+        reconnecting = False
+        while True:
+            try:
+                if reconnecting:
+                    async with session_factory() as db:
+                        await self.load(db)
+                    logger.info("Alert index reloaded after bus reconnect")
+
+                async for change in message_bus.subscribe(ALERT_INDEX_CHANNEL):
+                    backoff = 1.0
+                    self._apply_change(change)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Alert index sync error: {e}")
+
+            reconnecting = True
+            logger.info(f"Alert index sync reconnecting in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, settings.MARKET_STREAM_MAX_BACKOFF)
+
+    def _apply_change(self, change: Dict):
+        if change["active"]:
+            self.add_alert(
+                change["alert_id"],
+                change["user_id"],
+                change["symbol"],
+                change["alert_type"],
+                change["threshold"],
+                change.get("reference_price"),
+            )
+        else:
+            self.remove_alert(change["alert_id"])
+
+    def remove_alert(self, alert_id: int):
+        """Remove an alert from every book it is indexed in."""
+        for symbol, pending in self.pending.items():
+            if pending.pop(alert_id, None) is not None:
+                self._streams_changed(symbol)
+
+        for symbol, side, level in self.index.pop(alert_id, []):
+            book = self.books.get((symbol, side))
+            if book is not None:
+                book.remove(level, alert_id)
+            self._streams_changed(symbol)
+
+    def on_price(self, symbol: str, price: float) -> List[IndexedAlert]:
+        """Return and unindex every alert crossed by the new price."""
+        self.last_prices[symbol] = price
+
+        for alert in self.pending.pop(symbol, {}).values():
+            self.add_alert(
+                alert.alert_id,
+                alert.user_id,
+                symbol,
+                alert.alert_type,
+                alert.threshold,
+            )
+
+        triggered = []
+        above = self.books.get((symbol, ABOVE))
+        if above:
+            triggered += above.pop_at_or_below(price)
+        below = self.books.get((symbol, BELOW))
+        if below:
+            triggered += below.pop_at_or_above(price)
+
+        return self._unindex(triggered)
+
+    def on_candle_volume(self, symbol: str, volume: float) -> List[IndexedAlert]:
+        """Return and unindex volume alerts spiked by a closed candle's volume."""
+        history = self.volume_history.setdefault(
+            symbol, deque(maxlen=self.volume_window)
+        )
+        average = sum(history) / len(history) if history else 0.0
+        history.append(volume)
+
+        book = self.books.get((symbol, VOLUME))
+        if not book or average <= 0:
+            return []
+        return self._unindex(book.pop_at_or_below(volume / average))
+
+    def _unindex(self, triggered: List[IndexedAlert]) -> List[IndexedAlert]:
+        # Drop the remaining level of two-sided alerts and any duplicates
+        unique = {}
+        for alert in triggered:
+            if alert.alert_id not in unique:
+                unique[alert.alert_id] = alert
+                self.remove_alert(alert.alert_id)
+        return list(unique.values())
+
+    async def load(self, db: AsyncSession):
+        """Replace the index with the active alerts stored in the database."""
+        references = alert_reference_prices
+        result = await db.execute(
+            select(Alert, references.c.reference_price)
+            .outerjoin(references, references.c.alert_id == Alert.id)
+            .where(Alert.status == AlertStatus.ACTIVE)
+        )
+        self.books.clear()
+        self.index.clear()
+        self.pending.clear()
+        for alert, reference_price in result.all():
+            self.index_alert(alert, reference_price)
+
+        # Release the streams of symbols that no longer have alerts
+        for symbol in list(self.watched):
+            self._streams_changed(symbol)
+
+    async def start(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        state: MarketState,
+        stream: MarketStreamService,
+    ):
+        """Index active alerts and evaluate them on the streams they need."""
+        self.session_factory = session_factory
+        self.stream = stream
+        async with session_factory() as db:
+            await self.load(db)
+
+        state.add_listener(self._on_ticker)
+        state.add_kline_listener(self._on_kline)
+
+    def _wanted_streams(self, symbol: str) -> Set[str]:
+        streams = set()
+        if not self.is_active:
+            return streams
+        if (
+            self.pending.get(symbol)
+            or self.books.get((symbol, ABOVE))
+            or self.books.get((symbol, BELOW))
+        ):
+            streams.add(TICKER_STREAM)
+        if self.books.get((symbol, VOLUME)):
+            streams.add(KLINE_STREAM)
+        return streams
+
+    def _streams_changed(self, symbol: str):
+        """Queue ``symbol`` for its streams to be matched to its alerts."""
+        if self.stream is None:
+            return
+        self._dirty_symbols.add(symbol)
+        if self._stream_task is None or self._stream_task.done():
+            self._stream_task = self._spawn(self._update_streams())
+
+    async def _update_streams(self):
+        # One task at a time, so subscribe and unsubscribe requests stay ordered
+        while self._dirty_symbols:
+            symbol = self._dirty_symbols.pop()
+            wanted = self._wanted_streams(symbol)
+            held = self.watched.get(symbol, set())
+            if wanted:
+                self.watched[symbol] = wanted
+            else:
+                self.watched.pop(symbol, None)
+
+            interval = settings.ALERT_VOLUME_INTERVAL
+            try:
+                if TICKER_STREAM in wanted - held:
+                    await self.stream.subscribe_tickers([symbol], STREAM_HOLDER)
+                elif TICKER_STREAM in held - wanted:
+                    await self.stream.unsubscribe_tickers([symbol], STREAM_HOLDER)
+                if KLINE_STREAM in wanted - held:
+                    await self.stream.subscribe_kline(symbol, interval, STREAM_HOLDER)
+                elif KLINE_STREAM in held - wanted:
+                    await self.stream.unsubscribe_kline(symbol, interval, STREAM_HOLDER)
+            except Exception as e:
+                logger.error(f"Error updating alert streams of {symbol}: {e}")
+
+    def _on_ticker(self, symbol: str, ticker: Dict):
+        # Streams held by other holders feed the same state
+        if not self.is_active:
+            return
+        self._publish(self.on_price(symbol, ticker["price"]), ticker["price"])
+
+    def _on_kline(self, symbol: str, interval: str, kline: Dict):
+        if not self.is_active:
+            return
+        if interval == settings.ALERT_VOLUME_INTERVAL and kline["closed"]:
+            self._publish(
+                self.on_candle_volume(symbol, kline["volume"]), kline["close"]
+            )
+
+    def _publish(self, triggered: List[IndexedAlert], price: float):
+        if not self.is_active or self.session_factory is None:
+            return
+
+        for alert in triggered:
+            self._spawn(self._trigger(alert, price))
+
+    async def _trigger(self, alert: IndexedAlert, price: float):
+        """Mark an alert triggered in the database, then notify its user."""
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    update(Alert)
+                    .where(
+                        Alert.id == alert.alert_id,
+                        Alert.status == AlertStatus.ACTIVE,
+                    )
+                    .values(
+                        status=AlertStatus.TRIGGERED,
+                        triggered_at=datetime.utcnow(),
+                        trigger_count=func.coalesce(Alert.trigger_count, 0) + 1,
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error storing trigger of alert {alert.alert_id}: {e}")
+            return
+
+        # Another worker, or the user, already changed the alert
+        if not result.rowcount:
+            return
+
+        await publish_alert_notification(
+            alert.user_id, alert.alert_id, {**asdict(alert), "price": price}
+        )
+
+    async def _store_reference(self, alert: IndexedAlert):
+        """
+        Store the reference price a price_change alert was indexed with.
+
+        An alert keeps the first reference price stored for it, so an updated
+        or reactivated alert takes its stored price instead.
+        """
+        references = alert_reference_prices
+        try:
+            async with self.session_factory() as db:
+                stored = await db.scalar(
+                    select(references.c.reference_price).where(
+                        references.c.alert_id == alert.alert_id
+                    )
+                )
+                if stored is None:
+                    await db.execute(
+                        insert(references).values(
+                            alert_id=alert.alert_id,
+                            reference_price=alert.reference_price,
+                        )
+                    )
+                    await db.commit()
+                    stored = alert.reference_price
+        except Exception as e:
+            logger.error(f"Error storing reference of alert {alert.alert_id}: {e}")
+            return
+
+        # Other workers may have picked a different price; share the stored one
+        await self._announce(
+            {**asdict(alert), "reference_price": stored, "active": True}
+        )
+
+    @staticmethod
+    def _spawn(coroutine) -> asyncio.Task:
+        return asyncio.get_running_loop().create_task(coroutine)
+
+    def get_stats(self) -> Dict:
+        return {
+            "indexed_alerts": len(self.index),
+            "books": len(self.books),
+            "levels": sum(len(book) for book in self.books.values()),
+        }
+
+
+# Global alert engine
+alert_engine = AlertEngine()
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from db.redis_client import redis_client
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+Fetcher = Callable[[], Awaitable[Any]]
+
+
+class StaleWhileRevalidateCache:
+    """
+    Redis-backed cache that serves stale entries while refreshing them.
+
+    Entries are stored as ``{"value": ..., "cached_at": <unix seconds>}`` so the
+    age of the data can be reported to clients. An entry younger than ``ttl``
+    is served as-is. An entry older than ``ttl`` but younger than
+    ``max_staleness`` is served immediately while a single background task per
+    key refreshes it. Anything older is treated as a miss and fetched inline.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.MARKET_CACHE_SWR_ENABLED,
+        max_staleness: int = settings.MARKET_CACHE_MAX_STALENESS,
+    ):
+        self.enabled = enabled
+        self.max_staleness = max_staleness
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get_or_fetch(
+        self, key: str, fetch: Fetcher, ttl: int
+    ) -> Tuple[Any, float]:
+        """
+        Get a cached value, fetching it when missing or too stale.
+
+        Args:
+            key: Redis cache key
+            fetch: Coroutine factory producing a fresh value
+            ttl: Seconds during which a cached value is considered fresh
+
+        Returns:
+            Tuple of (value, age in seconds)
+        """
+        entry = None
+        try:
+            entry = await redis_client.get(key)
+        except Exception:
+            pass  # Redis not available, continue without cache
+
+        if isinstance(entry, dict) and "cached_at" in entry:
+            age = max(time.time() - entry["cached_at"], 0.0)
+            if age < ttl:
+                return entry["value"], age
+            if self.enabled and age < max(self.max_staleness, ttl):
+                self._refresh_in_background(key, fetch, ttl)
+                return entry["value"], age
+
+        value = await self._refresh(key, fetch, ttl)
+        return value, 0.0
+
+    def _refresh_in_background(self, key: str, fetch: Fetcher, ttl: int):
+        """Start a refresh for ``key`` unless one is already running."""
+        if key in self._inflight:
+            return
+
+        task = asyncio.create_task(self._fetch_and_store(key, fetch, ttl))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        task.add_done_callback(self._log_failure)
+
+    async def _refresh(self, key: str, fetch: Fetcher, ttl: int) -> Any:
+        """Fetch inline, joining a refresh that is already in flight."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(key, fetch, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key: str, fetch: Fetcher, ttl: int) -> Any:
+        value = await fetch()
+
+        # Empty results mean the upstream call failed; keep the previous entry
+        if value:
+            try:
+                await redis_client.set(
+                    key,
+                    {"value": value, "cached_at": time.time()},
+                    expire=max(self.max_staleness, ttl),
+                )
+            except Exception:
+                pass  # Redis not available, continue without cache
+
+        return value
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background cache refresh failed: {task.exception()}")
+
+
+# Global cache for market endpoints
+market_cache = StaleWhileRevalidateCache()
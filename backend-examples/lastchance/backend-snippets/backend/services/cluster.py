@@ -0,0 +1,104 @@
+import json
+import logging
+import time
+import uuid
+from typing import List, Set
+
+from services.message_bus import RedisMessageBus, message_bus
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "ws:leader"
+INTEREST_KEY = "ws:interest"
+HEARTBEAT_KEY = "ws:heartbeat"
+
+# Extend the lease only if this worker still holds it
+RENEW_LEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class LocalCoordinator:
+    """Single-process coordination: this worker always leads."""
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.topics: Set[str] = set()
+
+    async def acquire_leadership(self) -> bool:
+        return True
+
+    async def publish_interest(self, topics: List[str]):
+        self.topics = set(topics)
+
+    async def interested_topics(self) -> Set[str]:
+        return set(self.topics)
+
+
+class RedisCoordinator:
+    """
+    Coordinates WebSocket workers through Redis.
+
+    One worker holds a lease on ``ws:leader`` and computes the market,
+    prediction and signal updates for every worker. Each worker regularly
+    reports the topics its sockets are subscribed to, so the leader knows
+    what to compute even for sockets it does not hold. Reports from workers
+    that stopped heartbeating are ignored and cleaned up.
+    """
+
+    def __init__(self, bus: RedisMessageBus):
+        self.redis = bus.redis
+        self.worker_id = uuid.uuid4().hex
+        self.lease_ms = int(settings.CLUSTER_LEASE_SECONDS * 1000)
+
+    async def acquire_leadership(self) -> bool:
+        """Take or renew the leader lease; returns True while leading."""
+        acquired = await self.redis.set(
+            LEADER_KEY, self.worker_id, nx=True, px=self.lease_ms
+        )
+        if acquired:
+            logger.info(f"Worker {self.worker_id} became WebSocket leader")
+            return True
+
+        renewed = await self.redis.eval(
+            RENEW_LEASE_SCRIPT, 1, LEADER_KEY, self.worker_id, self.lease_ms
+        )
+        return bool(renewed)
+
+    async def publish_interest(self, topics: List[str]):
+        """Report the topics subscribed to on this worker."""
+        pipe = self.redis.pipeline()
+        pipe.hset(INTEREST_KEY, self.worker_id, json.dumps(sorted(topics)))
+        pipe.hset(HEARTBEAT_KEY, self.worker_id, time.time())
+        await pipe.execute()
+
+    async def interested_topics(self) -> Set[str]:
+        """Union of the topics reported by every live worker."""
+        interest = await self.redis.hgetall(INTEREST_KEY)
+        heartbeats = await self.redis.hgetall(HEARTBEAT_KEY)
+
+        cutoff = time.time() - 3 * settings.CLUSTER_HEARTBEAT_SECONDS
+        topics: Set[str] = set()
+        for worker_id, reported in interest.items():
+            if float(heartbeats.get(worker_id, 0)) < cutoff:
+                await self.redis.hdel(INTEREST_KEY, worker_id)
+                await self.redis.hdel(HEARTBEAT_KEY, worker_id)
+                continue
+            topics.update(json.loads(reported))
+        return topics
+
+
+def create_coordinator():
+    """Coordinate through Redis when the message bus is shared."""
+    if isinstance(message_bus, RedisMessageBus):
+        return RedisCoordinator(message_bus)
+    return LocalCoordinator()
+
+
+# Global cluster coordinator
+coordinator = create_coordinator()
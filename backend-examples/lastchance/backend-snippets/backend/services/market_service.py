@@ -1,13 +1,42 @@
 import logging
+import time
 from typing import Dict, List, Optional
 
 import aiohttp
 import ccxt.async_support as ccxt
+from db.redis_client import redis_client
+from services.stream_service import market_state, market_stream
 
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+INTERVAL_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# Binance weekly candles open on Monday, four days after the Unix epoch
+WEEK_OFFSET_SECONDS = 4 * 86400
+
+
+def interval_to_seconds(interval: str) -> Optional[int]:
+    """Convert an interval such as '15m' or '4h' to seconds (None if unsupported)."""
+    unit = INTERVAL_UNITS.get(interval[-1:])
+    if unit is None or not interval[:-1].isdigit():
+        return None
+    return int(interval[:-1]) * unit
+
+
+def seconds_until_candle_close(
+    interval: str, now: Optional[float] = None
+) -> Optional[float]:
+    """Seconds until the currently open candle of ``interval`` closes."""
+    interval_seconds = interval_to_seconds(interval)
+    if interval_seconds is None:
+        return None
+
+    now = time.time() if now is None else now
+    offset = WEEK_OFFSET_SECONDS if interval.endswith("w") else 0
+    return interval_seconds - ((now - offset) % interval_seconds)
+
 
 class MarketService:
     def __init__(self):
@@ -28,14 +57,24 @@ class MarketService:
             {"id": "chainlink", "symbol": "LINK", "name": "Chainlink"},
         ]
 
+        # Streams carry no market cap, so the last REST value is kept
+        self.market_caps: Dict[str, float] = {}
+
     async def get_market_data(self, symbols: Optional[List[str]] = None) -> List[Dict]:
-        """Get market data from CoinGecko."""
+        """Get market data from the exchange stream, or CoinGecko as a fallback."""
         try:
-            coin_ids = [coin["id"] for coin in self.coins]
+            coins = self.coins
             if symbols:
-                coin_ids = [
-                    coin["id"] for coin in self.coins if coin["symbol"] in symbols
-                ]
+                coins = [coin for coin in self.coins if coin["symbol"] in symbols]
+            coin_ids = [coin["id"] for coin in coins]
+
+            if settings.MARKET_STREAM_ENABLED:
+                await market_stream.subscribe_tickers(
+                    [coin["symbol"] for coin in coins]
+                )
+                streamed = self._get_streamed_market_data(coins)
+                if streamed is not None:
+                    return streamed
 
             async with aiohttp.ClientSession() as session:
                 url = f"{self.coingecko_url}/coins/markets"
@@ -52,6 +91,10 @@ class MarketService:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
+                        for coin in data:
+                            self.market_caps[coin["symbol"].upper()] = coin.get(
+                                "market_cap", 0
+                            )
                         return [
                             {
                                 "id": coin["id"],
@@ -81,18 +124,55 @@ class MarketService:
             logger.error(f"Error fetching market data: {e}")
             return []
 
+    def _get_streamed_market_data(self, coins: List[Dict]) -> Optional[List[Dict]]:
+        """Build market data from streamed tickers (None unless all are fresh)."""
+        tickers = [
+            market_state.get_ticker(coin["symbol"], settings.MARKET_STREAM_MAX_AGE)
+            for coin in coins
+        ]
+        if not coins or any(ticker is None for ticker in tickers):
+            return None
+
+        return [
+            {
+                "id": coin["id"],
+                "symbol": coin["symbol"],
+                "name": coin["name"],
+                "price": ticker["price"],
+                "change_24h": ticker["change_24h"],
+                "change_percent_24h": ticker["change_percent_24h"],
+                "volume_24h": ticker["volume_24h"],
+                "market_cap": self.market_caps.get(coin["symbol"], 0),
+                "high_24h": ticker["high_24h"],
+                "low_24h": ticker["low_24h"],
+                "timestamp": ticker["timestamp"],
+            }
+            for coin, ticker in zip(coins, tickers)
+        ]
+
     async def get_candlestick_data(
         self, symbol: str, interval: str = "1h", limit: int = 100
     ) -> List[Dict]:
-        """Get candlestick data from Binance."""
+        """
+        Get candlestick data from Binance.
+
+        Closed candles never change, so they are cached until the next candle
+        close for the interval. On subsequent calls the live candle comes from
+        the exchange stream, or the last closed and live candles are fetched.
+        """
         try:
             # Map symbol to Binance format
             binance_symbol = f"{symbol}USDT"
 
             # Fetch OHLCV data
-            ohlcv = await self.exchange.fetch_ohlcv(
-                binance_symbol, timeframe=interval, limit=limit
-            )
+            if interval_to_seconds(interval) is None:
+                ohlcv = await self.exchange.fetch_ohlcv(
+                    binance_symbol, timeframe=interval, limit=limit
+                )
+            else:
+                ohlcv = await self._get_ohlcv_with_closed_cache(
+                    symbol, interval, limit
+                )
 
             return [
                 {
@@ -109,6 +189,75 @@ class MarketService:
             logger.error(f"Error fetching candlestick data for {symbol}: {e}")
             return []
 
+    async def _get_ohlcv_with_closed_cache(
+        self, symbol: str, interval: str, limit: int
+    ) -> List[List]:
+        """Merge cached closed candles with the current live bar."""
+        binance_symbol = f"{symbol}USDT"
+        cache_key = f"market:ohlcv:closed:{binance_symbol}:{interval}"
+        interval_ms = interval_to_seconds(interval) * 1000
+
+        closed = None
+        try:
+            closed = await redis_client.get(cache_key)
+        except Exception:
+            pass  # Redis not available, continue without cache
+
+        if closed and len(closed) >= limit - 1:
+            recent = await self._get_streamed_live_bar(
+                symbol, interval, closed[-1][0] + interval_ms
+            )
+            if recent is None:
+                # The last closed candle is refetched too, in case it was revised
+                recent = await self.exchange.fetch_ohlcv(
+                    binance_symbol, timeframe=interval, limit=2
+                )
+        else:
+            recent = await self.exchange.fetch_ohlcv(
+                binance_symbol, timeframe=interval, limit=limit
+            )
+            now_ms = time.time() * 1000
+            closed = [c for c in recent if c[0] + interval_ms <= now_ms]
+
+            # Cache closed history until the live candle closes
+            try:
+                await redis_client.set(
+                    cache_key,
+                    closed,
+                    expire=int(seconds_until_candle_close(interval)) + 1,
+                )
+            except Exception:
+                pass  # Redis not available, continue without cache
+
+        candles = {candle[0]: candle for candle in closed}
+        candles.update({candle[0]: candle for candle in recent})
+        return [candles[t] for t in sorted(candles)][-limit:]
+
+    async def _get_streamed_live_bar(
+        self, symbol: str, interval: str, open_time: int
+    ) -> Optional[List[List]]:
+        """Live candle opened at ``open_time`` from the kline stream, if fresh."""
+        if not settings.MARKET_STREAM_ENABLED:
+            return None
+
+        await market_stream.subscribe_kline(symbol, interval)
+        kline = market_state.get_kline(
+            symbol, interval, settings.MARKET_STREAM_MAX_AGE
+        )
+        if kline is None or kline["time"] != open_time or kline["closed"]:
+            return None
+
+        return [
+            [
+                kline["time"],
+                kline["open"],
+                kline["high"],
+                kline["low"],
+                kline["close"],
+                kline["volume"],
+            ]
+        ]
+
     async def get_technical_indicators(self, symbol: str, interval: str = "1h") -> Dict:
         """Calculate technical indicators from candlestick data."""
         try:
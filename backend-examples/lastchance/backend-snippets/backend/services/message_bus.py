@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, List
+
+from config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# Channel carrying triggered alert notifications for WebSocket delivery
+ALERT_NOTIFICATIONS_CHANNEL = "alerts:notifications"
+
+# Channel carrying alert index changes to every worker's alert engine
+ALERT_INDEX_CHANNEL = "alerts:index"
+
+# Channel carrying topic updates from the leader to every worker
+WS_BROADCAST_CHANNEL = "ws:broadcast"
+
+# Keys alert_service still writes notifications to, before the bus existed
+LEGACY_NOTIFICATION_PATTERN = "ws_notification:*"
+
+
+class InMemoryMessageBus:
+    """Process-local pub/sub, for single-process setups and tests."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    async def publish(self, channel: str, message: dict):
+        for queue in self._subscribers.get(channel, []):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, []).append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].remove(queue)
+
+
+class RedisMessageBus:
+    """Pub/sub over Redis channels, shared by every worker process."""
+
+    def __init__(self, url: str = settings.REDIS_URL):
+        self.redis = aioredis.from_url(url, decode_responses=True)
+
+    async def publish(self, channel: str, message: dict):
+        await self.redis.publish(channel, json.dumps(message, default=str))
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for raw in pubsub.listen():
+                if raw["type"] == "message":
+                    yield json.loads(raw["data"])
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.close()
+
+
+def create_message_bus():
+    """Create the bus selected by ``settings.MESSAGE_BUS_BACKEND``."""
+    if settings.MESSAGE_BUS_BACKEND == "redis":
+        if aioredis is not None:
+            return RedisMessageBus()
+        logger.warning("redis package not installed, using in-memory message bus")
+    return InMemoryMessageBus()
+
+
+async def publish_alert_notification(user_id: int, alert_id: int, notification: dict):
+    """Push a triggered alert to the user's WebSocket connections."""
+    await message_bus.publish(
+        ALERT_NOTIFICATIONS_CHANNEL,
+        {"user_id": user_id, "alert_id": alert_id, "data": notification},
+    )
+
+
+async def drain_legacy_notifications(redis) -> int:
+    """
+    Publish the notifications stored under ``ws_notification:{user_id}:{alert_id}``
+    keys on the alert notification channel, deleting each key.
+
+    Keys are read and deleted atomically, so a notification is published
+    once even if two workers drain at the same time.
+
+    Returns:
+        Number of notifications published
+    """
+    published = 0
+    async for key in redis.scan_iter(match=LEGACY_NOTIFICATION_PATTERN):
+        raw = await redis.getdel(key)
+        if raw is None:
+            continue
+
+        try:
+            _, user_id, alert_id = key.split(":")
+            user_id, alert_id = int(user_id), int(alert_id)
+        except ValueError:
+            logger.warning(f"Skipping malformed notification key {key}")
+            continue
+
+        try:
+            notification = json.loads(raw)
+        except ValueError:
+            notification = raw
+        await publish_alert_notification(user_id, alert_id, notification)
+        published += 1
+
+    return published
+
+
+# Global message bus
+message_bus = create_message_bus()
@@ -0,0 +1,141 @@
+"""
+Local replay server for exchange stream events.
+
+Serves recorded Binance stream events over a WebSocket that speaks the same
+SUBSCRIBE protocol as ``wss://stream.binance.com:9443/ws``. Point
+``BINANCE_WS_URL`` at it to exercise ``MarketStreamService`` in tests or
+local development without the exchange:
+
+    python -m services.stream_replay events.jsonl --port 9443
+    BINANCE_WS_URL=ws://localhost:9443/ws
+
+The recording is a JSON-lines file with one raw stream event per line.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Set
+
+from aiohttp import WSCloseCode, WSMsgType, web
+
+logger = logging.getLogger(__name__)
+
+
+def stream_name(event: Dict) -> Optional[str]:
+    """Name of the stream an event belongs to (e.g. ``btcusdt@ticker``)."""
+    pair = event.get("s", "").lower()
+    event_type = event.get("e")
+    if event_type == "24hrTicker":
+        return f"{pair}@ticker"
+    if event_type in ("trade", "aggTrade"):
+        return f"{pair}@{event_type}"
+    if event_type == "kline":
+        return f"{pair}@kline_{event['k']['i']}"
+    return None
+
+
+class StreamReplayServer:
+    """Replays recorded events to every client subscribed to their stream."""
+
+    def __init__(
+        self,
+        events: List[Dict],
+        speed: float = 1.0,
+        loop_forever: bool = False,
+    ):
+        self.events = events
+        self.speed = speed
+        self.loop_forever = loop_forever
+        self._runner: Optional[web.AppRunner] = None
+        self._clients: Set[web.WebSocketResponse] = set()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "StreamReplayServer":
+        with open(path, "r") as f:
+            events = [json.loads(line) for line in f if line.strip()]
+        return cls(events, **kwargs)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 9443):
+        """Serve the replay on ``ws://host:port/ws``."""
+        app = web.Application()
+        app.router.add_get("/ws", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Stream replay serving {len(self.events)} events on {port}")
+
+    async def stop(self):
+        """Drop every client, as the exchange does on disconnect, and stop serving."""
+        for ws in list(self._clients):
+            await ws.close(code=WSCloseCode.GOING_AWAY)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._clients.add(ws)
+
+        subscribed: Set[str] = set()
+        replay: Optional[asyncio.Task] = None
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                command = json.loads(msg.data)
+                params = command.get("params", [])
+                if command.get("method") == "SUBSCRIBE":
+                    subscribed.update(params)
+                elif command.get("method") == "UNSUBSCRIBE":
+                    subscribed.difference_update(params)
+                await ws.send_json({"result": None, "id": command.get("id")})
+
+                # Start replaying once the client has subscribed to something
+                if replay is None and subscribed:
+                    replay = asyncio.create_task(self._replay(ws, subscribed))
+        finally:
+            self._clients.discard(ws)
+            if replay is not None:
+                replay.cancel()
+
+        return ws
+
+    async def _replay(self, ws: web.WebSocketResponse, subscribed: Set[str]):
+        while True:
+            previous_time = None
+            for event in self.events:
+                # Keep the recorded spacing between events, scaled by speed
+                event_time = event.get("E")
+                if previous_time is not None and event_time is not None:
+                    await asyncio.sleep(
+                        max(event_time - previous_time, 0) / 1000 / self.speed
+                    )
+                previous_time = event_time
+
+                if stream_name(event) in subscribed:
+                    await ws.send_json(event)
+
+            if not self.loop_forever:
+                return
+
+
+async def _serve(args: argparse.Namespace):
+    server = StreamReplayServer.from_file(
+        args.events, speed=args.speed, loop_forever=args.loop
+    )
+    await server.start(args.host, args.port)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("events", help="JSON-lines file of recorded events")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--loop", action="store_true", help="Replay forever")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve(parser.parse_args()))
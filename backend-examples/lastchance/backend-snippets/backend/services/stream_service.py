@@ -0,0 +1,288 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import aiohttp
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TickListener = Callable[[str, Dict], None]
+KlineListener = Callable[[str, str, Dict], None]
+
+
+class MarketState:
+    """
+    In-process view of the latest data pushed by the exchange streams.
+
+    Symbols are stored in the platform's short form (``BTC``), not the
+    exchange pair (``BTCUSDT``).
+    """
+
+    def __init__(self):
+        self.tickers: Dict[str, Dict] = {}
+        self.klines: Dict[Tuple[str, str], Dict] = {}
+        self.trades: Dict[str, Dict] = {}
+        self.listeners: List[TickListener] = []
+        self.kline_listeners: List[KlineListener] = []
+
+    def add_listener(self, listener: TickListener):
+        """Call ``listener(symbol, ticker)`` on every ticker or trade update."""
+        self.listeners.append(listener)
+
+    def add_kline_listener(self, listener: KlineListener):
+        """Call ``listener(symbol, interval, kline)`` on every kline update."""
+        self.kline_listeners.append(listener)
+
+    def update_ticker(self, symbol: str, ticker: Dict):
+        ticker["received_at"] = time.time()
+        self.tickers[symbol] = ticker
+        self._notify(symbol, ticker)
+
+    def update_trade(self, symbol: str, trade: Dict):
+        trade["received_at"] = time.time()
+        self.trades[symbol] = trade
+
+        # Keep the ticker price as fresh as the last trade
+        ticker = self.tickers.get(symbol)
+        if ticker is not None:
+            ticker["price"] = trade["price"]
+            ticker["timestamp"] = trade["time"]
+            ticker["received_at"] = trade["received_at"]
+            self._notify(symbol, ticker)
+
+    def update_kline(self, symbol: str, interval: str, kline: Dict):
+        kline["received_at"] = time.time()
+        self.klines[(symbol, interval)] = kline
+        for listener in self.kline_listeners:
+            try:
+                listener(symbol, interval, kline)
+            except Exception as e:
+                logger.error(f"Kline listener failed for {symbol} {interval}: {e}")
+
+    def get_ticker(self, symbol: str, max_age: float) -> Optional[Dict]:
+        """Latest ticker for ``symbol`` if it is younger than ``max_age`` seconds."""
+        ticker = self.tickers.get(symbol)
+        if ticker and time.time() - ticker["received_at"] <= max_age:
+            return ticker
+        return None
+
+    def get_kline(self, symbol: str, interval: str, max_age: float) -> Optional[Dict]:
+        """Latest kline for ``symbol``/``interval`` if younger than ``max_age``."""
+        kline = self.klines.get((symbol, interval))
+        if kline and time.time() - kline["received_at"] <= max_age:
+            return kline
+        return None
+
+    def _notify(self, symbol: str, ticker: Dict):
+        for listener in self.listeners:
+            try:
+                listener(symbol, ticker)
+            except Exception as e:
+                logger.error(f"Market state listener failed for {symbol}: {e}")
+
+
+class MarketStreamService:
+    """
+    Persistent Binance stream connection feeding ``MarketState``.
+
+    Streams are subscribed with ``SUBSCRIBE`` messages on
+    ``settings.BINANCE_WS_URL``. The connection is re-established with
+    exponential backoff and every stream is subscribed again after a
+    reconnect. Each stream remembers which holders asked for it and is
+    unsubscribed only once the last of them releases it. Point
+    ``BINANCE_WS_URL`` at a local replay server (``services.stream_replay``)
+    to run without the exchange.
+    """
+
+    def __init__(self, state: MarketState, url: str = settings.BINANCE_WS_URL):
+        self.state = state
+        self.url = url
+        self.streams: Set[str] = set()
+        # Who asked for each stream (e.g. "market", "alerts")
+        self.holders: Dict[str, Set[str]] = {}
+        self.is_connected = False
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self._request_id = 0
+
+    def ensure_started(self):
+        """Start the stream task once, if streaming is enabled."""
+        if not settings.MARKET_STREAM_ENABLED or self._task is not None:
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        except RuntimeError:
+            pass  # No running event loop yet; started on the next call
+
+    async def stop(self):
+        """Close the stream connection and stop reconnecting."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._ws is not None:
+            await self._ws.close()
+        self.is_connected = False
+
+    async def subscribe_tickers(self, symbols: List[str], holder: str = "market"):
+        """Stream 24h tickers and trades for ``symbols``."""
+        await self._subscribe(self._ticker_streams(symbols), holder)
+
+    async def subscribe_kline(self, symbol: str, interval: str, holder: str = "market"):
+        """Stream the live candle of ``symbol`` for ``interval``."""
+        await self._subscribe([self._kline_stream(symbol, interval)], holder)
+
+    async def unsubscribe_tickers(self, symbols: List[str], holder: str):
+        """Release ``holder``'s ticker streams for ``symbols``."""
+        await self._unsubscribe(self._ticker_streams(symbols), holder)
+
+    async def unsubscribe_kline(self, symbol: str, interval: str, holder: str):
+        """Release ``holder``'s kline stream of ``symbol`` for ``interval``."""
+        await self._unsubscribe([self._kline_stream(symbol, interval)], holder)
+
+    @staticmethod
+    def _ticker_streams(symbols: List[str]) -> List[str]:
+        streams = []
+        for symbol in symbols:
+            pair = f"{symbol.lower()}usdt"
+            streams += [f"{pair}@ticker", f"{pair}@trade"]
+        return streams
+
+    @staticmethod
+    def _kline_stream(symbol: str, interval: str) -> str:
+        return f"{symbol.lower()}usdt@kline_{interval}"
+
+    async def _subscribe(self, streams: List[str], holder: str):
+        for stream in streams:
+            self.holders.setdefault(stream, set()).add(holder)
+
+        new_streams = [s for s in streams if s not in self.streams]
+        if not new_streams:
+            return
+
+        self.streams.update(new_streams)
+        self.ensure_started()
+        if self.is_connected:
+            await self._send_request("SUBSCRIBE", new_streams)
+
+    async def _unsubscribe(self, streams: List[str], holder: str):
+        # A stream stays open while any other holder still needs it
+        released = []
+        for stream in streams:
+            holders = self.holders.get(stream)
+            if holders is None or holder not in holders:
+                continue
+            holders.discard(holder)
+            if not holders:
+                del self.holders[stream]
+                self.streams.discard(stream)
+                released.append(stream)
+
+        if released and self.is_connected:
+            await self._send_request("UNSUBSCRIBE", released)
+
+    async def _send_request(self, method: str, streams: List[str]):
+        # Binance caps the number of streams per request
+        for start in range(0, len(streams), 200):
+            self._request_id += 1
+            await self._ws.send_json(
+                {
+                    "method": method,
+                    "params": streams[start : start + 200],
+                    "id": self._request_id,
+                }
+            )
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(self.url, heartbeat=30) as ws:
+                        self._ws = ws
+                        self.is_connected = True
+                        backoff = 1.0
+                        logger.info(f"Market stream connected to {self.url}")
+
+                        if self.streams:
+                            await self._send_request("SUBSCRIBE", sorted(self.streams))
+
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self._handle_event(json.loads(msg.data))
+                            elif msg.type in (
+                                aiohttp.WSMsgType.CLOSED,
+                                aiohttp.WSMsgType.ERROR,
+                            ):
+                                break
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Market stream error: {e}")
+            finally:
+                self._ws = None
+                self.is_connected = False
+
+            logger.info(f"Market stream reconnecting in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, settings.MARKET_STREAM_MAX_BACKOFF)
+
+    def _handle_event(self, event: Dict):
+        # Combined-stream payloads wrap the event in "data"
+        event = event.get("data", event)
+        event_type = event.get("e")
+        if event_type is None:
+            return  # Subscription acknowledgement
+
+        symbol = self._short_symbol(event.get("s", ""))
+        if event_type == "24hrTicker":
+            self.state.update_ticker(
+                symbol,
+                {
+                    "symbol": symbol,
+                    "price": float(event["c"]),
+                    "change_24h": float(event["p"]),
+                    "change_percent_24h": float(event["P"]),
+                    "volume_24h": float(event["q"]),
+                    "high_24h": float(event["h"]),
+                    "low_24h": float(event["l"]),
+                    "timestamp": event["E"],
+                },
+            )
+        elif event_type in ("trade", "aggTrade"):
+            self.state.update_trade(
+                symbol,
+                {
+                    "price": float(event["p"]),
+                    "quantity": float(event["q"]),
+                    "time": event["T"],
+                },
+            )
+        elif event_type == "kline":
+            k = event["k"]
+            self.state.update_kline(
+                symbol,
+                k["i"],
+                {
+                    "time": k["t"],
+                    "open": float(k["o"]),
+                    "high": float(k["h"]),
+                    "low": float(k["l"]),
+                    "close": float(k["c"]),
+                    "volume": float(k["v"]),
+                    "closed": k["x"],
+                },
+            )
+
+    @staticmethod
+    def _short_symbol(pair: str) -> str:
+        return pair[:-4] if pair.endswith("USDT") else pair
+
+
+# Global market state and stream
+market_state = MarketState()
+market_stream = MarketStreamService(market_state)
@@ -0,0 +1,376 @@
+import asyncio
+import types
+
+import pytest
+
+alert_engine_module = pytest.importorskip("services.alert_engine")
+
+from services.alert_engine import AlertEngine, IndexedAlert, ThresholdBook
+
+
+def make_alert(alert_id, alert_type="price_above", threshold=0.0):
+    return IndexedAlert(alert_id, 1, "BTC", alert_type, threshold)
+
+
+def test_threshold_book_pops_crossed_levels():
+    book = ThresholdBook()
+    for alert_id, level in [(1, 100.0), (2, 90.0), (3, 110.0), (4, 100.0)]:
+        book.add(level, make_alert(alert_id))
+
+    assert book.levels == [90.0, 100.0, 100.0, 110.0]
+    assert [a.alert_id for a in book.pop_at_or_below(100.0)] == [2, 1, 4]
+    assert book.pop_at_or_below(105.0) == []
+    assert [a.alert_id for a in book.pop_at_or_above(110.0)] == [3]
+    assert len(book) == 0
+
+
+def test_threshold_book_removes_one_alert_among_equal_levels():
+    book = ThresholdBook()
+    book.add(100.0, make_alert(1))
+    book.add(100.0, make_alert(2))
+
+    assert book.remove(100.0, 2)
+    assert not book.remove(100.0, 2)
+    assert not book.remove(99.0, 1)
+    assert [a.alert_id for a in book.alerts] == [1]
+
+
+def test_price_alerts_trigger_once_crossed():
+    engine = AlertEngine()
+    engine.add_alert(1, 7, "btc", "price_above", 100.0)
+    engine.add_alert(2, 7, "BTC", "price_below", 90.0)
+
+    assert engine.on_price("BTC", 95.0) == []
+    assert [a.alert_id for a in engine.on_price("BTC", 101.0)] == [1]
+    assert engine.on_price("BTC", 102.0) == []
+    assert [a.alert_id for a in engine.on_price("BTC", 80.0)] == [2]
+    assert engine.index == {}
+
+
+def test_price_change_uses_the_first_price_and_triggers_once():
+    engine = AlertEngine()
+    engine.add_alert(1, 7, "BTC", "price_change", 10.0)
+    assert engine.pending["BTC"]
+
+    assert engine.on_price("BTC", 100.0) == []
+    assert engine.index[1][0][2] == pytest.approx(110.0)
+    assert engine.on_price("BTC", 105.0) == []
+
+    triggered = engine.on_price("BTC", 89.0)
+    assert [(a.alert_id, a.reference_price) for a in triggered] == [(1, 100.0)]
+    assert engine.on_price("BTC", 120.0) == []
+
+
+def test_price_change_keeps_a_stored_reference():
+    engine = AlertEngine()
+    engine.on_price("BTC", 200.0)
+    engine.add_alert(1, 7, "BTC", "price_change", 10.0, reference_price=100.0)
+    assert [a.alert_id for a in engine.on_price("BTC", 111.0)] == [1]
+
+
+def test_volume_spike_compares_with_the_average():
+    engine = AlertEngine(volume_window=3)
+    engine.add_alert(1, 7, "BTC", "volume_spike", 3.0)
+
+    for volume in (10.0, 10.0, 10.0):
+        assert engine.on_candle_volume("BTC", volume) == []
+    assert engine.on_candle_volume("BTC", 29.0) == []
+    triggered = engine.on_candle_volume("BTC", 60.0)
+    assert [a.alert_id for a in triggered] == [1]
+
+
+class FlakyBus:
+    """Fails the first subscription, then delivers ``changes`` and blocks."""
+
+    def __init__(self, changes):
+        self.changes = changes
+        self.subscriptions = 0
+
+    async def subscribe(self, channel):
+        self.subscriptions += 1
+        if self.subscriptions == 1:
+            raise ConnectionError("bus down")
+        for change in self.changes:
+            yield change
+        await asyncio.Event().wait()
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_sync_reconnects_and_reloads(monkeypatch):
+    bus = FlakyBus(
+        [
+            {
+                "alert_id": 2,
+                "user_id": 7,
+                "symbol": "ETH",
+                "alert_type": "price_below",
+                "threshold": 90.0,
+                "active": True,
+            }
+        ]
+    )
+    monkeypatch.setattr(alert_engine_module, "message_bus", bus)
+
+    sleep = asyncio.sleep
+    monkeypatch.setattr(alert_engine_module.asyncio, "sleep", lambda delay: sleep(0))
+
+    engine = AlertEngine()
+    reloads = []
+
+    async def load(db):
+        reloads.append(db)
+        engine.add_alert(1, 7, "BTC", "price_above", 100.0)
+
+    monkeypatch.setattr(engine, "load", load)
+
+    async def run():
+        task = asyncio.create_task(engine.sync(FakeSession))
+        for _ in range(20):
+            await sleep(0)
+        task.cancel()
+
+    asyncio.run(run())
+    assert bus.subscriptions == 2
+    assert len(reloads) == 1
+    assert set(engine.index) == {1, 2}
+
+
+class FakeStream:
+    def __init__(self):
+        self.calls = []
+
+    async def subscribe_tickers(self, symbols, holder):
+        self.calls.append(("subscribe_tickers", tuple(symbols)))
+
+    async def unsubscribe_tickers(self, symbols, holder):
+        self.calls.append(("unsubscribe_tickers", tuple(symbols)))
+
+    async def subscribe_kline(self, symbol, interval, holder):
+        self.calls.append(("subscribe_kline", symbol))
+
+    async def unsubscribe_kline(self, symbol, interval, holder):
+        self.calls.append(("unsubscribe_kline", symbol))
+
+
+def test_streams_follow_the_symbols_with_alerts():
+    async def run():
+        engine = AlertEngine()
+        engine.stream = stream = FakeStream()
+        engine.set_active(True)
+
+        engine.add_alert(1, 7, "BTC", "price_above", 100.0)
+        engine.add_alert(2, 7, "BTC", "price_below", 90.0)
+        engine.add_alert(3, 7, "ETH", "volume_spike", 3.0)
+        await engine._stream_task
+        subscribed = sorted(stream.calls)
+
+        stream.calls.clear()
+        engine.on_price("BTC", 101.0)
+        await asyncio.sleep(0)
+        assert stream.calls == []
+
+        engine.remove_alert(2)
+        engine.remove_alert(3)
+        await engine._stream_task
+        return subscribed, sorted(stream.calls), engine.watched
+
+    subscribed, released, watched = asyncio.run(run())
+    assert subscribed == [
+        ("subscribe_kline", "ETH"),
+        ("subscribe_tickers", ("BTC",)),
+    ]
+    assert released == [
+        ("unsubscribe_kline", "ETH"),
+        ("unsubscribe_tickers", ("BTC",)),
+    ]
+    assert watched == {}
+
+
+def test_streams_and_ticks_follow_leadership():
+    async def run():
+        engine = AlertEngine()
+        engine.stream = stream = FakeStream()
+        engine.session_factory = RecordingSession([])
+        engine.add_alert(1, 7, "BTC", "price_above", 100.0)
+        engine.add_alert(2, 7, "ETH", "volume_spike", 3.0)
+        await asyncio.sleep(0)
+        # Followers hold no streams and ignore ticks
+        assert stream.calls == [] and engine.watched == {}
+        engine._on_ticker("BTC", {"price": 101.0})
+        assert engine.last_prices == {} and 1 in engine.index
+
+        engine.set_active(True)
+        await engine._stream_task
+        acquired = sorted(stream.calls)
+        engine._on_ticker("ETH", {"price": 10.0})
+
+        stream.calls.clear()
+        engine.set_active(False)
+        await engine._stream_task
+        return acquired, sorted(stream.calls), engine
+
+    acquired, released, engine = asyncio.run(run())
+    assert acquired == [
+        ("subscribe_kline", "ETH"),
+        ("subscribe_tickers", ("BTC",)),
+    ]
+    assert released == [
+        ("unsubscribe_kline", "ETH"),
+        ("unsubscribe_tickers", ("BTC",)),
+    ]
+    assert engine.watched == {} and engine.last_prices == {}
+
+
+class RecordingSession:
+    """
+    Session factory recording statements; updates match ``rowcount`` rows
+    and scalar queries return ``scalar``.
+    """
+
+    def __init__(self, events, rowcount=1, scalar=None):
+        self.events = events
+        self.rowcount = rowcount
+        self.scalar_value = scalar
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.events.append(("execute", statement))
+
+        class Result:
+            rowcount = self.rowcount
+
+        return Result()
+
+    async def scalar(self, statement):
+        self.events.append(("scalar", statement))
+        return self.scalar_value
+
+    async def commit(self):
+        self.events.append(("commit",))
+
+
+def test_trigger_is_stored_before_it_is_published(monkeypatch):
+    events = []
+
+    async def publish(user_id, alert_id, notification):
+        events.append(("publish", alert_id, notification["price"]))
+
+    monkeypatch.setattr(alert_engine_module, "publish_alert_notification", publish)
+
+    async def run():
+        engine = AlertEngine()
+        engine.set_active(True)
+        engine.session_factory = RecordingSession(events)
+        engine.add_alert(1, 7, "BTC", "price_above", 100.0)
+        engine._on_ticker("BTC", {"price": 101.0})
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert [event[0] for event in events] == ["execute", "commit", "publish"]
+    values = events[0][1].compile().params
+    assert values["status"] == alert_engine_module.AlertStatus.TRIGGERED
+    assert values["triggered_at"] is not None
+    assert events[2] == ("publish", 1, 101.0)
+
+
+def test_trigger_already_stored_elsewhere_is_not_published(monkeypatch):
+    events = []
+
+    async def publish(user_id, alert_id, notification):
+        events.append(("publish",))
+
+    monkeypatch.setattr(alert_engine_module, "publish_alert_notification", publish)
+
+    async def run():
+        engine = AlertEngine()
+        engine.set_active(True)
+        engine.session_factory = RecordingSession(events, rowcount=0)
+        engine.add_alert(1, 7, "BTC", "price_above", 100.0)
+        engine._on_ticker("BTC", {"price": 101.0})
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert ("publish",) not in events
+
+
+def test_reference_price_is_stored_and_shared(monkeypatch):
+    events = []
+
+    class Bus:
+        async def publish(self, channel, message):
+            events.append(("announce", message["reference_price"]))
+
+    monkeypatch.setattr(alert_engine_module, "message_bus", Bus())
+
+    async def run():
+        engine = AlertEngine()
+        engine.set_active(True)
+        engine.session_factory = RecordingSession(events)
+        engine.add_alert(1, 7, "BTC", "price_change", 5.0)
+        engine.on_price("BTC", 100.0)
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert [event[0] for event in events] == ["scalar", "execute", "commit", "announce"]
+    assert events[1][1].compile().params["reference_price"] == 100.0
+    assert events[3] == ("announce", 100.0)
+
+
+def test_stored_reference_price_is_shared_instead(monkeypatch):
+    events = []
+
+    class Bus:
+        async def publish(self, channel, message):
+            events.append(("announce", message["reference_price"]))
+
+    monkeypatch.setattr(alert_engine_module, "message_bus", Bus())
+
+    async def run():
+        engine = AlertEngine()
+        engine.set_active(True)
+        engine.session_factory = RecordingSession(events, scalar=90.0)
+        engine.on_price("BTC", 100.0)
+        engine.add_alert(1, 7, "BTC", "price_change", 5.0)
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert [event[0] for event in events] == ["scalar", "announce"]
+    assert events[1] == ("announce", 90.0)
+
+
+def test_announce_failures_are_not_raised(monkeypatch):
+    class Bus:
+        async def publish(self, channel, message):
+            raise ConnectionError("bus down")
+
+    monkeypatch.setattr(alert_engine_module, "message_bus", Bus())
+    alert = types.SimpleNamespace(
+        id=1,
+        user_id=7,
+        symbol="BTC",
+        alert_type="price_above",
+        threshold_value=100.0,
+        status=alert_engine_module.AlertStatus.ACTIVE,
+    )
+
+    asyncio.run(AlertEngine().announce(alert))
+    asyncio.run(AlertEngine().announce_removal(1))
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+cache_service = pytest.importorskip("services.cache_service")
+
+from services.cache_service import StaleWhileRevalidateCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.fail = False
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    async def set(self, key, value, expire=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[key] = value
+
+
+class Fetcher:
+    def __init__(self, value="fresh", delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache_service, "redis_client", fake)
+    return fake
+
+
+def cache_entry(value, age):
+    return {"value": value, "cached_at": time.time() - age}
+
+
+def test_fresh_entry_is_served_without_fetching(redis):
+    redis.data["k"] = cache_entry("cached", age=5)
+    fetch = Fetcher()
+
+    value, age = asyncio.run(StaleWhileRevalidateCache().get_or_fetch("k", fetch, 10))
+
+    assert value == "cached"
+    assert 5 <= age < 6
+    assert fetch.calls == 0
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(redis):
+    redis.data["k"] = cache_entry("stale", age=20)
+    fetch = Fetcher(delay=0.05)
+    cache = StaleWhileRevalidateCache(enabled=True, max_staleness=60)
+
+    async def run():
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("k", fetch, 10) for _ in range(5))
+        )
+        await asyncio.gather(*cache._inflight.values())
+        return results
+
+    results = asyncio.run(run())
+
+    assert [value for value, _ in results] == ["stale"] * 5
+    assert fetch.calls == 1
+    assert redis.data["k"]["value"] == "fresh"
+
+
+def test_entry_past_max_staleness_is_fetched_inline(redis):
+    redis.data["k"] = cache_entry("ancient", age=120)
+    fetch = Fetcher()
+    cache = StaleWhileRevalidateCache(enabled=True, max_staleness=60)
+
+    assert asyncio.run(cache.get_or_fetch("k", fetch, 10)) == ("fresh", 0.0)
+    assert redis.data["k"]["value"] == "fresh"
+
+
+def test_stale_entry_is_fetched_inline_when_disabled(redis):
+    redis.data["k"] = cache_entry("stale", age=20)
+    cache = StaleWhileRevalidateCache(enabled=False, max_staleness=60)
+
+    assert asyncio.run(cache.get_or_fetch("k", Fetcher(), 10)) == ("fresh", 0.0)
+
+
+def test_concurrent_misses_share_one_fetch(redis):
+    fetch = Fetcher(delay=0.05)
+    cache = StaleWhileRevalidateCache()
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_fetch("k", fetch, 10) for _ in range(5))
+        )
+
+    assert asyncio.run(run()) == [("fresh", 0.0)] * 5
+    assert fetch.calls == 1
+
+
+def test_empty_result_keeps_previous_entry(redis):
+    redis.data["k"] = cache_entry("ancient", age=120)
+    cache = StaleWhileRevalidateCache(max_staleness=60)
+
+    assert asyncio.run(cache.get_or_fetch("k", Fetcher(value={}), 10)) == ({}, 0.0)
+    assert redis.data["k"]["value"] == "ancient"
+
+
+def test_fetches_without_redis(redis):
+    redis.fail = True
+
+    value, _ = asyncio.run(StaleWhileRevalidateCache().get_or_fetch("k", Fetcher(), 10))
+
+    assert value == "fresh"
@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import pytest
+
+connection_module = pytest.importorskip("websocket.connection")
+
+from websocket.connection import (
+    OVERFLOW_CONFLATE,
+    OVERFLOW_DISCONNECT,
+    OVERFLOW_DROP_OLDEST,
+    ClientConnection,
+    SlowConsumerError,
+    encode_message,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    async def send_text(self, text):
+        if self.fail:
+            raise ConnectionError("gone")
+        self.sent.append(text)
+
+
+def queued(connection):
+    return [payload for _, payload in connection.queue]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ClientConnection(FakeWebSocket(), 1, overflow_policy="block")
+
+
+def test_encode_message_handles_non_json_values():
+    message = json.loads(encode_message({"type": "x", "value": 1.5, "at": object}))
+    assert message["type"] == "x"
+    assert message["value"] == 1.5
+    assert isinstance(message["at"], str)
+
+
+def test_drop_oldest_keeps_the_newest_messages():
+    connection = ClientConnection(
+        FakeWebSocket(), 1, max_queue_size=2, overflow_policy=OVERFLOW_DROP_OLDEST
+    )
+    for payload in "abc":
+        connection.enqueue(payload)
+
+    assert queued(connection) == ["b", "c"]
+    assert connection.get_stats()["dropped"] == 1
+
+
+def test_conflate_replaces_queued_message_with_same_key():
+    connection = ClientConnection(
+        FakeWebSocket(), 1, max_queue_size=2, overflow_policy=OVERFLOW_CONFLATE
+    )
+    connection.enqueue("btc-1", "market:BTC")
+    connection.enqueue("eth-1", "market:ETH")
+    connection.enqueue("btc-2", "market:BTC")
+    assert queued(connection) == ["btc-2", "eth-1"]
+    assert connection.conflated == 1
+
+    # Unkeyed messages and new keys drop the oldest entry when full
+    connection.enqueue("alert")
+    assert queued(connection) == ["eth-1", "alert"]
+    connection.enqueue("btc-3", "market:BTC")
+    assert queued(connection) == ["alert", "btc-3"]
+    assert connection.dropped == 2
+
+
+def test_conflation_key_is_forgotten_once_sent():
+    async def run():
+        websocket = FakeWebSocket()
+        connection = ClientConnection(websocket, 1, overflow_policy=OVERFLOW_CONFLATE)
+        connection.start(lambda *_: None)
+        connection.enqueue("btc-1", "market:BTC")
+        while not websocket.sent:
+            await asyncio.sleep(0)
+        connection.enqueue("btc-2", "market:BTC")
+        while len(websocket.sent) < 2:
+            await asyncio.sleep(0)
+        connection.close()
+        return websocket.sent
+
+    assert asyncio.run(run()) == ["btc-1", "btc-2"]
+
+
+def test_disconnect_policy_reports_slow_consumer():
+    errors = []
+    connection = ClientConnection(
+        FakeWebSocket(), 1, max_queue_size=1, overflow_policy=OVERFLOW_DISCONNECT
+    )
+    connection._on_error = lambda conn, error: errors.append(error)
+
+    connection.enqueue("a")
+    connection.enqueue("b")
+
+    assert queued(connection) == ["a"]
+    assert connection.dropped == 1
+    assert isinstance(errors[0], SlowConsumerError)
+
+
+def test_writer_sends_in_order_and_reports_send_errors():
+    async def run():
+        websocket = FakeWebSocket()
+        connection = ClientConnection(websocket, 1)
+        connection.start(lambda *_: None)
+        for payload in "abc":
+            connection.enqueue(payload)
+        while connection.queue:
+            await asyncio.sleep(0)
+        connection.close()
+
+        errors = []
+        broken = ClientConnection(FakeWebSocket(fail=True), 1)
+        broken.start(lambda conn, error: errors.append((conn, error)))
+        broken.enqueue("a")
+        await broken.writer_task
+        return websocket.sent, connection.get_stats(), errors, broken
+
+    sent, stats, errors, broken = asyncio.run(run())
+    assert sent == ["a", "b", "c"]
+    assert stats == {"queued": 0, "sent": 3, "dropped": 0, "conflated": 0}
+    assert errors[0][0] is broken
+    assert isinstance(errors[0][1], ConnectionError)
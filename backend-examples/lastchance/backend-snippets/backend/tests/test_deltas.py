@@ -0,0 +1,84 @@
+from websocket.deltas import DeltaEncoder
+
+
+def test_first_update_is_a_snapshot_and_later_ones_are_deltas():
+    encoder = DeltaEncoder()
+    assert encoder.update("market_data:BTC", {"price": 1, "volume": 5}) == {
+        "seq": 1,
+        "snapshot": {"price": 1, "volume": 5},
+    }
+    assert encoder.update("market_data:BTC", {"price": 2}) == {
+        "seq": 2,
+        "changes": {"price": 2},
+        "removed": ["volume"],
+    }
+
+
+def test_unchanged_update_is_skipped_without_a_sequence_number():
+    encoder = DeltaEncoder()
+    encoder.update("market_data:BTC", {"price": 1})
+    assert encoder.update("market_data:BTC", {"price": 1}) is None
+    assert encoder.snapshot("market_data:BTC") == (1, {"price": 1})
+
+
+def test_periodic_snapshots():
+    encoder = DeltaEncoder(snapshot_every=3)
+    kinds = [
+        "snapshot" in encoder.update("market_data:BTC", {"price": price})
+        for price in range(1, 8)
+    ]
+    assert kinds == [True, False, True, False, False, True, False]
+
+
+def test_apply_mirrors_the_leader():
+    leader, follower = DeltaEncoder(), DeltaEncoder()
+    for data in ({"price": 1, "volume": 5}, {"price": 2}, {"price": 3, "bid": 1}):
+        message = leader.update("market_data:BTC", data)
+        if "snapshot" in message:
+            message = {"seq": message["seq"], "data": message["snapshot"]}
+        follower.apply("market_data:BTC", message)
+
+    assert follower.snapshot("market_data:BTC") == leader.snapshot("market_data:BTC")
+
+
+def test_apply_ignores_old_messages():
+    encoder = DeltaEncoder()
+    encoder.apply("market_data:BTC", {"seq": 2, "data": {"price": 2}})
+    encoder.apply("market_data:BTC", {"seq": 2, "changes": {"price": 9}, "removed": []})
+    encoder.apply("market_data:BTC", {"seq": 1, "data": {"price": 1}})
+    assert encoder.snapshot("market_data:BTC") == (2, {"price": 2})
+
+
+def test_gap_drops_the_topic_until_the_next_snapshot():
+    leader, follower = DeltaEncoder(snapshot_every=4), DeltaEncoder()
+
+    def relay(message):
+        if "snapshot" in message:
+            message = {"seq": message["seq"], "data": message["snapshot"]}
+        follower.apply("market_data:BTC", message)
+
+    relay(leader.update("market_data:BTC", {"price": 1}))
+    leader.update("market_data:BTC", {"price": 2})  # lost
+    relay(leader.update("market_data:BTC", {"price": 3}))
+    assert follower.snapshot("market_data:BTC") is None
+
+    relay(leader.update("market_data:BTC", {"price": 4}))
+    assert follower.snapshot("market_data:BTC") == (4, {"price": 4})
+
+    relay(leader.update("market_data:BTC", {"price": 5}))
+    assert follower.snapshot("market_data:BTC") == (5, {"price": 5})
+
+
+def test_late_follower_recovers_from_a_periodic_snapshot():
+    leader, follower = DeltaEncoder(snapshot_every=3), DeltaEncoder()
+    leader.update("market_data:BTC", {"price": 1})
+
+    message = leader.update("market_data:BTC", {"price": 2})
+    follower.apply("market_data:BTC", message)
+    assert follower.snapshot("market_data:BTC") is None
+
+    message = leader.update("market_data:BTC", {"price": 3})
+    follower.apply(
+        "market_data:BTC", {"seq": message["seq"], "data": message["snapshot"]}
+    )
+    assert follower.snapshot("market_data:BTC") == (3, {"price": 3})
@@ -0,0 +1,187 @@
+import asyncio
+import json
+
+import pytest
+
+manager_module = pytest.importorskip("websocket.manager")
+
+from services.message_bus import ALERT_NOTIFICATIONS_CHANNEL, InMemoryMessageBus
+from websocket.connection import OVERFLOW_DISCONNECT, ClientConnection
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = (code, reason)
+
+
+def add_connection(manager, user_id, **kwargs):
+    connection = ClientConnection(FakeWebSocket(), user_id, **kwargs)
+    connection._on_error = manager._on_send_error
+    manager.active_connections[connection.connection_id] = connection
+    manager.user_connections.setdefault(user_id, set()).add(
+        connection.connection_id
+    )
+    return connection
+
+
+def test_connecting_does_not_start_monitoring():
+    async def run():
+        manager = manager_module.ConnectionManager()
+        connection_id = await manager.connect(FakeWebSocket(), 1)
+        manager.disconnect(connection_id)
+        return manager
+
+    assert not asyncio.run(run()).is_running
+
+
+def test_personal_message_reaches_every_connection_of_the_user():
+    async def run():
+        manager = manager_module.ConnectionManager()
+        first = add_connection(manager, 1)
+        second = add_connection(manager, 1)
+        other = add_connection(manager, 2)
+
+        await manager.send_personal_message({"type": "alert"}, 1)
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+    assert len(first.queue) == len(second.queue) == 1
+    assert not other.queue
+
+
+def test_personal_message_survives_slow_consumer_disconnects():
+    async def run():
+        manager = manager_module.ConnectionManager()
+        connections = [
+            add_connection(
+                manager, 1, max_queue_size=1, overflow_policy=OVERFLOW_DISCONNECT
+            )
+            for _ in range(3)
+        ]
+        for connection in connections:
+            connection.enqueue("backlog")
+
+        # Each enqueue overflows and disconnects, editing the user's set
+        await manager.send_personal_message({"type": "alert"}, 1)
+        await asyncio.sleep(0)
+        return manager
+
+    manager = asyncio.run(run())
+    assert manager.active_connections == {}
+    assert 1 not in manager.user_connections
+    assert manager.slow_consumer_disconnects == 3
+
+
+def test_alerts_request_for_a_closed_connection_is_ignored():
+    async def run():
+        manager = manager_module.ConnectionManager()
+        await manager._handle_data_request("gone", "alerts", "BTC")
+        return manager
+
+    manager = asyncio.run(run())
+    assert manager.active_connections == {}
+
+
+def test_broadcast_encodes_once_for_all_subscribers(monkeypatch):
+    encoded = []
+
+    def encode(message):
+        encoded.append(message)
+        return json.dumps(message)
+
+    monkeypatch.setattr(manager_module, "encode_message", encode)
+
+    async def run():
+        manager = manager_module.ConnectionManager()
+        connections = [add_connection(manager, user_id) for user_id in (1, 2, 3)]
+        for connection in connections[:2]:
+            manager.topics.subscribe(connection.connection_id, "signals:BTC")
+
+        await manager.broadcast_to_topic({"type": "signal"}, "signals:BTC")
+        await manager.broadcast_to_topic(
+            {"type": "signal"}, "signals:BTC", conflate=False
+        )
+        return connections
+
+    first, second, third = asyncio.run(run())
+    assert len(encoded) == 2
+    assert first.queue[0][1] is second.queue[0][1]
+    assert first.queue[0][0] == "signal:signals:BTC"
+    assert first.queue[1][0] is None
+    assert not third.queue
+
+
+def test_subscribe_by_channel_symbol_and_timeframe(monkeypatch):
+    async def run():
+        manager = manager_module.ConnectionManager()
+
+        async def publish_interest():
+            pass
+
+        monkeypatch.setattr(manager, "_publish_interest", publish_interest)
+        connection = add_connection(manager, 1)
+        cid = connection.connection_id
+
+        await manager.handle_message(
+            cid,
+            {
+                "type": "subscribe",
+                "channel": "signals",
+                "symbol": "eth",
+                "timeframe": "4h",
+            },
+        )
+        await manager.handle_message(cid, {"type": "subscribe", "topic": "weather:BTC"})
+        await manager.handle_message(
+            cid, {"type": "unsubscribe", "topic": "signals:ETH:4h"}
+        )
+        return manager, connection
+
+    manager, connection = asyncio.run(run())
+    replies = [json.loads(payload) for _, payload in connection.queue]
+    assert replies[0]["topics"] == ["signals:ETH:4h"]
+    assert replies[0]["status"] == "subscribed"
+    assert replies[1] == {"type": "error", "message": "Unknown channel: weather"}
+    assert replies[2]["status"] == "unsubscribed"
+    assert manager.topics.topic_subscribers == {}
+
+
+def test_alert_notifications_reach_the_users_connections(monkeypatch):
+    bus = InMemoryMessageBus()
+    monkeypatch.setattr(manager_module, "message_bus", bus)
+
+    async def run():
+        manager = manager_module.ConnectionManager()
+        manager.is_running = True
+        connection = add_connection(manager, 7)
+        other = add_connection(manager, 8)
+
+        monitor = asyncio.create_task(manager._monitor_alerts())
+        await asyncio.sleep(0)
+        await bus.publish(
+            ALERT_NOTIFICATIONS_CHANNEL, {"user_id": 7, "alert_id": 3, "data": {}}
+        )
+        # Users without a connection in this process are skipped
+        await bus.publish(
+            ALERT_NOTIFICATIONS_CHANNEL, {"user_id": 9, "alert_id": 4, "data": {}}
+        )
+        while not connection.queue:
+            await asyncio.sleep(0)
+        monitor.cancel()
+        return connection, other
+
+    connection, other = asyncio.run(run())
+    notification = json.loads(connection.queue[0][1])
+    assert notification["type"] == "alert_notification"
+    assert notification["alert_id"] == 3
+    assert not other.queue
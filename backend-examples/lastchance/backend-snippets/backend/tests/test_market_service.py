@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("ccxt")
+market_service = pytest.importorskip("services.market_service")
+
+from config import settings
+from services.market_service import (
+    WEEK_OFFSET_SECONDS,
+    MarketService,
+    interval_to_seconds,
+    seconds_until_candle_close,
+)
+
+HOUR_MS = 3600 * 1000
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, expire=None):
+        self.data[key] = value
+        self.expires[key] = expire
+
+
+class FakeExchange:
+    def __init__(self, open_times):
+        self.open_times = open_times
+        self.calls = []
+
+    async def fetch_ohlcv(self, symbol, timeframe, limit):
+        self.calls.append(limit)
+        return [
+            [t, 1.0, 2.0, 0.5, float(i), 10.0] for i, t in enumerate(self.open_times)
+        ][-limit:]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(market_service, "redis_client", redis)
+    monkeypatch.setattr(settings, "MARKET_STREAM_ENABLED", False)
+
+    # The last candle is the live one
+    live = int(time.time() * 1000) // HOUR_MS * HOUR_MS
+    service = MarketService()
+    service.exchange = FakeExchange([live - i * HOUR_MS for i in range(4, -1, -1)])
+    service.redis = redis
+    service.live = live
+    return service
+
+
+@pytest.mark.parametrize(
+    "interval, seconds",
+    [("1m", 60), ("15m", 900), ("4h", 14400), ("1d", 86400), ("1w", 604800)],
+)
+def test_interval_to_seconds(interval, seconds):
+    assert interval_to_seconds(interval) == seconds
+
+
+@pytest.mark.parametrize("interval", ["1M", "h", "xh", ""])
+def test_unsupported_intervals(interval):
+    assert interval_to_seconds(interval) is None
+    assert seconds_until_candle_close(interval) is None
+
+
+def test_seconds_until_candle_close():
+    assert seconds_until_candle_close("1h", now=10 * 3600 + 600) == 3000
+    assert seconds_until_candle_close("15m", now=900) == 900
+    # Weekly candles open on Mondays, not at the epoch (a Thursday)
+    assert seconds_until_candle_close("1w", now=WEEK_OFFSET_SECONDS) == 604800
+    assert seconds_until_candle_close("1w", now=0) == 4 * 86400
+
+
+def test_closed_candles_are_cached_until_next_close(service):
+    candles = asyncio.run(service.get_candlestick_data("BTC", "1h", 5))
+
+    assert [c["time"] for c in candles] == service.exchange.open_times
+    key = "market:ohlcv:closed:BTCUSDT:1h"
+    assert [c[0] for c in service.redis.data[key]] == service.exchange.open_times[:-1]
+    assert 0 < service.redis.expires[key] <= 3601
+
+
+def test_cached_history_fetches_only_recent_candles(service):
+    asyncio.run(service.get_candlestick_data("BTC", "1h", 5))
+    candles = asyncio.run(service.get_candlestick_data("BTC", "1h", 5))
+
+    assert service.exchange.calls == [5, 2]
+    assert [c["time"] for c in candles] == service.exchange.open_times
+
+
+def test_live_candle_comes_from_the_stream(service, monkeypatch):
+    asyncio.run(service.get_candlestick_data("BTC", "1h", 5))
+
+    async def subscribe_kline(symbol, interval):
+        pass
+
+    monkeypatch.setattr(settings, "MARKET_STREAM_ENABLED", True)
+    monkeypatch.setattr(
+        market_service.market_stream, "subscribe_kline", subscribe_kline
+    )
+    state = market_service.market_state
+    monkeypatch.setattr(state, "klines", {})
+    kline = {"time": service.live, "open": 1.0, "high": 9.0, "low": 1.0, "close": 8.0}
+    state.update_kline("BTC", "1h", dict(kline, volume=3.0, closed=False))
+
+    candles = asyncio.run(service.get_candlestick_data("BTC", "1h", 5))
+
+    assert service.exchange.calls == [5]
+    assert candles[-1] == dict(kline, volume=3.0)
+    assert len(candles) == 5
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+message_bus_module = pytest.importorskip("services.message_bus")
+
+from config import settings
+from services.message_bus import (
+    ALERT_NOTIFICATIONS_CHANNEL,
+    InMemoryMessageBus,
+    create_message_bus,
+    drain_legacy_notifications,
+    publish_alert_notification,
+)
+
+
+async def receive(subscription, count):
+    return [await subscription.__anext__() for _ in range(count)]
+
+
+def test_every_subscriber_gets_each_message_of_its_channel():
+    async def run():
+        bus = InMemoryMessageBus()
+        first = bus.subscribe("a")
+        second = bus.subscribe("a")
+        other = bus.subscribe("b")
+        # Subscriptions are registered when first awaited
+        pending = [
+            asyncio.ensure_future(receive(first, 2)),
+            asyncio.ensure_future(receive(second, 2)),
+            asyncio.ensure_future(receive(other, 1)),
+        ]
+        await asyncio.sleep(0)
+
+        await bus.publish("a", {"n": 1})
+        await bus.publish("a", {"n": 2})
+        await bus.publish("b", {"n": 3})
+        return await asyncio.gather(*pending)
+
+    first, second, other = asyncio.run(run())
+    assert first == second == [{"n": 1}, {"n": 2}]
+    assert other == [{"n": 3}]
+
+
+def test_closed_subscription_stops_receiving():
+    async def run():
+        bus = InMemoryMessageBus()
+        subscription = bus.subscribe("a")
+        received = asyncio.ensure_future(receive(subscription, 1))
+        await asyncio.sleep(0)
+        await bus.publish("a", {"n": 1})
+        await received
+
+        await subscription.aclose()
+        await bus.publish("a", {"n": 2})
+        return bus
+
+    assert asyncio.run(run())._subscribers == {"a": []}
+
+
+def test_publish_without_subscribers_is_dropped():
+    asyncio.run(InMemoryMessageBus().publish("a", {"n": 1}))
+
+
+def test_memory_backend_is_selected(monkeypatch):
+    monkeypatch.setattr(settings, "MESSAGE_BUS_BACKEND", "memory")
+    assert isinstance(create_message_bus(), InMemoryMessageBus)
+
+
+def test_alert_notifications_are_published_for_the_user(monkeypatch):
+    bus = InMemoryMessageBus()
+    monkeypatch.setattr(message_bus_module, "message_bus", bus)
+
+    async def run():
+        subscription = bus.subscribe(ALERT_NOTIFICATIONS_CHANNEL)
+        received = asyncio.ensure_future(receive(subscription, 1))
+        await asyncio.sleep(0)
+        await publish_alert_notification(7, 3, {"title": "BTC above 100"})
+        return await received
+
+    assert asyncio.run(run()) == [
+        {"user_id": 7, "alert_id": 3, "data": {"title": "BTC above 100"}}
+    ]
+
+
+class FakeRedis:
+    def __init__(self, values):
+        self.values = dict(values)
+
+    async def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        for key in list(self.values):
+            if key.startswith(prefix):
+                yield key
+
+    async def getdel(self, key):
+        return self.values.pop(key, None)
+
+
+def test_legacy_notification_keys_are_published_once(monkeypatch):
+    bus = InMemoryMessageBus()
+    monkeypatch.setattr(message_bus_module, "message_bus", bus)
+    redis = FakeRedis(
+        {
+            "ws_notification:7:3": '{"title": "BTC above 100"}',
+            "ws_notification:8:4": "ETH below 90",
+            "ws_notification:broken": "{}",
+            "cache:BTC": "{}",
+        }
+    )
+
+    async def run():
+        subscription = bus.subscribe(ALERT_NOTIFICATIONS_CHANNEL)
+        received = asyncio.ensure_future(receive(subscription, 2))
+        await asyncio.sleep(0)
+        published = await drain_legacy_notifications(redis)
+        return published, await received, await drain_legacy_notifications(redis)
+
+    published, received, again = asyncio.run(run())
+    assert published == 2 and again == 0
+    assert received == [
+        {"user_id": 7, "alert_id": 3, "data": {"title": "BTC above 100"}},
+        {"user_id": 8, "alert_id": 4, "data": "ETH below 90"},
+    ]
+    assert redis.values == {"cache:BTC": "{}"}
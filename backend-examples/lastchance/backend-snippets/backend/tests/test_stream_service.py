@@ -0,0 +1,188 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from config import settings
+from services.stream_replay import StreamReplayServer
+from services.stream_service import MarketState, MarketStreamService
+
+
+def test_stream_stays_open_while_another_holder_needs_it(monkeypatch):
+    stream = MarketStreamService(MarketState(), url="ws://unused")
+    monkeypatch.setattr(stream, "ensure_started", lambda: None)
+
+    async def run():
+        await stream.subscribe_tickers(["BTC"])
+        await stream.subscribe_tickers(["BTC", "ETH"], holder="alerts")
+        await stream.unsubscribe_tickers(["BTC", "ETH"], holder="alerts")
+        return set(stream.streams)
+
+    assert asyncio.run(run()) == {"btcusdt@ticker", "btcusdt@trade"}
+
+    asyncio.run(stream.unsubscribe_tickers(["BTC"], holder="market"))
+    assert stream.streams == set()
+    assert stream.holders == {}
+
+
+def ticker_event(price, time=1000):
+    return {
+        "e": "24hrTicker",
+        "E": time,
+        "s": "BTCUSDT",
+        "c": str(price),
+        "p": "1.5",
+        "P": "1.2",
+        "q": "1000",
+        "h": "110",
+        "l": "90",
+    }
+
+
+TRADE_EVENT = {
+    "e": "trade",
+    "E": 1001,
+    "s": "BTCUSDT",
+    "p": "101.5",
+    "q": "0.2",
+    "T": 1001,
+}
+KLINE_EVENT = {
+    "e": "kline",
+    "E": 1002,
+    "s": "BTCUSDT",
+    "k": {
+        "t": 0,
+        "i": "1m",
+        "o": "1",
+        "h": "2",
+        "l": "0.5",
+        "c": "1.5",
+        "v": "3",
+        "x": True,
+    },
+}
+# Not subscribed, so never replayed
+ETH_EVENT = dict(ticker_event(5), s="ETHUSDT")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_trade_refreshes_ticker_price():
+    state = MarketState()
+    updates = []
+    state.add_listener(lambda symbol, ticker: updates.append(ticker["price"]))
+
+    # A trade without a ticker to merge into is only recorded
+    state.update_trade("BTC", {"price": 99.0, "quantity": 1.0, "time": 1})
+    assert state.get_ticker("BTC", max_age=10) is None
+
+    state.update_ticker("BTC", {"symbol": "BTC", "price": 100.0, "timestamp": 1})
+    state.update_trade("BTC", {"price": 101.0, "quantity": 1.0, "time": 2})
+
+    ticker = state.get_ticker("BTC", max_age=10)
+    assert (ticker["price"], ticker["timestamp"]) == (101.0, 2)
+    assert updates == [100.0, 101.0]
+
+
+def test_stale_data_is_not_served():
+    state = MarketState()
+    state.update_ticker("BTC", {"price": 1.0})
+    state.update_kline("BTC", "1m", {"close": 1.0})
+    state.tickers["BTC"]["received_at"] -= 20
+    state.klines[("BTC", "1m")]["received_at"] -= 20
+
+    assert state.get_ticker("BTC", max_age=10) is None
+    assert state.get_kline("BTC", "1m", max_age=10) is None
+    assert state.get_kline("BTC", "1m", max_age=30)["close"] == 1.0
+
+
+def test_replayed_stream_feeds_market_state():
+    port = free_port()
+    server = StreamReplayServer(
+        [ticker_event(100), ETH_EVENT, TRADE_EVENT, KLINE_EVENT]
+    )
+    state = MarketState()
+    stream = MarketStreamService(state, url=f"ws://127.0.0.1:{port}/ws")
+
+    async def run():
+        await server.start(port=port)
+        try:
+            await stream.subscribe_tickers(["BTC"])
+            await stream.subscribe_kline("BTC", "1m")
+            await wait_for(lambda: state.klines)
+        finally:
+            await stream.stop()
+            await server.stop()
+
+    asyncio.run(run())
+
+    ticker = state.get_ticker("BTC", max_age=10)
+    assert ticker["price"] == 101.5
+    assert ticker["timestamp"] == 1001
+    assert ticker["change_percent_24h"] == 1.2
+    assert state.trades["BTC"]["quantity"] == 0.2
+    kline = state.get_kline("BTC", "1m", max_age=10)
+    assert (kline["close"], kline["volume"], kline["closed"]) == (1.5, 3.0, True)
+    assert "ETH" not in state.tickers
+
+
+def test_stream_reconnects_with_backoff_and_resubscribes(monkeypatch):
+    monkeypatch.setattr(settings, "MARKET_STREAM_MAX_BACKOFF", 4)
+    backoffs = []
+    real_sleep = asyncio.sleep
+
+    async def fast_sleep(delay):
+        # Record reconnect delays but wait only briefly
+        if delay >= 1:
+            backoffs.append(delay)
+            delay = 0.01
+        await real_sleep(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", fast_sleep)
+
+    port = free_port()
+    url = f"ws://127.0.0.1:{port}/ws"
+    state = MarketState()
+    stream = MarketStreamService(state, url=url)
+
+    async def run():
+        first = StreamReplayServer([ticker_event(100)])
+        await first.start(port=port)
+        await stream.subscribe_tickers(["BTC"])
+        await wait_for(lambda: "BTC" in state.tickers)
+
+        # The exchange goes away for a few reconnect attempts
+        await first.stop()
+        await wait_for(lambda: len(backoffs) >= 4)
+        assert backoffs[:4] == [1.0, 2.0, 4, 4]
+
+        second = StreamReplayServer([ticker_event(200)])
+        await second.start(port=port)
+        try:
+            await wait_for(lambda: state.tickers["BTC"]["price"] == 200.0)
+            assert stream.is_connected
+            failures = len(backoffs)
+        finally:
+            await second.stop()
+
+        # A successful connection resets the backoff
+        await wait_for(lambda: len(backoffs) > failures)
+        assert backoffs[failures] == 1.0
+        await stream.stop()
+
+    asyncio.run(run())
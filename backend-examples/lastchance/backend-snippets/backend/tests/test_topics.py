@@ -0,0 +1,76 @@
+import pytest
+
+from websocket.topics import (
+    DEFAULT_SYMBOLS,
+    TopicIndex,
+    expand_topics,
+    make_topic,
+    parse_topic,
+)
+
+
+@pytest.mark.parametrize(
+    "args, topic",
+    [
+        (("market_data", "btc"), "market_data:BTC"),
+        (("signals", "eth"), "signals:ETH:1h"),
+        (("predictions", "ETH", "4h"), "predictions:ETH:4h"),
+        (("market_data", "BTC", "4h"), "market_data:BTC"),
+        (("alerts", "BTC"), "alerts"),
+        (("signals",), "signals"),
+    ],
+)
+def test_make_topic(args, topic):
+    assert make_topic(*args) == topic
+
+
+@pytest.mark.parametrize(
+    "topic, parts",
+    [
+        ("alerts", ("alerts", None, None)),
+        ("market_data:BTC", ("market_data", "BTC", None)),
+        ("signals:ETH:4h", ("signals", "ETH", "4h")),
+        ("signals::4h", ("signals", None, "4h")),
+    ],
+)
+def test_parse_topic(topic, parts):
+    assert parse_topic(topic) == parts
+
+
+def test_expand_topics():
+    assert expand_topics("signals:eth") == ["signals:ETH:1h"]
+    assert expand_topics("portfolio") == ["portfolio"]
+    assert expand_topics("predictions::4h") == [
+        f"predictions:{symbol}:4h" for symbol in DEFAULT_SYMBOLS
+    ]
+
+
+def test_topic_index_tracks_both_directions():
+    index = TopicIndex()
+    index.subscribe("a", "signals:BTC:1h")
+    index.subscribe("a", "signals:ETH:1h")
+    index.subscribe("b", "signals:BTC:1h")
+    index.subscribe("b", "alerts")
+
+    assert index.subscribers("signals:BTC:1h") == {"a", "b"}
+    assert index.topics("signals") == ["signals:BTC:1h", "signals:ETH:1h"]
+    assert index.topics("alerts") == ["alerts"]
+    assert index.subscribers("signals:SOL:1h") == set()
+
+
+def test_unused_topics_are_dropped():
+    index = TopicIndex()
+    index.subscribe("a", "signals:BTC:1h")
+    index.subscribe("b", "signals:BTC:1h")
+    index.subscribe("b", "market_data:BTC")
+
+    index.unsubscribe("a", "signals:BTC:1h")
+    assert index.topics("signals") == ["signals:BTC:1h"]
+
+    index.remove_subscriber("b")
+    assert index.topic_subscribers == {}
+    assert index.channel_topics == {}
+    assert "b" not in index.subscriber_topics
+
+    # Unsubscribing from an unknown topic is a no-op
+    index.unsubscribe("a", "signals:BTC:1h")
@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import socket
+
+import pytest
+
+pytest.importorskip("uvicorn")
+ws_fanout = pytest.importorskip("benchmarks.ws_fanout")
+
+from benchmarks.ws_fanout import FanoutBenchmark, SyntheticMarket, percentile
+from services.message_bus import InMemoryMessageBus
+
+
+def make_args(**overrides):
+    args = dict(
+        clients=6,
+        users=3,
+        symbols=4,
+        topics=2,
+        skew=1.0,
+        interval=0.05,
+        duration=0.5,
+        drain=0.3,
+        connect_batch=200,
+        port=0,
+        seed=0,
+        json=True,
+        no_deflate=False,
+    )
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def test_percentile_is_nearest_rank():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 99) == 5.0
+    assert percentile(values, 0) == 1.0
+    assert percentile([], 50) == 0.0
+
+
+def test_synthetic_market_is_reproducible():
+    first, second = SyntheticMarket(["A", "B"], seed=1), SyntheticMarket(["A", "B"], 1)
+    assert [first.tick("A")["price"] for _ in range(3)] == [
+        second.tick("A")["price"] for _ in range(3)
+    ]
+
+
+def test_subscription_mix_picks_distinct_topics():
+    benchmark = FanoutBenchmark(make_args(symbols=3, topics=5))
+    topics = benchmark.subscription_mix()
+    assert sorted(topics) == [
+        "market_data:S000",
+        "market_data:S001",
+        "market_data:S002",
+    ]
+
+
+def test_small_run_delivers_every_update(monkeypatch):
+    pytest.importorskip("jose")
+    monkeypatch.setattr(ws_fanout.connection_manager, "is_running", False)
+    monkeypatch.setattr(
+        "websocket.manager.message_bus", InMemoryMessageBus(), raising=True
+    )
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    result = asyncio.run(FanoutBenchmark(make_args(port=port)).run())
+
+    assert result["connected"] == 6
+    assert result["updates_published"] > 0
+    assert result["messages_received"] == result["messages_expected"] > 0
+    assert result["sequence_gaps"] == 0
+    assert result["manager"]["dropped"] == 0
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from fastapi import WebSocket
+
+from config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+ErrorHandler = Callable[["ClientConnection", Exception], Any]
+
+# What to do when a connection's outbound queue is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_CONFLATE = "conflate"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_CONFLATE, OVERFLOW_DISCONNECT)
+
+
+class SlowConsumerError(Exception):
+    """Raised for a connection whose outbound queue overflowed."""
+
+
+def encode_message(message: dict) -> str:
+    """Serialize an outbound message, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(message, default=str).decode()
+    return json.dumps(message, default=str)
+
+
+class ClientConnection:
+    """
+    A WebSocket paired with a bounded outbound queue and a writer task.
+
+    Messages are serialized once by the caller and enqueued without awaiting
+    the network, so a slow client never holds up the code that produced the
+    message. The writer task is the only coroutine that sends on the socket.
+
+    When the queue is full the overflow policy decides what happens:
+
+    - ``drop_oldest``: discard the oldest queued message
+    - ``conflate``: replace a queued message with the same conflation key
+      (e.g. the same update type and symbol), dropping the oldest otherwise
+    - ``disconnect``: close the connection as a slow consumer
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        max_queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        overflow_policy: str = settings.WS_OVERFLOW_POLICY,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.connection_id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.user_id = user_id
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+
+        # Entries are [conflation_key, payload] so conflation can swap payloads
+        self.queue: Deque[List] = deque()
+        self._pending: Dict[str, List] = {}
+        self._ready = asyncio.Event()
+        self.writer_task: Optional[asyncio.Task] = None
+        self._on_error: Optional[ErrorHandler] = None
+
+        self.sent = 0
+        self.dropped = 0
+        self.conflated = 0
+
+    def start(self, on_error: ErrorHandler):
+        """Start draining the outbound queue."""
+        self._on_error = on_error
+        self.writer_task = asyncio.create_task(self._drain())
+
+    def enqueue(self, payload: str, conflation_key: Optional[str] = None):
+        """Queue an already encoded message for delivery."""
+        if self.overflow_policy == OVERFLOW_CONFLATE and conflation_key:
+            entry = self._pending.get(conflation_key)
+            if entry is not None:
+                entry[1] = payload
+                self.conflated += 1
+                return
+
+        if len(self.queue) >= self.max_queue_size:
+            if self.overflow_policy == OVERFLOW_DISCONNECT:
+                self.dropped += 1
+                self._fail(SlowConsumerError("Outbound queue overflow"))
+                return
+            self._forget(self.queue.popleft())
+            self.dropped += 1
+
+        entry = [conflation_key, payload]
+        self.queue.append(entry)
+        if conflation_key:
+            self._pending[conflation_key] = entry
+        self._ready.set()
+
+    def _forget(self, entry: List):
+        key = entry[0]
+        if key and self._pending.get(key) is entry:
+            del self._pending[key]
+
+    async def _drain(self):
+        while True:
+            if not self.queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            entry = self.queue.popleft()
+            self._forget(entry)
+            try:
+                await self.websocket.send_text(entry[1])
+                self.sent += 1
+            except Exception as e:
+                self._fail(e)
+                return
+
+    def _fail(self, error: Exception):
+        if self._on_error is not None:
+            self._on_error(self, error)
+
+    def close(self):
+        """Stop the writer task; queued messages are discarded."""
+        if self.writer_task and not self.writer_task.done():
+            self.writer_task.cancel()
+        self.queue.clear()
+        self._pending.clear()
+
+    def get_stats(self) -> Dict:
+        """Delivery counters for this connection."""
+        return {
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+        }
@@ -0,0 +1,85 @@
+from typing import Any, Dict, Optional, Tuple
+
+
+class DeltaEncoder:
+    """
+    Tracks the last state sent per topic and encodes updates as deltas.
+
+    Each topic carries a sequence number that increases by one with every
+    update. Clients apply ``changes`` on top of the snapshot they hold and
+    request a resync when a sequence number is skipped.
+
+    With ``snapshot_every`` set, every update whose sequence number is a
+    multiple of it is sent as a full snapshot, so a receiver that started
+    late or missed a message recovers within that many updates.
+    """
+
+    def __init__(self, snapshot_every: int = 0):
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.sequences: Dict[str, int] = {}
+        self.snapshot_every = snapshot_every
+
+    def update(self, topic: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Record a new state for ``topic``.
+
+        Returns:
+            None when nothing changed, otherwise a dict with ``seq`` and
+            either ``snapshot`` (first state of the topic, or a periodic
+            full state) or ``changes`` and ``removed`` (fields that differ
+            from the previous state)
+        """
+        previous = self.states.get(topic)
+        if previous is None:
+            self.states[topic] = dict(data)
+            self.sequences[topic] = 1
+            return {"seq": 1, "snapshot": dict(data)}
+
+        changes = {
+            field: value
+            for field, value in data.items()
+            if field not in previous or previous[field] != value
+        }
+        removed = [field for field in previous if field not in data]
+        if not changes and not removed:
+            return None
+
+        self.states[topic] = dict(data)
+        seq = self.sequences[topic] = self.sequences[topic] + 1
+        if self.snapshot_every and seq % self.snapshot_every == 0:
+            return {"seq": seq, "snapshot": dict(data)}
+        return {"seq": seq, "changes": changes, "removed": removed}
+
+    def apply(self, topic: str, message: Dict[str, Any]):
+        """
+        Mirror a snapshot or delta message produced by another worker.
+
+        Messages at or below the topic's current sequence number are ignored,
+        so applying the messages this encoder produced itself is a no-op.
+        After a gap the topic is dropped until the next snapshot arrives.
+        """
+        seq = message["seq"]
+        if seq <= self.sequences.get(topic, 0):
+            return
+
+        if "data" in message:
+            self.states[topic] = dict(message["data"])
+        elif seq == self.sequences.get(topic, 0) + 1:
+            state = self.states[topic]
+            state.update(message["changes"])
+            for field in message["removed"]:
+                state.pop(field, None)
+        else:
+            # A missed message, or a delta before any snapshot; wait for
+            # the next periodic snapshot
+            self.states.pop(topic, None)
+            self.sequences.pop(topic, None)
+            return
+
+        self.sequences[topic] = seq
+
+    def snapshot(self, topic: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Return (seq, state) for ``topic``, or None if nothing was sent yet."""
+        if topic not in self.states:
+            return None
+        return self.sequences[topic], dict(self.states[topic])
@@ -1,31 +1,55 @@
 import asyncio
-import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Set
 
 from api.deps import get_current_user_from_token
 from db.database import AsyncSessionLocal
-from db.redis_client import redis_client
 from fastapi import WebSocket, WebSocketDisconnect
 from models.user import User
+from services.alert_engine import alert_engine
 from services.alert_service import alert_service
 from services.market_service import MarketService
+from services.cluster import coordinator
+from services.message_bus import (ALERT_NOTIFICATIONS_CHANNEL,
+                                  WS_BROADCAST_CHANNEL,
+                                  drain_legacy_notifications, message_bus)
 from services.signal_service import signal_service
+from services.stream_service import market_state, market_stream
 from sqlalchemy.ext.asyncio import AsyncSession
+from websocket.connection import (ClientConnection, SlowConsumerError,
+                                  encode_message)
+from websocket.deltas import DeltaEncoder
+from websocket.topics import TopicIndex, expand_topics, make_topic, parse_topic
+
+from config import settings
 
 logger = logging.getLogger(__name__)
 
 
 class ConnectionManager:
-    """Manages WebSocket connections with channel multiplexing."""
+    """
+    Manages WebSocket connections with topic multiplexing.
+
+    With several worker processes, one leader computes market, prediction
+    and signal updates for the topics subscribed on any worker and
+    publishes them on the message bus. Every worker, the leader included,
+    fans the published updates out to its own sockets.
+    """
 
     def __init__(self):
-        self.active_connections: Dict[int, WebSocket] = {}
-        self.user_channels: Dict[int, Set[str]] = {}
-        self.channel_subscribers: Dict[str, Set[int]] = {}
+        # Connections are identified by id, so one user can hold several
+        self.active_connections: Dict[str, ClientConnection] = {}
+        self.user_connections: Dict[int, Set[str]] = {}
+        self.topics = TopicIndex()
+        self.deltas = DeltaEncoder(settings.WS_DELTA_SNAPSHOT_EVERY)
         self.market_service = MarketService()
         self.is_running = False
+        self.is_leader = False
+
+        # Delivery counters of connections that have already been closed
+        self.closed_stats = {"sent": 0, "dropped": 0, "conflated": 0}
+        self.slow_consumer_disconnects = 0
 
         # Channel types
         self.channels = {
@@ -36,143 +60,267 @@ class ConnectionManager:
             "portfolio": self._handle_portfolio,
         }
 
-    async def connect(self, websocket: WebSocket, user_id: int):
-        """Accept a new WebSocket connection."""
+    async def connect(self, websocket: WebSocket, user_id: int) -> str:
+        """Accept a new WebSocket connection and return its connection id."""
         await websocket.accept()
-        self.active_connections[user_id] = websocket
-        self.user_channels[user_id] = set()
 
-        logger.info(f"WebSocket connected for user {user_id}")
+        connection = ClientConnection(websocket, user_id)
+        connection.start(self._on_send_error)
+        self.active_connections[connection.connection_id] = connection
+        self.user_connections.setdefault(user_id, set()).add(
+            connection.connection_id
+        )
+
+        logger.info(
+            f"WebSocket {connection.connection_id} connected for user {user_id}"
+        )
 
-        # Start monitoring if not already running
-        if not self.is_running:
-            await self.start_monitoring()
+        return connection.connection_id
 
-    def disconnect(self, user_id: int):
+    def disconnect(self, connection_id: str):
         """Handle WebSocket disconnection."""
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
+        connection = self.active_connections.pop(connection_id, None)
+        if connection is None:
+            return
 
-        # Remove user from all channels
-        if user_id in self.user_channels:
-            for channel in self.user_channels[user_id]:
-                if channel in self.channel_subscribers:
-                    self.channel_subscribers[channel].discard(user_id)
-            del self.user_channels[user_id]
+        connection.close()
+        for counter in self.closed_stats:
+            self.closed_stats[counter] += getattr(connection, counter)
 
-        logger.info(f"WebSocket disconnected for user {user_id}")
+        user_connections = self.user_connections.get(connection.user_id)
+        if user_connections is not None:
+            user_connections.discard(connection_id)
+            if not user_connections:
+                del self.user_connections[connection.user_id]
 
-    async def send_personal_message(self, message: dict, user_id: int):
-        """Send message to a specific user."""
-        if user_id in self.active_connections:
-            try:
-                await self.active_connections[user_id].send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending message to user {user_id}: {e}")
-                self.disconnect(user_id)
+        # Remove the connection from all of its topics
+        self.topics.remove_subscriber(connection_id)
 
-    async def broadcast_to_channel(self, message: dict, channel: str):
-        """Broadcast message to all subscribers of a channel."""
-        if channel in self.channel_subscribers:
-            for user_id in self.channel_subscribers[channel].copy():
-                await self.send_personal_message(message, user_id)
+        logger.info(
+            f"WebSocket {connection_id} disconnected for user {connection.user_id}"
+        )
 
-    async def subscribe_to_channel(self, user_id: int, channel: str):
-        """Subscribe user to a channel."""
-        if channel not in self.channels:
-            await self.send_personal_message(
-                {"type": "error", "message": f"Unknown channel: {channel}"}, user_id
-            )
+    def _on_send_error(self, connection: ClientConnection, error: Exception):
+        """Drop a connection that failed to send or fell too far behind."""
+        if self.active_connections.get(connection.connection_id) is not connection:
             return
 
-        # Add user to channel
-        if user_id not in self.user_channels:
-            self.user_channels[user_id] = set()
+        if isinstance(error, SlowConsumerError):
+            logger.warning(f"Disconnecting slow consumer {connection.connection_id}")
+            self.slow_consumer_disconnects += 1
+            asyncio.create_task(
+                connection.websocket.close(code=1008, reason="Slow consumer")
+            )
+        else:
+            logger.error(
+                f"Error sending message to {connection.connection_id}: {error}"
+            )
+
+        self.disconnect(connection.connection_id)
+
+    def get_stats(self) -> Dict:
+        """Aggregate delivery counters across open and closed connections."""
+        totals = dict(self.closed_stats)
+        queued = 0
+        for connection in self.active_connections.values():
+            stats = connection.get_stats()
+            queued += stats["queued"]
+            for counter in totals:
+                totals[counter] += stats[counter]
+
+        return {
+            "connections": len(self.active_connections),
+            "users": len(self.user_connections),
+            "queued": queued,
+            **totals,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+        }
+
+    async def send_personal_message(self, message: dict, user_id: int):
+        """Send message to every connection of a specific user."""
+        connection_ids = self.user_connections.get(user_id)
+        if not connection_ids:
+            return
 
-        self.user_channels[user_id].add(channel)
+        payload = encode_message(message)
+        # enqueue() can disconnect a slow consumer, which edits the set
+        for connection_id in list(connection_ids):
+            connection = self.active_connections.get(connection_id)
+            if connection:
+                connection.enqueue(payload)
+
+    async def send_to_connection(self, message: dict, connection_id: str):
+        """Send message to a single connection."""
+        connection = self.active_connections.get(connection_id)
+        if connection:
+            connection.enqueue(encode_message(message))
+
+    async def broadcast_to_topic(
+        self, message: dict, topic: str, conflate: bool = True
+    ):
+        """
+        Broadcast message to all subscribers of a topic.
+
+        Pass ``conflate=False`` for messages that must not replace each
+        other in a queue, such as deltas.
+        """
+        subscribers = self.topics.subscribers(topic)
+        if not subscribers:
+            return
 
-        if channel not in self.channel_subscribers:
-            self.channel_subscribers[channel] = set()
+        # Serialize once and let each connection's writer task deliver it.
+        # Queued updates of the same type and topic may be conflated.
+        payload = encode_message(message)
+        conflation_key = f"{message.get('type')}:{topic}" if conflate else None
+        for connection_id in subscribers.copy():
+            connection = self.active_connections.get(connection_id)
+            if connection:
+                connection.enqueue(payload, conflation_key)
+
+    async def subscribe_to_topic(self, connection_id: str, topic: str):
+        """Subscribe a connection to ``channel`` or ``channel:symbol[:timeframe]``."""
+        channel = parse_topic(topic)[0]
+        if channel not in self.channels:
+            await self.send_to_connection(
+                {"type": "error", "message": f"Unknown channel: {channel}"},
+                connection_id,
+            )
+            return
 
-        self.channel_subscribers[channel].add(user_id)
+        topics = expand_topics(topic)
+        for canonical in topics:
+            self.topics.subscribe(connection_id, canonical)
 
         # Send confirmation
-        await self.send_personal_message(
-            {"type": "subscription", "channel": channel, "status": "subscribed"},
-            user_id,
+        await self.send_to_connection(
+            {
+                "type": "subscription",
+                "channel": channel,
+                "topics": topics,
+                "status": "subscribed",
+            },
+            connection_id,
         )
 
-        logger.info(f"User {user_id} subscribed to channel {channel}")
+        logger.info(f"Connection {connection_id} subscribed to {topics}")
+        await self._publish_interest()
 
-    async def unsubscribe_from_channel(self, user_id: int, channel: str):
-        """Unsubscribe user from a channel."""
-        if user_id in self.user_channels:
-            self.user_channels[user_id].discard(channel)
+        for canonical in topics:
+            await self._send_snapshot(connection_id, canonical)
 
-        if channel in self.channel_subscribers:
-            self.channel_subscribers[channel].discard(user_id)
+    async def _send_snapshot(self, connection_id: str, topic: str):
+        """Send the current delta-encoded state of a topic, if there is one."""
+        snapshot = self.deltas.snapshot(topic)
+        if snapshot is None:
+            return
+
+        seq, data = snapshot
+        channel, symbol, _ = parse_topic(topic)
+        await self.send_to_connection(
+            {
+                "type": f"{channel}_snapshot",
+                "topic": topic,
+                "symbol": symbol,
+                "seq": seq,
+                "data": data,
+                "timestamp": datetime.utcnow().isoformat(),
+            },
+            connection_id,
+        )
+
+    async def unsubscribe_from_topic(self, connection_id: str, topic: str):
+        """Unsubscribe a connection from a topic."""
+        channel = parse_topic(topic)[0]
+        topics = expand_topics(topic)
+        for canonical in topics:
+            self.topics.unsubscribe(connection_id, canonical)
 
         # Send confirmation
-        await self.send_personal_message(
-            {"type": "subscription", "channel": channel, "status": "unsubscribed"},
-            user_id,
+        await self.send_to_connection(
+            {
+                "type": "subscription",
+                "channel": channel,
+                "topics": topics,
+                "status": "unsubscribed",
+            },
+            connection_id,
         )
 
-        logger.info(f"User {user_id} unsubscribed from channel {channel}")
+        logger.info(f"Connection {connection_id} unsubscribed from {topics}")
+
+    @staticmethod
+    def _requested_topic(message: dict) -> Optional[str]:
+        """Read a topic from ``topic`` or from ``channel`` and ``symbol``."""
+        if message.get("topic"):
+            return message["topic"]
+        if message.get("channel"):
+            return make_topic(
+                message["channel"], message.get("symbol"), message.get("timeframe")
+            )
+        return None
 
-    async def handle_message(self, user_id: int, message: dict):
+    async def handle_message(self, connection_id: str, message: dict):
         """Handle incoming WebSocket message."""
         try:
             message_type = message.get("type")
 
             if message_type == "subscribe":
-                channel = message.get("channel")
-                if channel:
-                    await self.subscribe_to_channel(user_id, channel)
+                topic = self._requested_topic(message)
+                if topic:
+                    await self.subscribe_to_topic(connection_id, topic)
 
             elif message_type == "unsubscribe":
-                channel = message.get("channel")
-                if channel:
-                    await self.unsubscribe_from_channel(user_id, channel)
+                topic = self._requested_topic(message)
+                if topic:
+                    await self.unsubscribe_from_topic(connection_id, topic)
+
+            elif message_type == "resync":
+                topic = self._requested_topic(message)
+                if topic:
+                    for canonical in expand_topics(topic):
+                        await self._send_snapshot(connection_id, canonical)
 
             elif message_type == "ping":
-                await self.send_personal_message({"type": "pong"}, user_id)
+                await self.send_to_connection({"type": "pong"}, connection_id)
 
             elif message_type == "request_data":
                 channel = message.get("channel")
                 symbol = message.get("symbol")
                 if channel and symbol:
-                    await self._handle_data_request(user_id, channel, symbol)
+                    await self._handle_data_request(connection_id, channel, symbol)
 
             else:
-                await self.send_personal_message(
+                await self.send_to_connection(
                     {
                         "type": "error",
                         "message": f"Unknown message type: {message_type}",
                     },
-                    user_id,
+                    connection_id,
                 )
 
         except Exception as e:
-            logger.error(f"Error handling message from user {user_id}: {e}")
-            await self.send_personal_message(
-                {"type": "error", "message": "Internal server error"}, user_id
+            logger.error(f"Error handling message from {connection_id}: {e}")
+            await self.send_to_connection(
+                {"type": "error", "message": "Internal server error"},
+                connection_id,
             )
 
-    async def _handle_data_request(self, user_id: int, channel: str, symbol: str):
-        """Handle data request from user."""
+    async def _handle_data_request(
+        self, connection_id: str, channel: str, symbol: str
+    ):
+        """Handle data request from a connection."""
         try:
             if channel == "market_data":
                 # Get current market data
                 market_data = await self.market_service.get_market_data([symbol])
                 if market_data:
-                    await self.send_personal_message(
+                    await self.send_to_connection(
                         {
                             "type": "market_data",
                             "symbol": symbol,
                             "data": market_data[0],
                         },
-                        user_id,
+                        connection_id,
                     )
 
             elif channel == "predictions":
@@ -195,9 +343,9 @@ class ConnectionManager:
                     )
                     prediction["symbol"] = symbol
 
-                    await self.send_personal_message(
+                    await self.send_to_connection(
                         {"type": "prediction", "symbol": symbol, "data": prediction},
-                        user_id,
+                        connection_id,
                     )
 
             elif channel == "signals":
@@ -206,44 +354,53 @@ class ConnectionManager:
                     symbol, "1h", "combined"
                 )
                 if signals:
-                    await self.send_personal_message(
+                    await self.send_to_connection(
                         {
                             "type": "signals",
                             "symbol": symbol,
                             "data": signals[-1],  # Latest signal
                         },
-                        user_id,
+                        connection_id,
                     )
 
             elif channel == "alerts":
                 # Get user's alerts for symbol
+                connection = self.active_connections.get(connection_id)
+                if connection is None:
+                    return
+                user_id = connection.user_id
                 async with AsyncSessionLocal() as db:
                     alerts = await alert_service.get_user_alerts(db, user_id)
                     symbol_alerts = [
                         alert for alert in alerts if alert.symbol == symbol
                     ]
 
-                    await self.send_personal_message(
+                    await self.send_to_connection(
                         {
                             "type": "alerts",
                             "symbol": symbol,
                             "data": [alert.__dict__ for alert in symbol_alerts],
                         },
-                        user_id,
+                        connection_id,
                     )
 
         except Exception as e:
             logger.error(f"Error handling data request: {e}")
-            await self.send_personal_message(
+            await self.send_to_connection(
                 {
                     "type": "error",
                     "message": f"Failed to get {channel} data for {symbol}",
                 },
-                user_id,
+                connection_id,
             )
 
     async def start_monitoring(self):
-        """Start background monitoring for all channels."""
+        """
+        Start background monitoring for all channels.
+
+        Called once on application startup, so leader election and the
+        alert engine run whether or not any client is connected.
+        """
         if self.is_running:
             return
 
@@ -251,10 +408,73 @@ class ConnectionManager:
         logger.info("Starting WebSocket monitoring")
 
         # Start monitoring tasks
+        asyncio.create_task(self._coordinate())
+        asyncio.create_task(self._consume_broadcasts())
         asyncio.create_task(self._monitor_market_data())
         asyncio.create_task(self._monitor_predictions())
         asyncio.create_task(self._monitor_signals())
         asyncio.create_task(self._monitor_alerts())
+        asyncio.create_task(self._bridge_legacy_notifications())
+        asyncio.create_task(self._start_alert_engine())
+
+    async def _start_alert_engine(self):
+        """Evaluate price and volume alerts on streamed market data."""
+        try:
+            asyncio.create_task(alert_engine.sync(AsyncSessionLocal))
+            await alert_engine.start(AsyncSessionLocal, market_state, market_stream)
+        except Exception as e:
+            logger.error(f"Error starting alert engine: {e}")
+
+    async def _coordinate(self):
+        """Renew leadership and report this worker's topics to the leader."""
+        while self.is_running:
+            try:
+                self.is_leader = await coordinator.acquire_leadership()
+            except Exception as e:
+                logger.error(f"Error acquiring WebSocket leadership: {e}")
+                self.is_leader = False
+
+            alert_engine.set_active(self.is_leader)
+            await self._publish_interest()
+            await asyncio.sleep(settings.CLUSTER_HEARTBEAT_SECONDS)
+
+    async def _publish_interest(self):
+        try:
+            await coordinator.publish_interest(list(self.topics.topic_subscribers))
+        except Exception as e:
+            logger.error(f"Error publishing topic interest: {e}")
+
+    async def _cluster_topics(self, channel: str) -> List[str]:
+        """Topics of ``channel`` subscribed to on any worker."""
+        topics = set(self.topics.topics(channel))
+        for topic in await coordinator.interested_topics():
+            if parse_topic(topic)[0] == channel:
+                topics.add(topic)
+        return sorted(topics)
+
+    async def publish_to_topic(self, message: dict, topic: str, conflate: bool = True):
+        """Publish an update for every worker to deliver to its subscribers."""
+        await message_bus.publish(
+            WS_BROADCAST_CHANNEL,
+            {"topic": topic, "conflate": conflate, "message": message},
+        )
+
+    async def _consume_broadcasts(self):
+        """Deliver updates published by the leader to local subscribers."""
+        while self.is_running:
+            try:
+                async for envelope in message_bus.subscribe(WS_BROADCAST_CHANNEL):
+                    message = envelope["message"]
+                    if message["type"] in ("market_data_snapshot", "market_data_delta"):
+                        self.deltas.apply(envelope["topic"], message)
+
+                    await self.broadcast_to_topic(
+                        message, envelope["topic"], envelope["conflate"]
+                    )
+
+            except Exception as e:
+                logger.error(f"Error consuming WebSocket broadcasts: {e}")
+                await asyncio.sleep(1)
 
     async def stop_monitoring(self):
         """Stop background monitoring."""
@@ -265,76 +485,110 @@ class ConnectionManager:
         """Monitor market data and send updates."""
         while self.is_running:
             try:
-                if (
-                    "market_data" in self.channel_subscribers
-                    and self.channel_subscribers["market_data"]
-                ):
-                    # Get market data for subscribed symbols
-                    symbols = ["BTC", "ETH", "BNB", "ADA", "SOL"]  # Default symbols
-                    market_data = await self.market_service.get_market_data(symbols)
-
-                    if market_data:
-                        await self.broadcast_to_channel(
-                            {
-                                "type": "market_data_update",
-                                "data": market_data,
-                                "timestamp": datetime.utcnow().isoformat(),
-                            },
-                            "market_data",
-                        )
+                # Only the leader fetches, and only symbols somebody watches
+                topics = {}
+                if self.is_leader:
+                    topics = {
+                        parse_topic(topic)[1]: topic
+                        for topic in await self._cluster_topics("market_data")
+                    }
+
+                if topics:
+                    market_data = await self.market_service.get_market_data(
+                        list(topics)
+                    )
+
+                    for item in market_data:
+                        topic = topics.get(item["symbol"])
+                        if topic:
+                            await self._broadcast_market_delta(topic, item)
 
-                await asyncio.sleep(30)  # Update every 30 seconds
+                # Streamed data is read from memory, so it can be pushed often
+                if market_stream.is_connected:
+                    await asyncio.sleep(settings.MARKET_STREAM_PUSH_INTERVAL)
+                else:
+                    await asyncio.sleep(30)  # Update every 30 seconds
 
             except Exception as e:
                 logger.error(f"Error in market data monitoring: {e}")
                 await asyncio.sleep(30)
 
+    async def _broadcast_market_delta(self, topic: str, item: dict):
+        """
+        Send only the fields of ``item`` that changed since the last update.
+
+        The first update of a topic, and every ``WS_DELTA_SNAPSHOT_EVERY``-th
+        one, is sent as a full snapshot, which lets other workers that joined
+        late or missed a message rebuild the topic's state. Every message
+        carries the topic's sequence number so clients can detect gaps and
+        send ``{"type": "resync", "topic": ...}`` to get a new snapshot.
+        """
+        encoded = self.deltas.update(topic, item)
+        if encoded is None:
+            return
+
+        message = {
+            "topic": topic,
+            "symbol": item["symbol"],
+            "seq": encoded["seq"],
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        if "snapshot" in encoded:
+            message["type"] = "market_data_snapshot"
+            message["data"] = encoded["snapshot"]
+        else:
+            message["type"] = "market_data_delta"
+            message["changes"] = encoded["changes"]
+            message["removed"] = encoded["removed"]
+
+        await self.publish_to_topic(message, topic, conflate=False)
+
     async def _monitor_predictions(self):
         """Monitor AI predictions and send updates."""
         while self.is_running:
             try:
-                if (
-                    "predictions" in self.channel_subscribers
-                    and self.channel_subscribers["predictions"]
-                ):
-                    symbols = ["BTC", "ETH", "BNB", "ADA", "SOL"]
+                topics = []
+                if self.is_leader:
+                    topics = await self._cluster_topics("predictions")
 
-                    for symbol in symbols:
-                        try:
-                            from ml.model import crypto_model
+                for topic in topics:
+                    _, symbol, timeframe = parse_topic(topic)
+                    try:
+                        from ml.model import crypto_model
 
-                            if crypto_model.model is None:
-                                crypto_model.build_model()
+                        if crypto_model.model is None:
+                            crypto_model.build_model()
+
+                        candlestick_data = (
+                            await self.market_service.get_candlestick_data(
+                                symbol, timeframe, 100
+                            )
+                        )
+                        indicators = (
+                            await self.market_service.get_technical_indicators(
+                                symbol, timeframe
+                            )
+                        )
 
-                            candlestick_data = (
-                                await self.market_service.get_candlestick_data(
-                                    symbol, "1h", 100
-                                )
+                        if candlestick_data:
+                            prediction = await crypto_model.predict(
+                                candlestick_data, indicators
                             )
-                            indicators = (
-                                await self.market_service.get_technical_indicators(
-                                    symbol, "1h"
-                                )
+                            prediction["symbol"] = symbol
+
+                            await self.publish_to_topic(
+                                {
+                                    "type": "prediction_update",
+                                    "topic": topic,
+                                    "symbol": symbol,
+                                    "data": prediction,
+                                    "timestamp": datetime.utcnow().isoformat(),
+                                },
+                                topic,
                             )
 
-                            if candlestick_data:
-                                prediction = await crypto_model.predict(
-                                    candlestick_data, indicators
-                                )
-                                prediction["symbol"] = symbol
-
-                                await self.broadcast_to_channel(
-                                    {
-                                        "type": "prediction_update",
-                                        "symbol": symbol,
-                                        "data": prediction,
-                                        "timestamp": datetime.utcnow().isoformat(),
-                                    },
-                                    "predictions",
-                                )
-
-                        except Exception as e:
-                            logger.error(f"Error getting prediction for {symbol}: {e}")
+                    except Exception as e:
+                        logger.error(f"Error getting prediction for {topic}: {e}")
 
                 await asyncio.sleep(60)  # Update every minute
 
@@ -346,32 +600,32 @@ class ConnectionManager:
         """Monitor trading signals and send updates."""
         while self.is_running:
             try:
-                if (
-                    "signals" in self.channel_subscribers
-                    and self.channel_subscribers["signals"]
-                ):
-                    symbols = ["BTC", "ETH", "BNB", "ADA", "SOL"]
+                topics = []
+                if self.is_leader:
+                    topics = await self._cluster_topics("signals")
 
-                    for symbol in symbols:
-                        try:
-                            signals = await signal_service.generate_signals(
-                                symbol, "1h", "combined"
+                for topic in topics:
+                    _, symbol, timeframe = parse_topic(topic)
+                    try:
+                        signals = await signal_service.generate_signals(
+                            symbol, timeframe, "combined"
+                        )
+                        if signals:
+                            latest_signal = signals[-1]
+
+                            await self.publish_to_topic(
+                                {
+                                    "type": "signal_update",
+                                    "topic": topic,
+                                    "symbol": symbol,
+                                    "data": latest_signal,
+                                    "timestamp": datetime.utcnow().isoformat(),
+                                },
+                                topic,
                             )
-                            if signals:
-                                latest_signal = signals[-1]
-
-                                await self.broadcast_to_channel(
-                                    {
-                                        "type": "signal_update",
-                                        "symbol": symbol,
-                                        "data": latest_signal,
-                                        "timestamp": datetime.utcnow().isoformat(),
-                                    },
-                                    "signals",
-                                )
-
-                        except Exception as e:
-                            logger.error(f"Error getting signals for {symbol}: {e}")
+
+                    except Exception as e:
+                        logger.error(f"Error getting signals for {topic}: {e}")
 
                 await asyncio.sleep(120)  # Update every 2 minutes
 
@@ -380,51 +634,53 @@ class ConnectionManager:
                 await asyncio.sleep(120)
 
     async def _monitor_alerts(self):
-        """Monitor alerts and send notifications."""
+        """
+        Deliver alert notifications published on the message bus.
+
+        Work is proportional to the number of notifications: each one is
+        routed to the user's connection if that user is connected to this
+        process, and ignored otherwise.
+        """
         while self.is_running:
             try:
-                # Check for new alert notifications in Redis
-                for user_id in self.active_connections:
-                    try:
-                        # Check for WebSocket notifications
-                        notification_key = f"ws_notification:{user_id}:*"
-                        # This would need Redis SCAN implementation
-                        # For now, we'll check specific alert IDs
-
-                        # Get user's active alerts
-                        async with AsyncSessionLocal() as db:
-                            alerts = await alert_service.get_user_alerts(db, user_id)
-
-                            for alert in alerts:
-                                if alert.status == AlertStatus.ACTIVE:
-                                    # Check if there's a notification for this alert
-                                    notification = await redis_client.get(
-                                        f"ws_notification:{user_id}:{alert.id}"
-                                    )
-                                    if notification:
-                                        await self.send_personal_message(
-                                            {
-                                                "type": "alert_notification",
-                                                "data": notification,
-                                                "timestamp": datetime.utcnow().isoformat(),
-                                            },
-                                            user_id,
-                                        )
-
-                                        # Remove notification after sending
-                                        await redis_client.delete(
-                                            f"ws_notification:{user_id}:{alert.id}"
-                                        )
-
-                    except Exception as e:
-                        logger.error(f"Error checking alerts for user {user_id}: {e}")
+                async for notification in message_bus.subscribe(
+                    ALERT_NOTIFICATIONS_CHANNEL
+                ):
+                    if not self.is_running:
+                        break
 
-                await asyncio.sleep(10)  # Check every 10 seconds
+                    await self.send_personal_message(
+                        {
+                            "type": "alert_notification",
+                            "alert_id": notification.get("alert_id"),
+                            "data": notification.get("data"),
+                            "timestamp": datetime.utcnow().isoformat(),
+                        },
+                        notification["user_id"],
+                    )
 
             except Exception as e:
                 logger.error(f"Error in alerts monitoring: {e}")
                 await asyncio.sleep(10)
 
+    async def _bridge_legacy_notifications(self):
+        """
+        Move notifications alert_service writes to ``ws_notification`` keys
+        onto the message bus, where ``_monitor_alerts`` delivers them.
+
+        Only the leader drains the keys. The keys are in Redis, so there is
+        nothing to drain with the in-memory bus.
+        """
+        redis = getattr(message_bus, "redis", None)
+        while self.is_running and redis is not None:
+            try:
+                if self.is_leader:
+                    await drain_legacy_notifications(redis)
+            except Exception as e:
+                logger.error(f"Error draining legacy alert notifications: {e}")
+
+            await asyncio.sleep(10)  # Check every 10 seconds
+
     async def _handle_market_data(self, user_id: int, data: dict):
         """Handle market data channel."""
         pass
@@ -0,0 +1,99 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+# Channels whose updates are computed per symbol
+SYMBOL_CHANNELS = {"market_data", "predictions", "signals"}
+
+# Channels whose updates also depend on a timeframe
+TIMEFRAME_CHANNELS = {"predictions", "signals"}
+
+DEFAULT_TIMEFRAME = "1h"
+
+# Symbols a bare channel subscription (e.g. "market_data") expands to
+DEFAULT_SYMBOLS = ["BTC", "ETH", "BNB", "ADA", "SOL"]
+
+
+def make_topic(
+    channel: str, symbol: Optional[str] = None, timeframe: Optional[str] = None
+) -> str:
+    """
+    Build a canonical topic name of the form ``channel:symbol[:timeframe]``.
+
+    Symbols are upper-cased, timeframe channels default to ``1h`` and
+    channels without per-symbol data are returned unchanged.
+    """
+    if channel not in SYMBOL_CHANNELS or not symbol:
+        return channel
+
+    topic = f"{channel}:{symbol.upper()}"
+    if channel in TIMEFRAME_CHANNELS:
+        topic += f":{timeframe or DEFAULT_TIMEFRAME}"
+    return topic
+
+
+def parse_topic(topic: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Split a topic into (channel, symbol, timeframe)."""
+    parts = topic.split(":")
+    channel = parts[0]
+    symbol = parts[1] if len(parts) > 1 and parts[1] else None
+    timeframe = parts[2] if len(parts) > 2 and parts[2] else None
+    return channel, symbol, timeframe
+
+
+def expand_topics(topic: str) -> List[str]:
+    """
+    Normalize a requested topic into the canonical topics it covers.
+
+    A bare symbol channel expands to one topic per default symbol so that
+    clients subscribing to ``market_data`` keep receiving the usual coins.
+    """
+    channel, symbol, timeframe = parse_topic(topic)
+    if channel in SYMBOL_CHANNELS and not symbol:
+        return [make_topic(channel, s, timeframe) for s in DEFAULT_SYMBOLS]
+    return [make_topic(channel, symbol, timeframe)]
+
+
+class TopicIndex:
+    """Bidirectional index between subscribers (connection ids) and topics."""
+
+    def __init__(self):
+        self.topic_subscribers: Dict[str, Set[str]] = {}
+        self.subscriber_topics: Dict[str, Set[str]] = {}
+        self.channel_topics: Dict[str, Set[str]] = {}
+
+    def subscribe(self, subscriber: str, topic: str):
+        """Add a subscriber to a canonical topic."""
+        self.topic_subscribers.setdefault(topic, set()).add(subscriber)
+        self.subscriber_topics.setdefault(subscriber, set()).add(topic)
+        self.channel_topics.setdefault(parse_topic(topic)[0], set()).add(topic)
+
+    def unsubscribe(self, subscriber: str, topic: str):
+        """Remove a subscriber from a topic, dropping the topic once unused."""
+        topics = self.subscriber_topics.get(subscriber)
+        if topics is not None:
+            topics.discard(topic)
+
+        subscribers = self.topic_subscribers.get(topic)
+        if subscribers is None:
+            return
+
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self.topic_subscribers[topic]
+            channel = parse_topic(topic)[0]
+            self.channel_topics[channel].discard(topic)
+            if not self.channel_topics[channel]:
+                del self.channel_topics[channel]
+
+    def remove_subscriber(self, subscriber: str):
+        """Remove a subscriber from every topic."""
+        for topic in list(self.subscriber_topics.get(subscriber, ())):
+            self.unsubscribe(subscriber, topic)
+        self.subscriber_topics.pop(subscriber, None)
+
+    def subscribers(self, topic: str) -> Set[str]:
+        """Subscribers of a topic (empty if nobody is subscribed)."""
+        return self.topic_subscribers.get(topic, set())
+
+    def topics(self, channel: str) -> List[str]:
+        """Topics of a channel that have at least one subscriber."""
+        return sorted(self.channel_topics.get(channel, ()))
@@ -3,6 +3,7 @@ import logging
 import requests
 import json
 import time
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
 import pandas as pd
@@ -93,20 +94,116 @@ class CacheManager:
         except Exception as e:
             logger.error(f"Cache write error: {e}")
 
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+class OHLCVCache:
+    """Incremental OHLCV cache: only candles after the last cached one are fetched"""
+    def __init__(self, exchange, cache_dir: str = CACHE_DIR, max_candles: int = 5000, min_refresh: float = 5.0):
+        self.exchange = exchange
+        self.cache_dir = cache_dir
+        self.max_candles = max_candles
+        self.min_refresh = min_refresh
+        self.series: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self.fetched_at: Dict[Tuple[str, str], float] = {}
+        self.file_rows: Dict[Tuple[str, str], int] = {}
+        # One lock per series, so a slow fetch only blocks readers of that series
+        self.locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    def get_cache_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.cache_dir, f"ohlcv_{symbol.replace('/', '_')}_{timeframe}.csv")
+
+    @staticmethod
+    def to_frame(ohlcv: List[List]) -> pd.DataFrame:
+        df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df.set_index('timestamp')
+
+    def load(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Read a series from disk; the file is append-only, so later rows win"""
+        path = self.get_cache_path(symbol, timeframe)
+        if not os.path.exists(path):
+            return self.to_frame([])
+        try:
+            df = pd.read_csv(path, index_col='timestamp', parse_dates=['timestamp'])
+            self.file_rows[(symbol, timeframe)] = len(df)
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+            return df.iloc[-self.max_candles:]
+        except Exception as e:
+            logger.error(f"OHLCV cache read error: {e}")
+            return self.to_frame([])
+
+    def save(self, symbol: str, timeframe: str, new: pd.DataFrame, series: pd.DataFrame, rewrite: bool = False) -> None:
+        """Append new and revised candles; rewrite the file when asked, when it could not be read or once it holds too many stale rows"""
+        key = (symbol, timeframe)
+        path = self.get_cache_path(symbol, timeframe)
+        try:
+            if rewrite or key not in self.file_rows or self.file_rows[key] + len(new) > 2 * self.max_candles or not os.path.exists(path):
+                series.to_csv(path)
+                self.file_rows[key] = len(series)
+            else:
+                new.to_csv(path, mode='a', header=False)
+                self.file_rows[key] += len(new)
+        except Exception as e:
+            logger.error(f"OHLCV cache write error: {e}")
+
+    def fetch(self, symbol: str, timeframe: str, limit: int, cached: pd.DataFrame) -> Tuple[pd.DataFrame, bool]:
+        """Fetch candles from the last cached one onwards, or a full window when the cache cannot be extended"""
+        if len(cached) >= limit:
+            since = int(cached.index[-1].value // 10**6)
+            behind = (time.time() * 1000 - since) / (self.exchange.parse_timeframe(timeframe) * 1000)
+            if behind < limit:
+                # Starts with the cached live candle, whose revision replaces it
+                return self.to_frame(self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)), False
+        return self.to_frame(self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)), True
+
+    def get_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self.lock:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def get(self, symbol: str, timeframe: str, limit: int = 500) -> pd.DataFrame:
+        """The last ``limit`` candles; the returned frame is shared, treat it as read-only"""
+        key = (symbol, timeframe)
+        with self.get_lock(key):
+            series = self.series.get(key)
+            if series is None:
+                series = self.load(symbol, timeframe)
+
+            if time.time() - self.fetched_at.get(key, 0) >= self.min_refresh:
+                try:
+                    new, full = self.fetch(symbol, timeframe, limit, series)
+                except Exception as e:
+                    # Serve what is cached; the next rerun tries again
+                    logger.error(f"Error fetching OHLCV data: {e}")
+                    new, full = self.to_frame([]), False
+                self.fetched_at[key] = time.time()
+                if full:
+                    series = new
+                elif not new.empty:
+                    keep = series.index.searchsorted(new.index[0])
+                    series = pd.concat([series.iloc[:keep], new]).iloc[-self.max_candles:]
+                if not new.empty:
+                    self.save(symbol, timeframe, new, series, rewrite=full)
+
+            self.series[key] = series
+            return series.iloc[-limit:]
+
+@st.cache_resource
+def get_ohlcv_cache() -> OHLCVCache:
+    """One OHLCV cache per server process, kept across Streamlit reruns"""
+    return OHLCVCache(exchange)
+
 class MarketData:
     """Handle market data operations"""
     def __init__(self):
         self.cache = CacheManager()
+        self.ohlcv_cache = get_ohlcv_cache()
         self.exchange = exchange
 
     def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 500) -> pd.DataFrame:
-        """Get OHLCV data from exchange"""
+        """Get OHLCV data, fetching only candles newer than the cached ones"""
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            return df
+            return self.ohlcv_cache.get(symbol, timeframe, limit)
         except Exception as e:
             logger.error(f"Error fetching OHLCV data: {e}")
             return pd.DataFrame()
@@ -0,0 +1,240 @@
+"""SQLite index of backtest artifacts for listing, filtering and sorting."""
+
+import base64
+import json
+import logging
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "..", "artifacts")
+
+SUMMARY_FIELDS = ("total_return_pct", "sharpe_ratio", "win_rate", "max_drawdown_pct")
+
+SORTABLE_FIELDS = ("created_at", "run_id") + SUMMARY_FIELDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT,
+    model_id TEXT,
+    dataset TEXT,
+    timeframe TEXT,
+    online INTEGER,
+    total_return_pct REAL,
+    sharpe_ratio REAL,
+    win_rate REAL,
+    max_drawdown_pct REAL
+);
+CREATE TABLE IF NOT EXISTS artifact_symbols (
+    run_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    PRIMARY KEY (symbol, run_id)
+);
+CREATE INDEX IF NOT EXISTS artifacts_created_at ON artifacts (created_at, run_id);
+CREATE INDEX IF NOT EXISTS artifacts_total_return ON artifacts (total_return_pct, run_id);
+CREATE INDEX IF NOT EXISTS artifacts_sharpe ON artifacts (sharpe_ratio, run_id);
+CREATE INDEX IF NOT EXISTS artifacts_win_rate ON artifacts (win_rate, run_id);
+CREATE INDEX IF NOT EXISTS artifacts_drawdown ON artifacts (max_drawdown_pct, run_id);
+CREATE INDEX IF NOT EXISTS artifacts_dataset ON artifacts (dataset);
+CREATE INDEX IF NOT EXISTS artifacts_model ON artifacts (model_id);
+"""
+
+
+def _encode_cursor(sort_by: str, direction: str, value: Any, run_id: str) -> str:
+    payload = json.dumps([sort_by, direction, value, run_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort_by: str, direction: str) -> Tuple[Any, str]:
+    """The (sort value, run_id) of the last run of the previous page."""
+    try:
+        cursor_sort, cursor_direction, value, run_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if (cursor_sort, cursor_direction) != (sort_by, direction):
+        raise ValueError("Cursor belongs to a listing with a different sort order")
+    return value, run_id
+
+
+class ArtifactCatalog:
+    """
+    Index of backtest runs, updated when a run's report is saved.
+
+    Listing reads only the index, so its cost depends on the page size and
+    not on how many runs exist. ``sync`` indexes report files written
+    without going through the catalog (e.g. before it existed).
+    """
+
+    def __init__(self, path: Optional[str] = None, artifacts_dir: str = ARTIFACTS_DIR):
+        self.artifacts_dir = artifacts_dir
+        self.path = path or os.path.join(artifacts_dir, "catalog.db")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, report: Dict[str, Any]):
+        """Index (or re-index) a run from its report.json contents."""
+        results = report.get("results", {})
+        config = report.get("config", {})
+        run_id = report["run_id"]
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    report.get("created_at"),
+                    report.get("model_id") or config.get("model_id"),
+                    report.get("dataset") or config.get("dataset"),
+                    config.get("timeframe"),
+                    int(bool(config.get("online"))),
+                    *(results.get(field) for field in SUMMARY_FIELDS)
+                )
+            )
+            conn.execute("DELETE FROM artifact_symbols WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO artifact_symbols (run_id, symbol) VALUES (?, ?)",
+                [(run_id, symbol) for symbol in config.get("symbols") or []]
+            )
+
+    def sync(self) -> int:
+        """Index reports present on disk but missing from the catalog."""
+        if not os.path.exists(self.artifacts_dir):
+            return 0
+
+        with self._connect() as conn:
+            indexed = {row["run_id"] for row in conn.execute("SELECT run_id FROM artifacts")}
+
+        added = 0
+        for run_id in os.listdir(self.artifacts_dir):
+            if run_id in indexed:
+                continue
+            report_path = os.path.join(self.artifacts_dir, run_id, "report.json")
+            if not os.path.exists(report_path):
+                continue
+            try:
+                with open(report_path, "r") as f:
+                    report = json.load(f)
+                report.setdefault("run_id", run_id)
+                self.add(report)
+                added += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable report {report_path}: {e}")
+        return added
+
+    def list(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "desc",
+        dataset: Optional[str] = None,
+        symbol: Optional[str] = None,
+        model_id: Optional[str] = None,
+        min_values: Optional[Dict[str, float]] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        include_total: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
+        """
+        One page of runs, the number of runs matching the filters (only
+        with ``include_total``, as counting scans every match) and the
+        cursor of the next page, or None on the last page.
+
+        ``min_values`` maps summary fields to lower bounds. Runs missing
+        the sort field sort as its smallest value. Pages continue after the
+        ``(sort field, run_id)`` of the previous page's last run, and every
+        sortable field has an index on that pair, so a page is read straight
+        off an index however deep it is.
+        """
+        if sort_by not in SORTABLE_FIELDS:
+            raise ValueError(f"Cannot sort by {sort_by}; use one of {', '.join(SORTABLE_FIELDS)}")
+        direction = "ASC" if order.lower() == "asc" else "DESC"
+
+        where = []
+        params: List[Any] = []
+        if dataset:
+            where.append("dataset = ?")
+            params.append(dataset)
+        if model_id:
+            where.append("model_id = ?")
+            params.append(model_id)
+        if symbol:
+            where.append("run_id IN (SELECT run_id FROM artifact_symbols WHERE symbol = ?)")
+            params.append(symbol)
+        for field, value in (min_values or {}).items():
+            if field not in SUMMARY_FIELDS:
+                raise ValueError(f"Cannot filter on {field}")
+            where.append(f"{field} >= ?")
+            params.append(value)
+        if created_after:
+            where.append("created_at >= ?")
+            params.append(created_after)
+        if created_before:
+            where.append("created_at < ?")
+            params.append(created_before)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+        page_where = list(where)
+        page_params = list(params)
+        if cursor:
+            value, run_id = _decode_cursor(cursor, sort_by, direction)
+            # NULLs sort first ascending and last descending
+            op = ">" if direction == "ASC" else "<"
+            if value is None and direction == "ASC":
+                page_where.append(f"({sort_by} IS NOT NULL OR run_id > ?)")
+                page_params.append(run_id)
+            elif value is None:
+                page_where.append(f"({sort_by} IS NULL AND run_id < ?)")
+                page_params.append(run_id)
+            else:
+                nulls = f" OR {sort_by} IS NULL" if direction == "DESC" else ""
+                page_where.append(f"({sort_by} {op} ? OR ({sort_by} = ? AND run_id {op} ?){nulls})")
+                page_params += [value, value, run_id]
+        page_clause = f"WHERE {' AND '.join(page_where)}" if page_where else ""
+
+        with self._connect() as conn:
+            total = None
+            if include_total:
+                total = conn.execute(f"SELECT COUNT(*) FROM artifacts {clause}", params).fetchone()[0]
+            # One extra row tells whether there is a next page
+            rows = conn.execute(
+                f"SELECT * FROM artifacts {page_clause} "
+                f"ORDER BY {sort_by} {direction}, run_id {direction} "
+                f"LIMIT ?",
+                (*page_params, limit + 1)
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(sort_by, direction, last[sort_by], last["run_id"])
+
+        artifacts = [
+            {
+                "run_id": row["run_id"],
+                "created_at": row["created_at"],
+                "model_id": row["model_id"],
+                "dataset": row["dataset"],
+                "timeframe": row["timeframe"],
+                "online": bool(row["online"]),
+                "summary": {field: row[field] for field in SUMMARY_FIELDS}
+            }
+            for row in rows
+        ]
+        return artifacts, total, next_cursor
@@ -0,0 +1,146 @@
+"""Local cache for datasets loaded with load_hf_dataset."""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.feather as feather
+from huggingface_hub import HfApi
+
+from core.data import load_hf_dataset
+from frame_dtypes import compact_frame
+from instrumentation import step
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv(
+    "ML_DATASET_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "cache", "datasets")
+)
+
+# How long a resolved revision is trusted before asking the Hub again
+REVISION_TTL = float(os.getenv("ML_DATASET_REVISION_TTL", "300"))
+
+# Bump when the layout of cached frames changes
+DATASET_CACHE_VERSION = 2
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:32]
+
+
+def _revision_path(dataset_id: str) -> str:
+    return os.path.join(CACHE_DIR, "revisions", f"{_digest(dataset_id)}.json")
+
+
+def dataset_revision(dataset_id: str, token: Optional[str] = None) -> Optional[str]:
+    """
+    Revision of a dataset: the Hub commit sha, or the file mtime and size
+    for local paths.
+
+    A revision resolved less than ``REVISION_TTL`` seconds ago is reused
+    without a request. When the Hub cannot be reached the last known
+    revision is returned; None means the revision is unknown.
+    """
+    if os.path.exists(dataset_id):
+        stat = os.stat(dataset_id)
+        return f"local-{int(stat.st_mtime)}-{stat.st_size}"
+
+    path = _revision_path(dataset_id)
+    known = None
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            known = json.load(f)
+        if time.time() - known["checked_at"] < REVISION_TTL:
+            return known["revision"]
+
+    try:
+        revision = HfApi().dataset_info(dataset_id, token=token).sha
+    except Exception as e:
+        logger.warning(f"Could not resolve revision of {dataset_id}: {e}")
+        return known["revision"] if known else None
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _atomic_write_json(path, {"revision": revision, "checked_at": time.time()})
+    return revision
+
+
+def _atomic_write_json(path: str, payload: dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _load(dataset_id: str, symbols: Optional[List[str]], token: Optional[str]) -> pd.DataFrame:
+    with step("dataset_load"):
+        df = load_hf_dataset(dataset_id, token=token)
+    with step("symbol_filter"):
+        if symbols and "symbol" in df.columns:
+            df = df[df["symbol"].isin(symbols)]
+    with step("compact_dtypes"):
+        # Prices stay float64; only features are downcast
+        return compact_frame(df, downcast_floats=False)
+
+
+def load_dataset_cached(
+    dataset_id: str,
+    symbols: Optional[List[str]] = None,
+    token: Optional[str] = None
+) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Load a dataset filtered to ``symbols``, reading from the local cache when
+    an entry for the same (dataset, revision, symbols) exists.
+
+    Entries are uncompressed Feather (Arrow IPC) files. They are memory-mapped
+    rather than read into an intermediate buffer, but converting to pandas
+    copies every column once, so a cache hit costs one in-memory copy of the
+    frame (no download, parsing or decompression). Frames are compacted with
+    ``compact_frame`` (symbols stored as categoricals) before they are cached.
+
+    Returns:
+        (frame, revision); revision is None when it could not be resolved,
+        in which case the dataset is loaded without caching
+    """
+    revision = dataset_revision(dataset_id, token)
+    if revision is None:
+        return _load(dataset_id, symbols, token), None
+
+    key = _digest({
+        "version": DATASET_CACHE_VERSION,
+        "dataset": dataset_id,
+        "revision": revision,
+        "symbols": sorted(symbols) if symbols else None
+    })
+    path = os.path.join(CACHE_DIR, f"{key}.feather")
+
+    if os.path.exists(path):
+        try:
+            with step("dataset_cache_read"):
+                table = feather.read_table(path, memory_map=True)
+                return table.to_pandas(), revision
+        except Exception as e:
+            logger.warning(f"Discarding unreadable dataset cache entry {path}: {e}")
+            os.remove(path)
+
+    df = _load(dataset_id, symbols, token)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with step("dataset_cache_write"):
+        feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    _atomic_write_json(f"{path[:-len('.feather')]}.json", {
+        "dataset": dataset_id,
+        "revision": revision,
+        "symbols": symbols,
+        "rows": len(df),
+        "created_at": time.time()
+    })
+    logger.info(f"Cached {dataset_id}@{revision[:12]} ({len(df)} rows) at {path}")
+
+    return df, revision
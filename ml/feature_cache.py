@@ -0,0 +1,119 @@
+"""Disk cache for the feature engineering and labeling stages."""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from core.data import feature_engineering, labeling
+from frame_dtypes import compact_frame
+from instrumentation import step
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv(
+    "ML_FEATURE_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "cache", "features")
+)
+
+# Bump when feature_engineering or labeling change their output
+FEATURE_PIPELINE_VERSION = 2
+
+NON_FEATURE_COLUMNS = {"target", "symbol", "timestamp"}
+
+
+def feature_fingerprint(
+    dataset_id: str,
+    revision: str,
+    symbols: Optional[List[str]],
+    feature_config: Dict[str, Any],
+    horizon: int,
+    task: str
+) -> str:
+    """Stable hash of everything the engineered matrix and targets depend on."""
+    payload = {
+        "version": FEATURE_PIPELINE_VERSION,
+        "dataset": dataset_id,
+        "revision": revision,
+        "symbols": sorted(symbols) if symbols else None,
+        "feature_config": feature_config,
+        "horizon": horizon,
+        "task": task
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def build_feature_matrix(df: pd.DataFrame, feature_config: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Run feature engineering only, for scoring rows that have no label yet.
+
+    Features are returned as float32 (see ``compact_frame``), so training,
+    backtests, online updates and scoring all see the same dtypes.
+    """
+    with step("feature_engineering"):
+        return compact_frame(feature_engineering(df, feature_config))
+
+
+def build_features(df: pd.DataFrame, feature_config: Dict[str, Any], horizon: int, task: str) -> pd.DataFrame:
+    """Run feature engineering and labeling; targets go in a ``target`` column."""
+    df = build_feature_matrix(df, feature_config)
+    with step("labeling"):
+        df, target = labeling(df, horizon, task)
+        df["target"] = target
+    return df
+
+
+def feature_columns(model, df: pd.DataFrame) -> List[str]:
+    """Columns a model takes as input: the ones it was fitted on, if known."""
+    columns = getattr(model, "feature_names", None)
+    if columns:
+        return list(columns)
+    return [
+        column for column in df.columns
+        if column not in NON_FEATURE_COLUMNS and pd.api.types.is_numeric_dtype(df[column])
+    ]
+
+
+def build_features_cached(
+    df: pd.DataFrame,
+    dataset_id: str,
+    revision: Optional[str],
+    symbols: Optional[List[str]],
+    feature_config: Dict[str, Any],
+    horizon: int,
+    task: str
+) -> pd.DataFrame:
+    """
+    ``build_features`` backed by a zstd-compressed Feather file per
+    fingerprint, so repeated runs on the same inputs skip straight to
+    model fitting. Without a dataset revision nothing is cached.
+    """
+    if revision is None:
+        return build_features(df, feature_config, horizon, task)
+
+    key = feature_fingerprint(dataset_id, revision, symbols, feature_config, horizon, task)
+    path = os.path.join(CACHE_DIR, f"{key}.feather")
+
+    if os.path.exists(path):
+        try:
+            with step("feature_cache_read"):
+                return feather.read_feather(path)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable feature cache entry {path}: {e}")
+            os.remove(path)
+
+    features = build_features(df, feature_config, horizon, task)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with step("feature_cache_write"):
+        feather.write_feather(features, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    logger.info(f"Cached features {key} ({features.shape[0]}x{features.shape[1]})")
+
+    return features
@@ -0,0 +1,98 @@
+"""Compact dtypes for datasets and feature matrices, and copy-free splits."""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_COLUMNS = ("symbol",)
+
+TIMESTAMP_COLUMNS = ("timestamp",)
+
+# Backtest fills and PnL are computed from prices, and labels must not
+# change, so these stay float64 when features are downcast
+FULL_PRECISION_COLUMNS = {"open", "high", "low", "close", "target"}
+
+
+def compact_frame(df: pd.DataFrame, downcast_floats: bool = True) -> pd.DataFrame:
+    """
+    Shrink a frame's memory footprint without changing its values' meaning.
+
+    Symbols become categoricals, string timestamps become datetime64 (eight
+    bytes per row, like epoch integers, which are left as int64), and with
+    ``downcast_floats`` float64 feature columns become float32. Columns in
+    ``FULL_PRECISION_COLUMNS`` are never downcast.
+    """
+    before = df.memory_usage(deep=True).sum()
+
+    dtypes = {}
+    for column in df.columns:
+        dtype = df[column].dtype
+        if column in CATEGORICAL_COLUMNS and not isinstance(dtype, pd.CategoricalDtype):
+            dtypes[column] = "category"
+        elif downcast_floats and dtype == np.float64 and column not in FULL_PRECISION_COLUMNS:
+            dtypes[column] = np.float32
+    if dtypes:
+        df = df.astype(dtypes)
+
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = pd.to_datetime(df[column])
+
+    after = df.memory_usage(deep=True).sum()
+    if after < before:
+        logger.debug(f"Compacted frame from {before / 1e6:.1f} MB to {after / 1e6:.1f} MB")
+    return df
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """Timestamps given as epoch milliseconds or ISO strings, as naive UTC datetimes."""
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_datetime(values, unit="ms")
+    times = pd.to_datetime(values, utc=True)
+    return times.dt.tz_convert(None)
+
+
+def split_frame(
+    df: pd.DataFrame,
+    train_ratio: float,
+    valid_ratio: float
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Chronological train/valid/test split by row position.
+
+    Rows are put in time order first (by a datetime index or ``timestamp``
+    column) when they are not already, e.g. symbols concatenated one after
+    the other, and no timestamp is split between two sets. Splits of an
+    already ordered frame are positional slices, i.e. views on ``df``
+    rather than copies; treat them as read-only.
+    """
+    times = _row_times(df)
+    if times is not None and not times.is_monotonic_increasing:
+        order = np.argsort(times.to_numpy(), kind="stable")
+        df = df.iloc[order]
+        times = times.iloc[order]
+
+    n = len(df)
+    train_end = int(n * train_ratio)
+    valid_end = int(n * (train_ratio + valid_ratio))
+    if times is not None:
+        # Move each cut back to the first row of the timestamp it falls in
+        values = times.to_numpy()
+        train_end, valid_end = (
+            int(np.searchsorted(values, values[end], side="left")) if end < n else end
+            for end in (train_end, valid_end)
+        )
+    return df.iloc[:train_end], df.iloc[train_end:valid_end], df.iloc[valid_end:]
+
+
+def _row_times(df: pd.DataFrame) -> Optional[pd.Series]:
+    if isinstance(df.index, pd.DatetimeIndex):
+        return pd.Series(df.index)
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns:
+            return df[column].reset_index(drop=True)
+    return None
@@ -0,0 +1,181 @@
+"""Wall time, CPU time and peak RSS of job stages and the steps inside them."""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Linux resets a process's peak RSS (VmHWM) when "5" is written here
+CLEAR_REFS_PATH = "/proc/self/clear_refs"
+STATUS_PATH = "/proc/self/status"
+
+_local = threading.local()
+
+# VmHWM is per process, so a span resets and reports its own peak only
+# while no other thread has a span open: open spans per thread, and how
+# many times spans of different threads have overlapped
+_lock = threading.Lock()
+_open_spans: Dict[int, int] = {}
+_overlaps = 0
+
+
+def _status_mb(field: str) -> Optional[float]:
+    try:
+        with open(STATUS_PATH, "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    try:
+        with open(CLEAR_REFS_PATH, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _process_peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def _round(mb: Optional[float]) -> Optional[float]:
+    return round(mb, 1) if mb is not None else None
+
+
+def _open_span() -> Tuple[bool, int]:
+    """Count a span opening on this thread; returns (alone, overlap count)."""
+    global _overlaps
+    thread = threading.get_ident()
+    with _lock:
+        alone = not any(count for other, count in _open_spans.items() if other != thread)
+        if not alone:
+            _overlaps += 1
+        _open_spans[thread] = _open_spans.get(thread, 0) + 1
+        return alone, _overlaps
+
+
+def _close_span() -> int:
+    """Count a span closing on this thread; returns the overlap count."""
+    thread = threading.get_ident()
+    with _lock:
+        _open_spans[thread] -= 1
+        if not _open_spans[thread]:
+            del _open_spans[thread]
+        return _overlaps
+
+
+def _child_cpu_seconds() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class _Span:
+    def __init__(self, name: str, parent: Optional["_Span"]):
+        self.name = name
+        self.parent = parent
+        self.record: Dict[str, Any] = {"name": name}
+        self.steps: List[Dict[str, Any]] = []
+        # Highest peak seen by finished child spans, whose start reset the counter
+        self.child_peak: Optional[float] = None
+
+        if parent is not None:
+            parent._observe_peak(_status_mb("VmHWM"))
+        alone, self.overlaps = _open_span()
+        self.stage_peak = alone and _reset_peak_rss()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.child_cpu = _child_cpu_seconds()
+
+    def _observe_peak(self, peak: Optional[float]):
+        if peak is not None:
+            self.child_peak = peak if self.child_peak is None else max(self.child_peak, peak)
+
+    def finish(self) -> Dict[str, Any]:
+        # Another thread opened a span meanwhile, so VmHWM covers both
+        if _close_span() != self.overlaps:
+            self.stage_peak = False
+
+        if self.stage_peak:
+            peak = _status_mb("VmHWM")
+            if self.child_peak is not None and peak is not None:
+                peak = max(peak, self.child_peak)
+        else:
+            peak = _process_peak_rss_mb()
+
+        self.record.update({
+            "wall_seconds": round(time.perf_counter() - self.wall, 4),
+            "cpu_seconds": round(time.process_time() - self.cpu, 4),
+            "child_cpu_seconds": round(_child_cpu_seconds() - self.child_cpu, 4),
+            "peak_rss_mb": _round(peak),
+            "peak_rss_scope": "stage" if self.stage_peak else "process",
+            "rss_mb": _round(_status_mb("VmRSS"))
+        })
+        if self.steps:
+            self.record["steps"] = self.steps
+        if self.parent is not None:
+            self.parent._observe_peak(peak if self.stage_peak else None)
+            self.parent.steps.append(self.record)
+        return self.record
+
+
+@contextmanager
+def measure(name: str):
+    """
+    Measure a block and yield its record, filled in when the block exits.
+
+    Blocks measured while another is active on the same thread are listed
+    under the outer record's ``steps``; library code marks its steps with
+    ``step``, which costs nothing when no job is being measured. Peak RSS
+    is per block where the kernel allows resetting it (Linux) and no other
+    thread measured a block at the same time, and the process's peak so far
+    otherwise (``peak_rss_scope``).
+    ``child_cpu_seconds`` counts worker processes that exited during the
+    block. Failed blocks are recorded with ``failed`` set.
+    """
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    span = _Span(name, stack[-1] if stack else None)
+    stack.append(span)
+    try:
+        yield span.record
+    except BaseException:
+        span.record["failed"] = True
+        raise
+    finally:
+        stack.pop()
+        span.finish()
+
+
+@contextmanager
+def step(name: str):
+    """``measure`` inside an active block; a no-op (yielding a scratch dict) otherwise."""
+    if getattr(_local, "stack", None):
+        with measure(name) as record:
+            yield record
+    else:
+        yield {}
+
+
+def record_step(record: Dict[str, Any]):
+    """Attach a record measured elsewhere (e.g. in a worker process) to the active block."""
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1].steps.append(record)
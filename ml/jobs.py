@@ -0,0 +1,439 @@
+"""Persistent job store and process pool for long-running ML jobs."""
+
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from instrumentation import measure
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+JSON_FIELDS = ("request", "result", "stages")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    stage TEXT,
+    stages TEXT,
+    request TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    pid INTEGER,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+class JobStore:
+    """
+    SQLite-backed job records shared by the API and worker processes.
+
+    Every call opens its own connection, so a store can be used from any
+    thread or process. WAL mode lets readers poll status while a worker
+    writes progress.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for field in JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] else None
+        job["progress"] = round(job["progress"], 1)
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, job_type: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a new job."""
+        job_id = str(uuid.uuid4())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, type, status, request, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, job_type, QUEUED, json.dumps(request), datetime.utcnow().isoformat())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record, or None if it does not exist."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally filtered by status and type."""
+        query = "SELECT * FROM jobs WHERE 1 = 1"
+        params: List[Any] = []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if job_type:
+            query += " AND type = ?"
+            params.append(job_type)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def update(self, job_id: str, **fields):
+        """Set fields of a job record; JSON fields are serialized."""
+        for field in JSON_FIELDS:
+            if field in fields:
+                fields[field] = json.dumps(fields[field])
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def finish(self, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        """Record the final status of a job that has not finished yet."""
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, pid = NULL "
+                f"WHERE job_id = ? AND status NOT IN ({', '.join('?' * len(FINISHED_STATUSES))})",
+                (status, json.dumps(result) if result is not None else None, error,
+                 datetime.utcnow().isoformat(), job_id, *FINISHED_STATUSES)
+            )
+
+    def claim_next(self, pid: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically move the oldest queued job to running and return it.
+
+        The job is owned by ``pid`` (this process by default) until its
+        worker process is started, so it is never seen without a live owner.
+        """
+        pid = pid or os.getpid()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = ?, pid = ? WHERE job_id = ?",
+                        (RUNNING, datetime.utcnow().isoformat(), pid, row["job_id"])
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["job_id"]) if row else None
+
+    def request_cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job now, or flag a running job for cancellation."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ? AND status = ?",
+                (CANCELLED, datetime.utcnow().isoformat(), job_id, QUEUED)
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status = ?",
+                (job_id, RUNNING)
+            )
+        return self.get(job_id)
+
+    def requeue_orphans(self) -> int:
+        """Requeue running jobs whose worker process no longer exists."""
+        requeued = 0
+        for job in self.list(status=RUNNING, limit=-1):
+            if job["pid"] and _pid_alive(job["pid"]):
+                continue
+            if job["cancel_requested"]:
+                self.finish(job["job_id"], CANCELLED)
+                continue
+            self.update(job["job_id"], status=QUEUED, progress=0, stage=None, stages=None, pid=None, started_at=None)
+            requeued += 1
+        return requeued
+
+
+def _try_lock(lock_file) -> bool:
+    """Lock an open file exclusively without waiting; the lock goes with the file."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobContext:
+    """
+    Progress reporting and cancellation checks for a running job.
+
+    A job declares its stages with relative weights up front; overall
+    progress is the weight of completed stages plus the reported fraction
+    of the current one, so it moves at the rate work actually completes.
+    Each stage's wall time, CPU time and peak RSS (see ``measure``) are
+    stored under its ``metrics``.
+    """
+
+    def __init__(self, store: JobStore, job_id: str, stages: List[Tuple[str, float]]):
+        self.store = store
+        self.job_id = job_id
+        total = sum(weight for _, weight in stages)
+        self.weights = {name: weight / total * 100 for name, weight in stages}
+        self.offsets: Dict[str, float] = {}
+        offset = 0.0
+        for name, _ in stages:
+            self.offsets[name] = offset
+            offset += self.weights[name]
+        self.stages = {name: {"status": "pending"} for name, _ in stages}
+        self.current: Optional[str] = None
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested."""
+        job = self.store.get(self.job_id)
+        if job is None or job["cancel_requested"]:
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    @contextmanager
+    def stage(self, name: str):
+        """Run one stage; progress jumps to the stage's end when it exits."""
+        self.check_cancelled()
+        self.current = name
+        self.stages[name] = {"status": "running", "started_at": datetime.utcnow().isoformat()}
+        self.store.update(self.job_id, stage=name, stages=self.stages, progress=self.offsets[name])
+
+        try:
+            with measure(name) as metrics:
+                yield self
+        except Exception:
+            self.stages[name]["status"] = "failed"
+            self.stages[name]["metrics"] = metrics
+            self.store.update(self.job_id, stages=self.stages)
+            raise
+
+        self.stages[name]["status"] = "completed"
+        self.stages[name]["finished_at"] = datetime.utcnow().isoformat()
+        self.stages[name]["metrics"] = metrics
+        self.store.update(
+            self.job_id, stages=self.stages, progress=self.offsets[name] + self.weights[name]
+        )
+
+    def report(self, fraction: float):
+        """Report progress within the current stage (0.0 to 1.0)."""
+        fraction = min(max(fraction, 0.0), 1.0)
+        self.stages[self.current]["progress"] = round(fraction, 3)
+        self.store.update(
+            self.job_id,
+            stages=self.stages,
+            progress=self.offsets[self.current] + self.weights[self.current] * fraction
+        )
+        self.check_cancelled()
+
+
+JobRunner = Callable[[Dict[str, Any], JobContext], Dict[str, Any]]
+Stages = List[Tuple[str, float]]
+
+
+def _run_job(db_path: str, job_id: str, runner: JobRunner, stages: Stages):
+    """Entry point of a worker process."""
+    store = JobStore(db_path)
+    job = store.get(job_id)
+    try:
+        result = runner(job["request"], JobContext(store, job_id, stages))
+        store.update(job_id, progress=100, stage=None)
+        store.finish(job_id, COMPLETED, result=result)
+    except JobCancelled:
+        store.finish(job_id, CANCELLED)
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {traceback.format_exc()}")
+        store.finish(job_id, FAILED, error=str(e))
+
+
+class WorkerPool:
+    """
+    Runs queued jobs in separate processes with bounded concurrency.
+
+    A dispatcher thread claims queued jobs from the store while fewer than
+    ``concurrency`` are running, reaps finished processes and terminates
+    running jobs whose cancellation is not picked up within
+    ``cancel_grace`` seconds (a model fit cannot check for cancellation).
+    ``runners`` maps a job type to a module-level function and the
+    ``(name, weight)`` stages it reports.
+
+    Every server process may start a pool (e.g. one per uvicorn worker),
+    but only the one holding the store's lock file dispatches; the others
+    keep trying, so one of them takes over if the holder exits.
+
+    Workers are not daemons, since jobs start process pools of their own;
+    ``stop`` terminates them and puts their jobs back in the queue.
+    """
+
+    def __init__(self, store: JobStore, runners: Dict[str, Tuple[JobRunner, Stages]], concurrency: int = 2,
+                 poll_interval: float = 1.0, cancel_grace: float = 10.0):
+        self.store = store
+        self.runners = runners
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.cancel_grace = cancel_grace
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: Dict[str, multiprocessing.process.BaseProcess] = {}
+        self.cancel_seen: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+
+    def start(self):
+        """Start dispatching once this process holds the dispatcher lock."""
+        self._thread = threading.Thread(target=self._dispatch_loop, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop dispatching and terminate running jobs, requeueing them.
+
+        Left running, the workers would hold up interpreter exit until
+        their jobs finish. Requeued jobs start over on the next dispatcher;
+        jobs with a pending cancellation are cancelled instead.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for process in self.processes.values():
+            process.terminate()
+        for process in self.processes.values():
+            process.join()
+        if self.processes:
+            requeued = self.store.requeue_orphans()
+            logger.info(f"Requeued {requeued} jobs interrupted by shutdown")
+            self.processes.clear()
+            self.cancel_seen.clear()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @property
+    def is_dispatcher(self) -> bool:
+        return self._lock_file is not None
+
+    def _acquire_dispatch_lock(self) -> bool:
+        """Become the store's only dispatcher, requeueing jobs of a previous one."""
+        if self._lock_file is not None:
+            return True
+        lock_file = open(f"{self.store.path}.dispatch.lock", "a+")
+        if not _try_lock(lock_file):
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+
+        logger.info(f"Process {os.getpid()} is dispatching jobs")
+        requeued = self.store.requeue_orphans()
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted jobs")
+        return True
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            try:
+                if self._acquire_dispatch_lock():
+                    self._reap()
+                    self._enforce_cancellations()
+                    self._fill()
+            except Exception as e:
+                logger.error(f"Job dispatcher error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _reap(self):
+        for job_id, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.processes[job_id]
+            self.cancel_seen.pop(job_id, None)
+            # A process killed before recording its outcome
+            self.store.finish(job_id, FAILED, error=f"Worker exited with code {process.exitcode}")
+
+    def _enforce_cancellations(self):
+        now = time.monotonic()
+        for job_id, process in self.processes.items():
+            job = self.store.get(job_id)
+            if job is None or not job["cancel_requested"]:
+                continue
+            first_seen = self.cancel_seen.setdefault(job_id, now)
+            if now - first_seen >= self.cancel_grace and process.is_alive():
+                process.terminate()
+                self.store.finish(job_id, CANCELLED)
+
+    def _fill(self):
+        while len(self.processes) < self.concurrency:
+            job = self.store.claim_next()
+            if job is None:
+                return
+
+            if job["type"] not in self.runners:
+                self.store.finish(job["job_id"], FAILED, error=f"No runner for job type {job['type']}")
+                continue
+
+            runner, stages = self.runners[job["type"]]
+            process = self.context.Process(
+                target=_run_job, args=(self.store.path, job["job_id"], runner, stages), daemon=False
+            )
+            process.start()
+            self.store.update(job["job_id"], pid=process.pid)
+            self.processes[job["job_id"]] = process
+            logger.info(f"Started {job['type']} job {job['job_id']} in process {process.pid}")
@@ -0,0 +1,169 @@
+"""In-process registry of trained models with an LRU of loaded models."""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.train import load_model_with_metadata, list_models
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "..", "models")
+
+# Written next to each saved model by save_training_artifacts
+METADATA_FILE = "metadata.json"
+
+# A directory changed this recently may still have a model being written
+SETTLE_SECONDS = 5
+
+
+class ModelRegistry:
+    """
+    Indexes saved models and keeps recently used ones deserialized.
+
+    The index is rebuilt with ``list_models`` only when the models
+    directory's mtime changes, which happens whenever a training job saves
+    a new model (and for a few seconds after, while its files are
+    written). Loaded models live in an LRU of at most ``max_models``
+    entries; entries in use (acquired and not yet released) are never
+    evicted, so the cache can briefly exceed its size under load.
+    Metadata is read from each model's metadata file, loaded or not.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR, max_models: int = 4):
+        self.models_dir = models_dir
+        self.max_models = max_models
+        self.lock = threading.Lock()
+        self.index: List[Dict[str, Any]] = []
+        self.index_mtime: Optional[int] = None
+        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self.models: "OrderedDict[str, Any]" = OrderedDict()
+        self.refcounts: Dict[str, int] = {}
+        self.loading: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.models_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        settled = mtime is not None and time.time() - mtime / 1e9 > SETTLE_SECONDS
+        if mtime == self.index_mtime and settled:
+            return
+        self.index = list_models()
+        self.index_mtime = mtime
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Saved models, newest first, as returned by ``list_models``."""
+        with self.lock:
+            self._refresh()
+            return list(self.index)
+
+    def latest_model_id(self) -> Optional[str]:
+        """Id of the most recently saved model, or None if there is none."""
+        models = self.list()
+        return models[0]["model_id"] if models else None
+
+    def get_metadata(self, model_id: str) -> Dict[str, Any]:
+        """Metadata of a saved model, read from its metadata file; never loads the model."""
+        path = os.path.join(self.models_dir, model_id, METADATA_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Model {model_id} not found")
+
+    def acquire(self, model_id: str) -> Tuple[Any, Dict[str, Any]]:
+        """Return (model, metadata) and pin the model until ``release``."""
+        with self.lock:
+            if model_id in self.models:
+                self.hits += 1
+                return self._pin(model_id)
+            load_lock = self.loading.setdefault(model_id, threading.Lock())
+
+        # Load outside the registry lock; concurrent requests for the same
+        # model wait for the first load instead of repeating it
+        with load_lock:
+            with self.lock:
+                if model_id in self.models:
+                    self.hits += 1
+                    return self._pin(model_id)
+
+            try:
+                model, metadata = load_model_with_metadata(model_id)
+            except Exception:
+                with self.lock:
+                    self.loading.pop(model_id, None)
+                raise
+
+            # Insert before dropping the load lock, so a request arriving in
+            # between finds the model instead of loading it again
+            with self.lock:
+                self.misses += 1
+                self.models[model_id] = model
+                self.metadata[model_id] = metadata
+                self.loading.pop(model_id, None)
+                pinned = self._pin(model_id)
+                self._evict()
+                return pinned
+
+    def _pin(self, model_id: str) -> Tuple[Any, Dict[str, Any]]:
+        self.models.move_to_end(model_id)
+        self.refcounts[model_id] = self.refcounts.get(model_id, 0) + 1
+        return self.models[model_id], self.metadata[model_id]
+
+    def _evict(self):
+        excess = len(self.models) - self.max_models
+        for model_id in list(self.models):
+            if excess <= 0:
+                return
+            if self.refcounts.get(model_id, 0) == 0:
+                del self.models[model_id]
+                self.refcounts.pop(model_id, None)
+                excess -= 1
+                logger.info(f"Evicted model {model_id} from registry")
+
+    def release(self, model_id: str):
+        """Unpin a model returned by ``acquire``."""
+        with self.lock:
+            self.refcounts[model_id] -= 1
+            self._evict()
+
+    def swap(self, model_id: str, model: Any):
+        """
+        Replace the served instance of a loaded model in one step.
+
+        Callers holding the previous instance keep using it; later
+        ``acquire`` calls get the new one.
+        """
+        with self.lock:
+            if model_id not in self.metadata:
+                raise KeyError(f"Model {model_id} was never loaded")
+            self.models[model_id] = model
+            self.models.move_to_end(model_id)
+
+    @contextmanager
+    def use(self, model_id: str):
+        """``acquire`` and ``release`` around a block."""
+        pinned = self.acquire(model_id)
+        try:
+            yield pinned
+        finally:
+            self.release(model_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size, loaded and pinned models, and cache hit counters."""
+        with self.lock:
+            return {
+                "indexed": len(self.index),
+                "loaded": list(self.models),
+                "in_use": {k: v for k, v in self.refcounts.items() if v},
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,261 @@
+"""Online learning sessions that update partial_fit models from new candles."""
+
+import asyncio
+import copy
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from core.train import save_training_artifacts
+
+from feature_cache import build_features, feature_columns
+from frame_dtypes import parse_timestamps
+from model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class OnlineLearner:
+    """
+    Keeps one served model current by learning from candles as they arrive.
+
+    Raw candles are buffered per symbol. A candle becomes a training sample
+    once ``horizon`` newer candles exist, i.e. when its label has matured;
+    the newly matured rows, with the ``lookback`` candles their indicators
+    need before them, are featurized with the regular feature pipeline to
+    label them. Matured samples are learned in mini-batches with ``partial_fit`` on
+    a copy of the model, and the copy replaces the served model in the
+    registry in one step, so scoring never sees a half-updated model.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        model_id: str,
+        horizon: int,
+        task: str,
+        feature_config: Optional[Dict[str, Any]] = None,
+        batch_size: int = 256,
+        max_wait_seconds: float = 300,
+        checkpoint_seconds: float = 900,
+        buffer_size: int = 1000,
+        lookback: int = 250
+    ):
+        self.session_id = str(uuid.uuid4())
+        self.registry = registry
+        self.model_id = model_id
+        self.horizon = horizon
+        self.task = task
+        self.feature_config = feature_config or {}
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.checkpoint_seconds = checkpoint_seconds
+        self.buffer_size = buffer_size
+        # Candles of history the slowest indicator (EMA 200) needs to warm up
+        self.lookback = lookback
+
+        # Pinned for the lifetime of the session so it is never evicted
+        self.model, self.metadata = registry.acquire(model_id)
+        if not self.model.supports_partial_fit():
+            registry.release(model_id)
+            raise ValueError(f"Model {model_id} does not support partial_fit")
+
+        self.buffers: Dict[str, pd.DataFrame] = {}
+        self.learned_until: Dict[str, pd.Timestamp] = {}
+        self.pending: List[pd.DataFrame] = []
+        self.pending_rows = 0
+        self.pending_since: Optional[float] = None
+        self.updating = False
+
+        # Guards the buffers and pending samples; ingest runs on worker threads
+        self.lock = threading.Lock()
+        # Held by the service around updates and checkpoints, so stopping a
+        # session waits for the one in progress
+        self.session_lock = asyncio.Lock()
+
+        self.created_at = datetime.utcnow().isoformat()
+        self.updates = 0
+        self.samples_learned = 0
+        self.last_update: Optional[str] = None
+        self.last_checkpoint = time.monotonic()
+        self.last_checkpoint_id: Optional[str] = None
+        self.dirty = False
+
+    def ingest(self, candles: List[Dict[str, Any]]) -> int:
+        """Add raw candles; returns how many samples matured as a result."""
+        frame = pd.DataFrame(candles)
+        frame["timestamp"] = parse_timestamps(frame["timestamp"])
+
+        matured = 0
+        with self.lock:
+            for symbol, rows in frame.groupby("symbol"):
+                buffer = pd.concat([self.buffers.get(symbol), rows.set_index("timestamp")])
+                buffer = buffer[~buffer.index.duplicated(keep="last")].sort_index()
+                self.buffers[symbol] = buffer.iloc[-self.buffer_size:]
+                matured += self._collect_matured(symbol)
+        return matured
+
+    def _collect_matured(self, symbol: str) -> int:
+        buffer = self.buffers[symbol]
+        if len(buffer) <= self.horizon:
+            return 0
+
+        # Only rows after the last learned one, and before the last
+        # ``horizon`` rows (which have no future candles to label them yet)
+        learned_until = self.learned_until.get(symbol)
+        first = 0 if learned_until is None else buffer.index.searchsorted(learned_until, side="right")
+        if first >= len(buffer) - self.horizon:
+            return 0
+
+        # Labeling drops the last ``horizon`` rows; dropna the lookback's warm-up
+        window = buffer.iloc[max(first - self.lookback, 0):]
+        features = build_features(window, self.feature_config, self.horizon, self.task).dropna()
+        if learned_until is not None:
+            features = features[features.index > learned_until]
+        if features.empty:
+            return 0
+
+        self.learned_until[symbol] = features.index.max()
+        # pending_since first: update_due reads it once pending_rows is set
+        if self.pending_since is None:
+            self.pending_since = time.monotonic()
+        self.pending.append(features)
+        self.pending_rows += len(features)
+        return len(features)
+
+    def update_due(self) -> bool:
+        """Enough samples for a batch, or the oldest has waited long enough."""
+        if self.updating or not self.pending_rows:
+            return False
+        waited = time.monotonic() - self.pending_since
+        return self.pending_rows >= self.batch_size or waited >= self.max_wait_seconds
+
+    def checkpoint_due(self) -> bool:
+        """The model changed and the checkpoint interval has passed."""
+        return self.dirty and time.monotonic() - self.last_checkpoint >= self.checkpoint_seconds
+
+    def update(self):
+        """Learn all pending samples in mini-batches, then swap the model in."""
+        # Take the pending samples in one step; ingest may add more meanwhile
+        with self.lock:
+            pending, self.pending = self.pending, []
+            self.pending_rows = 0
+            self.pending_since = None
+        samples = pd.concat(pending)
+
+        model = copy.deepcopy(self.model)
+        columns = feature_columns(model, samples)
+        for start in range(0, len(samples), self.batch_size):
+            batch = samples.iloc[start:start + self.batch_size]
+            model.partial_fit(batch[columns], batch["target"])
+
+        self.registry.swap(self.model_id, model)
+        self.model = model
+        self.updates += 1
+        self.samples_learned += len(samples)
+        self.last_update = datetime.utcnow().isoformat()
+        self.dirty = True
+
+    def checkpoint(self) -> str:
+        """
+        Save the current model as a new model id and return it.
+
+        The checkpoint is saved like a trained model, with the source
+        model's metadata and an ``online`` section recording the updates.
+        """
+        checkpoint_id = f"{self.model_id}_online_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        training_info = {key: value for key, value in self.metadata.items() if key != "dataset"}
+        training_info["online"] = {
+            "source_model_id": self.model_id,
+            "session_id": self.session_id,
+            "updates": self.updates,
+            "samples_learned": self.samples_learned,
+            "learned_until": {symbol: str(time) for symbol, time in self.learned_until.items()},
+            "checkpointed_at": datetime.utcnow().isoformat()
+        }
+        save_training_artifacts(self.model, training_info, checkpoint_id, self.metadata["dataset"])
+        self.last_checkpoint = time.monotonic()
+        self.last_checkpoint_id = checkpoint_id
+        self.dirty = False
+        logger.info(f"Checkpointed online model {self.model_id} as {checkpoint_id}")
+        return checkpoint_id
+
+    def close(self):
+        """Unpin the served model."""
+        self.registry.release(self.model_id)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "model_id": self.model_id,
+            "horizon": self.horizon,
+            "task": self.task,
+            "symbols": sorted(self.buffers),
+            "created_at": self.created_at,
+            "updates": self.updates,
+            "samples_learned": self.samples_learned,
+            "pending_samples": self.pending_rows,
+            "last_update": self.last_update,
+            "last_checkpoint_id": self.last_checkpoint_id
+        }
+
+
+class OnlineLearningService:
+    """Runs online learning sessions and their update/checkpoint schedule."""
+
+    def __init__(self, registry: ModelRegistry, poll_seconds: float = 5.0):
+        self.registry = registry
+        self.poll_seconds = poll_seconds
+        self.sessions: Dict[str, OnlineLearner] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        for session_id in list(self.sessions):
+            await self.stop_session(session_id)
+
+    def start_session(self, model_id: str, **kwargs) -> OnlineLearner:
+        learner = OnlineLearner(self.registry, model_id, **kwargs)
+        self.sessions[learner.session_id] = learner
+        return learner
+
+    async def stop_session(self, session_id: str) -> Dict[str, Any]:
+        """Learn what is pending, write a final checkpoint and end the session."""
+        learner = self.sessions.pop(session_id)
+        async with learner.session_lock:
+            if learner.pending_rows:
+                await asyncio.to_thread(learner.update)
+            if learner.dirty:
+                await asyncio.to_thread(learner.checkpoint)
+            learner.close()
+        return learner.get_status()
+
+    async def _run(self):
+        while True:
+            for learner in list(self.sessions.values()):
+                try:
+                    async with learner.session_lock:
+                        # Stopped while waiting for the lock
+                        if learner.session_id not in self.sessions:
+                            continue
+                        if learner.update_due():
+                            learner.updating = True
+                            try:
+                                # partial_fit is CPU-bound; keep the event loop free
+                                await asyncio.to_thread(learner.update)
+                            finally:
+                                learner.updating = False
+                        if learner.checkpoint_due():
+                            await asyncio.to_thread(learner.checkpoint)
+                except Exception as e:
+                    logger.error(f"Online learning session {learner.session_id} failed to update: {e}")
+            await asyncio.sleep(self.poll_seconds)
@@ -0,0 +1,442 @@
+"""Training pipeline run by the job worker processes."""
+
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from core.model import MLModel
+from core.train import train_model, save_training_artifacts
+
+from dataset_cache import load_dataset_cached
+from feature_cache import build_features_cached
+from frame_dtypes import split_frame
+from jobs import JobContext
+from shared_frame import SharedFrame, attach_frame, detach
+from tuning import (
+    best_trial,
+    hyperband_brackets,
+    rank_trials,
+    resource_amount,
+    sample_config,
+    successive_halving_rungs,
+    validate_budget
+)
+
+
+# Relative cost of each training stage, used to weight job progress
+TRAINING_STAGES = [
+    ("load", 20),
+    ("features", 20),
+    ("split", 5),
+    ("train", 45),
+    ("save", 10),
+]
+
+MULTI_TRAINING_STAGES = [
+    ("load", 10),
+    ("features", 10),
+    ("split", 5),
+    ("train", 70),
+    ("save", 5),
+]
+
+SEARCH_STAGES = [
+    ("load", 5),
+    ("features", 5),
+    ("split", 2),
+    ("search", 78),
+    ("refit", 8),
+    ("save", 2),
+]
+
+# Metrics where a lower value ranks higher on the leaderboard
+LOWER_IS_BETTER = {"rmse", "mse", "mae", "mape", "log_loss"}
+
+DEFAULT_RANK_BY = {"classification": "accuracy", "regression": "rmse"}
+
+
+def run_training(request: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    """Run a training request (``TrainRequest.dict()``) and return its result."""
+    with ctx.stage("load"):
+        hf_token = os.getenv("HF_TOKEN")
+        df, revision = load_dataset_cached(
+            request["dataset"], request["symbols"], token=hf_token
+        )
+
+    with ctx.stage("features"):
+        # Feature engineering and labeling, skipped when cached
+        feature_config = request.get("feature_config") or {}
+        df = build_features_cached(
+            df,
+            request["dataset"],
+            revision,
+            request["symbols"],
+            feature_config,
+            request["target_horizon"],
+            request["task"]
+        )
+
+    with ctx.stage("split"):
+        train_ratio = 0.7
+        valid_ratio = 0.15
+        train_df, valid_df, _ = split_frame(df, train_ratio, valid_ratio)
+
+    with ctx.stage("train"):
+        model_config = request.get("model_config") or {}
+        model = MLModel(request["model"], request["task"], model_config)
+        trained_model, training_info = train_model(train_df, valid_df, model)
+
+    with ctx.stage("save"):
+        model_id = f"{request['model']}_{request['task']}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        dataset_info = {
+            "dataset": request["dataset"],
+            "revision": revision,
+            "symbols": request["symbols"],
+            "timeframe": request["timeframe"],
+            "feature_config": feature_config,
+            "samples": len(df),
+            "train_samples": len(train_df),
+            "valid_samples": len(valid_df),
+            "target_horizon": request["target_horizon"]
+        }
+
+        model_dir = save_training_artifacts(
+            trained_model,
+            training_info,
+            model_id,
+            dataset_info
+        )
+
+    return {
+        "model_id": model_id,
+        "model_dir": model_dir,
+        "metrics": training_info["metrics"]
+    }
+
+
+def _metric_value(metrics: Dict[str, Any], name: str) -> Optional[float]:
+    value = metrics.get(name, metrics.get("valid", {}).get(name))
+    return float(value) if value is not None else None
+
+
+def _train_candidate(
+    train_spec: Dict[str, Any],
+    valid_spec: Dict[str, Any],
+    model_name: str,
+    task: str,
+    model_config: Dict[str, Any]
+):
+    """Train one candidate in a pool process on the shared train/valid frames."""
+    train_df, train_segments = attach_frame(train_spec)
+    valid_df, valid_segments = attach_frame(valid_spec)
+    try:
+        model = MLModel(model_name, task, model_config)
+        return train_model(train_df, valid_df, model)
+    finally:
+        del train_df, valid_df
+        detach(train_segments + valid_segments)
+
+
+def run_multi_training(request: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    """
+    Train several model candidates on one feature matrix and rank them.
+
+    The dataset is loaded and featurized once; the train and valid splits
+    are placed in shared memory and the candidates are fitted concurrently
+    on a process pool. Returns a leaderboard ordered by ``rank_by``.
+    """
+    task = request["task"]
+    candidates: List[Dict[str, Any]] = request["candidates"]
+    rank_by = request.get("rank_by") or DEFAULT_RANK_BY[task]
+
+    with ctx.stage("load"):
+        hf_token = os.getenv("HF_TOKEN")
+        df, revision = load_dataset_cached(
+            request["dataset"], request["symbols"], token=hf_token
+        )
+
+    with ctx.stage("features"):
+        feature_config = request.get("feature_config") or {}
+        df = build_features_cached(
+            df,
+            request["dataset"],
+            revision,
+            request["symbols"],
+            feature_config,
+            request["target_horizon"],
+            task
+        )
+
+    with ctx.stage("split"):
+        train_df, valid_df, _ = split_frame(df, 0.7, 0.15)
+        shared_train = SharedFrame(train_df)
+        shared_valid = SharedFrame(valid_df)
+
+    trained = {}
+    errors = {}
+    try:
+        with ctx.stage("train"):
+            max_workers = request.get("max_workers") or min(len(candidates), os.cpu_count() or 1)
+            with ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        _train_candidate,
+                        shared_train.spec,
+                        shared_valid.spec,
+                        candidate["model"],
+                        task,
+                        candidate.get("model_config") or {}
+                    ): index
+                    for index, candidate in enumerate(candidates)
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    index = futures[future]
+                    try:
+                        trained[index] = future.result()
+                    except Exception as e:
+                        errors[index] = str(e)
+                    ctx.report(done / len(candidates))
+    finally:
+        shared_train.release()
+        shared_valid.release()
+
+    leaderboard = []
+    for index, candidate in enumerate(candidates):
+        entry = {
+            "candidate": index,
+            "model": candidate["model"],
+            "model_config": candidate.get("model_config") or {},
+        }
+        if index in trained:
+            metrics = trained[index][1]["metrics"]
+            entry["metrics"] = metrics
+            entry["score"] = _metric_value(metrics, rank_by)
+        else:
+            entry["error"] = errors[index]
+            entry["score"] = None
+        leaderboard.append(entry)
+
+    # Failed candidates and ones missing the metric rank last
+    sign = 1 if rank_by in LOWER_IS_BETTER else -1
+    leaderboard.sort(key=lambda e: (e["score"] is None, sign * (e["score"] or 0)))
+    for rank, entry in enumerate(leaderboard, start=1):
+        entry["rank"] = rank
+
+    with ctx.stage("save"):
+        save_all = request.get("save_models") == "all"
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        dataset_info = {
+            "dataset": request["dataset"],
+            "revision": revision,
+            "symbols": request["symbols"],
+            "timeframe": request["timeframe"],
+            "feature_config": feature_config,
+            "samples": len(df),
+            "train_samples": len(train_df),
+            "valid_samples": len(valid_df),
+            "target_horizon": request["target_horizon"]
+        }
+        for entry in leaderboard:
+            if entry["score"] is None or not (save_all or entry["rank"] == 1):
+                continue
+            trained_model, training_info = trained[entry["candidate"]]
+            model_id = f"{entry['model']}_{task}_{timestamp}_{entry['candidate']}"
+            entry["model_id"] = model_id
+            entry["model_dir"] = save_training_artifacts(
+                trained_model,
+                training_info,
+                model_id,
+                dataset_info
+            )
+
+    return {
+        "rank_by": rank_by,
+        "best_model_id": leaderboard[0].get("model_id"),
+        "leaderboard": leaderboard
+    }
+
+
+def _run_trial(
+    train_spec: Dict[str, Any],
+    valid_spec: Dict[str, Any],
+    model_name: str,
+    task: str,
+    model_config: Dict[str, Any],
+    resource: str,
+    amount: float
+) -> Dict[str, Any]:
+    """Fit one configuration on a budget in a pool process; returns its metrics."""
+    train_df, train_segments = attach_frame(train_spec)
+    valid_df, valid_segments = attach_frame(valid_spec)
+    try:
+        if resource == "samples":
+            # The most recent rows, closest to the validation period
+            train_df = train_df.iloc[-max(int(len(train_df) * amount), 1):]
+        else:
+            model_config = {**model_config, resource: resource_amount(resource, amount)}
+        model = MLModel(model_name, task, model_config)
+        _, training_info = train_model(train_df, valid_df, model)
+        return training_info["metrics"]
+    finally:
+        del train_df, valid_df
+        detach(train_segments + valid_segments)
+
+
+def run_hyperparameter_search(request: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    """
+    Tune one model with successive halving or Hyperband and save the best
+    configuration refitted on the full budget.
+
+    Trials of a rung run concurrently on a process pool of ``max_workers``
+    processes (the CPU budget) sharing the train/valid frames. After each
+    rung only the best ``1/eta`` configurations continue, on ``eta`` times
+    the resource. No new rung starts once ``time_budget_minutes`` is spent.
+    """
+    task = request["task"]
+    rank_by = request.get("rank_by") or DEFAULT_RANK_BY[task]
+    lower_is_better = rank_by in LOWER_IS_BETTER
+    resource = request["resource"]
+    min_resource = request["min_resource"]
+    max_resource = request["max_resource"]
+    eta = request["eta"]
+    base_config = request.get("model_config") or {}
+    rng = random.Random(request.get("seed"))
+    validate_budget(request["model"], resource, min_resource, max_resource, eta)
+
+    if request["strategy"] == "hyperband":
+        brackets = hyperband_brackets(min_resource, max_resource, eta)
+    else:
+        brackets = [successive_halving_rungs(request["n_configs"], min_resource, max_resource, eta)]
+    planned = sum(n for rungs in brackets for n, _ in rungs)
+
+    with ctx.stage("load"):
+        hf_token = os.getenv("HF_TOKEN")
+        df, revision = load_dataset_cached(
+            request["dataset"], request["symbols"], token=hf_token
+        )
+
+    with ctx.stage("features"):
+        feature_config = request.get("feature_config") or {}
+        df = build_features_cached(
+            df,
+            request["dataset"],
+            revision,
+            request["symbols"],
+            feature_config,
+            request["target_horizon"],
+            task
+        )
+
+    with ctx.stage("split"):
+        train_df, valid_df, _ = split_frame(df, 0.7, 0.15)
+        shared_train = SharedFrame(train_df)
+        shared_valid = SharedFrame(valid_df)
+
+    trials: List[Dict[str, Any]] = []
+    deadline = None
+    if request.get("time_budget_minutes"):
+        deadline = time.monotonic() + request["time_budget_minutes"] * 60
+    out_of_time = False
+    try:
+        with ctx.stage("search"):
+            max_workers = request.get("max_workers") or os.cpu_count() or 1
+            with ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                for bracket, rungs in enumerate(brackets):
+                    configs = [
+                        {**base_config, **sample_config(request["search_space"], rng)}
+                        for _ in range(rungs[0][0])
+                    ]
+                    for rung, (keep, amount) in enumerate(rungs):
+                        if deadline is not None and time.monotonic() >= deadline:
+                            out_of_time = True
+                            break
+
+                        futures = {
+                            executor.submit(
+                                _run_trial,
+                                shared_train.spec,
+                                shared_valid.spec,
+                                request["model"],
+                                task,
+                                config,
+                                resource,
+                                amount
+                            ): config
+                            for config in configs[:keep]
+                        }
+                        rung_trials = []
+                        for future in as_completed(futures):
+                            trial = {
+                                "bracket": bracket,
+                                "rung": rung,
+                                "resource": amount,
+                                "model_config": futures[future]
+                            }
+                            try:
+                                trial["metrics"] = future.result()
+                                trial["score"] = _metric_value(trial["metrics"], rank_by)
+                            except Exception as e:
+                                trial["error"] = str(e)
+                                trial["score"] = None
+                            rung_trials.append(trial)
+                            trials.append(trial)
+                            ctx.report(len(trials) / planned)
+
+                        # Survivors continue on the next rung's larger budget
+                        configs = [t["model_config"] for t in rank_trials(rung_trials, lower_is_better)]
+                    if out_of_time:
+                        break
+    finally:
+        shared_train.release()
+        shared_valid.release()
+
+    best = best_trial(trials, lower_is_better)
+    if best is None:
+        raise RuntimeError(f"No trial produced a {rank_by} score")
+
+    with ctx.stage("refit"):
+        best_config = dict(best["model_config"])
+        if resource == "n_estimators":
+            best_config[resource] = resource_amount(resource, max_resource)
+        model = MLModel(request["model"], task, best_config)
+        trained_model, training_info = train_model(train_df, valid_df, model)
+
+    with ctx.stage("save"):
+        model_id = f"{request['model']}_{task}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_tuned"
+        dataset_info = {
+            "dataset": request["dataset"],
+            "revision": revision,
+            "symbols": request["symbols"],
+            "timeframe": request["timeframe"],
+            "feature_config": feature_config,
+            "samples": len(df),
+            "train_samples": len(train_df),
+            "valid_samples": len(valid_df),
+            "target_horizon": request["target_horizon"]
+        }
+        model_dir = save_training_artifacts(
+            trained_model,
+            training_info,
+            model_id,
+            dataset_info
+        )
+
+    return {
+        "model_id": model_id,
+        "model_dir": model_dir,
+        "rank_by": rank_by,
+        "best_config": best_config,
+        "metrics": training_info["metrics"],
+        "trials_run": len(trials),
+        "trials_planned": planned,
+        "out_of_time": out_of_time,
+        "trials": rank_trials(trials, lower_is_better)
+    }
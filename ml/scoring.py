@@ -0,0 +1,124 @@
+"""Vectorized batch scoring of saved models on candles or dataset rows."""
+
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from feature_cache import build_feature_matrix, feature_columns
+from frame_dtypes import parse_timestamps
+
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def read_arrow_stream(body: bytes) -> pd.DataFrame:
+    """Decode an Arrow IPC stream (e.g. a request body) into a DataFrame."""
+    return pa.ipc.open_stream(pa.BufferReader(body)).read_all().to_pandas()
+
+
+def write_arrow_stream(df: pd.DataFrame) -> bytes:
+    """Encode a DataFrame as an Arrow IPC stream."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def candles_frame(candles: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """Candles with symbol, timestamp (ms or ISO) and OHLCV fields, in time order per symbol."""
+    frame = candles.copy() if isinstance(candles, pd.DataFrame) else pd.DataFrame(candles)
+    missing = {"symbol", "timestamp"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"Candles are missing {', '.join(sorted(missing))}")
+    frame["timestamp"] = parse_timestamps(frame["timestamp"])
+    return frame.sort_values(["symbol", "timestamp"], kind="stable")
+
+
+def featurize_candles(candles: pd.DataFrame, feature_config: Dict[str, Any]) -> pd.DataFrame:
+    """Run the feature pipeline on each symbol's candles; the index is the timestamp."""
+    frames = [
+        build_feature_matrix(rows.set_index("timestamp"), feature_config).assign(symbol=symbol)
+        for symbol, rows in candles.groupby("symbol", sort=False, observed=True)
+    ]
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+
+def _row_keys(features: pd.DataFrame) -> pd.DataFrame:
+    if isinstance(features.index, pd.DatetimeIndex):
+        times = pd.Series(features.index)
+    else:
+        times = pd.to_datetime(features["timestamp"]).reset_index(drop=True)
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert(None)
+    return pd.DataFrame({
+        "symbol": features["symbol"].astype(str).to_numpy(),
+        "timestamp": times.to_numpy()
+    })
+
+
+def score_features(
+    model,
+    features: pd.DataFrame,
+    points: Optional[pd.DataFrame] = None,
+    latest_only: bool = False
+) -> pd.DataFrame:
+    """
+    Score featurized rows with one vectorized predict call.
+
+    Rows whose features are incomplete (e.g. indicator warm-up) are skipped.
+    ``points`` (symbol and timestamp columns) restricts scoring to those
+    rows; ``latest_only`` keeps the most recent scorable row per symbol.
+
+    Returns:
+        One row per scored point: symbol, timestamp, prediction and, for
+        classifiers, one ``proba_<class>`` column per class
+    """
+    keys = _row_keys(features)
+    columns = feature_columns(model, features)
+    mask = features[columns].notna().all(axis=1).to_numpy()
+
+    if points is not None:
+        wanted = pd.MultiIndex.from_arrays([
+            points["symbol"].astype(str), parse_timestamps(points["timestamp"])
+        ])
+        mask &= pd.MultiIndex.from_frame(keys).isin(wanted)
+
+    positions = np.flatnonzero(mask)
+    if latest_only:
+        last = keys.iloc[positions].drop_duplicates("symbol", keep="last")
+        positions = last.index.to_numpy()
+
+    scores = keys.iloc[positions].reset_index(drop=True)
+    if not len(positions):
+        return scores
+
+    X = features.iloc[positions][columns]
+    if model.task == "classification":
+        proba = np.asarray(model.predict_proba(X))
+        classes = getattr(model, "classes_", None)
+        classes = np.asarray(classes) if classes is not None else np.arange(proba.shape[1])
+        scores["prediction"] = classes[proba.argmax(axis=1)]
+        for index, label in enumerate(classes):
+            scores[f"proba_{label}"] = proba[:, index]
+    else:
+        scores["prediction"] = np.asarray(model.predict(X))
+    return scores
+
+
+def score_candles(
+    model,
+    candles: Union[pd.DataFrame, List[Dict[str, Any]]],
+    feature_config: Dict[str, Any],
+    points: Optional[pd.DataFrame] = None,
+    latest_only: bool = False
+) -> pd.DataFrame:
+    """
+    Score raw candles. Each symbol needs enough history before the scored
+    rows for the indicators to warm up; earlier rows are not scored.
+    """
+    features = featurize_candles(candles_frame(candles), feature_config)
+    if features.empty:
+        return pd.DataFrame(columns=["symbol", "timestamp", "prediction"])
+    return score_features(model, features, points, latest_only)
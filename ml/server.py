@@ -1,29 +1,39 @@
 """FastAPI server for ML training and backtesting."""
 
 import os
+import copy
+import asyncio
 import json
 import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Literal
-from fastapi import FastAPI, HTTPException, APIRouter
+from fastapi import FastAPI, HTTPException, APIRouter, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import pandas as pd
 
-from core.data import (
-    load_hf_dataset,
-    feature_engineering,
-    labeling,
-    time_series_split
-)
 from core.model import MLModel
-from core.train import (
-    train_model,
-    save_training_artifacts,
-    load_model_with_metadata,
-    list_models
+from core.train import train_model
+
+from artifact_catalog import ArtifactCatalog
+from dataset_cache import load_dataset_cached
+from feature_cache import build_features_cached
+from frame_dtypes import split_frame
+from instrumentation import measure
+from jobs import JobStore, WorkerPool
+from model_registry import ModelRegistry
+from online import OnlineLearningService
+from scoring import ARROW_STREAM_TYPE, read_arrow_stream, write_arrow_stream, score_candles
+from walk_forward import ParallelWalkForward
+from pipeline import (
+    run_training,
+    run_multi_training,
+    run_hyperparameter_search,
+    TRAINING_STAGES,
+    MULTI_TRAINING_STAGES,
+    SEARCH_STAGES
 )
-from core.backtest import WalkForwardBacktest
+from tuning import validate_budget, validate_space
 
 
 app = FastAPI(title="ML Training & Backtesting Service", version="1.0.0")
@@ -40,9 +50,39 @@ app.add_middleware(
 # API Router for v1
 api_v1_router = APIRouter(prefix="/api/v1")
 
-# In-memory job registry
+# In-memory job registry (backtests)
 jobs: Dict[str, Dict[str, Any]] = {}
 
+# Persistent training jobs, run in worker processes
+JOBS_DB_PATH = os.getenv(
+    "ML_JOBS_DB",
+    os.path.join(os.path.dirname(__file__), "..", "jobs", "jobs.db")
+)
+ML_WORKERS = int(os.getenv("ML_WORKERS", "2"))
+
+# Index of backtest reports behind /artifacts
+artifact_catalog = ArtifactCatalog(os.getenv("ML_ARTIFACT_CATALOG"))
+
+# Saved models, with the most recently used ones kept deserialized
+model_registry = ModelRegistry(max_models=int(os.getenv("ML_MODEL_CACHE_SIZE", "4")))
+
+# Online learning sessions updating served partial_fit models
+online_service = OnlineLearningService(model_registry)
+
+# Processes per backtest for independent walk-forward folds
+BACKTEST_WORKERS = int(os.getenv("ML_BACKTEST_WORKERS", str(os.cpu_count() or 1)))
+
+job_store = JobStore(JOBS_DB_PATH)
+worker_pool = WorkerPool(
+    job_store,
+    {
+        "train": (run_training, TRAINING_STAGES),
+        "train_multi": (run_multi_training, MULTI_TRAINING_STAGES),
+        "train_search": (run_hyperparameter_search, SEARCH_STAGES)
+    },
+    concurrency=ML_WORKERS
+)
+
 
 class TrainRequest(BaseModel):
     """Training request schema."""
@@ -58,6 +98,75 @@ class TrainRequest(BaseModel):
     model_config: Optional[Dict] = None
 
 
+class ModelCandidate(BaseModel):
+    """One model type and config in a multi-model training request."""
+    model: Literal["gbc", "rfc", "sgdc", "gbr", "sgdr"]
+    model_config: Optional[Dict] = None
+
+
+class MultiTrainRequest(BaseModel):
+    """Multi-model training request schema."""
+    dataset: str
+    symbols: List[str]
+    timeframe: str
+    task: Literal["classification", "regression"]
+    target_horizon: int
+    candidates: List[ModelCandidate]
+    rank_by: Optional[str] = None  # accuracy / rmse by task when unset
+    max_workers: Optional[int] = None
+    save_models: Literal["best", "all"] = "best"
+    feature_config: Optional[Dict] = None
+
+
+class SearchRequest(BaseModel):
+    """Hyperparameter search request schema."""
+    dataset: str
+    symbols: List[str]
+    timeframe: str
+    task: Literal["classification", "regression"]
+    target_horizon: int
+    model: Literal["gbc", "rfc", "sgdc", "gbr", "sgdr"]
+    search_space: Dict[str, Any]  # param -> [values] or {"low", "high", "log", "type"}
+    model_config: Optional[Dict] = None  # fixed params shared by every trial
+    strategy: Literal["hyperband", "successive_halving"] = "hyperband"
+    resource: Literal["samples", "n_estimators"] = "samples"
+    min_resource: float = 1 / 27  # fraction of training rows, or estimators
+    max_resource: float = 1.0
+    eta: int = 3
+    n_configs: int = 27  # successive halving only
+    rank_by: Optional[str] = None  # accuracy / rmse by task when unset
+    max_workers: Optional[int] = None  # CPU budget; all cores when unset
+    time_budget_minutes: Optional[float] = None
+    seed: Optional[int] = None
+    feature_config: Optional[Dict] = None
+
+
+class OnlineStartRequest(BaseModel):
+    """Online learning session request schema."""
+    model_id: str
+    target_horizon: Optional[int] = None  # from the model's metadata when unset
+    feature_config: Optional[Dict] = None
+    batch_size: int = 256
+    max_wait_seconds: float = 300
+    checkpoint_minutes: float = 15
+
+
+class CandleBatch(BaseModel):
+    """New candles: dicts with symbol, timestamp (ms or ISO) and OHLCV fields."""
+    candles: List[Dict[str, Any]]
+
+
+class ScoreRequest(BaseModel):
+    """Batch scoring request: raw candles, or points of a dataset."""
+    model_id: str = "latest"
+    candles: Optional[List[Dict[str, Any]]] = None
+    dataset: Optional[str] = None  # the model's training dataset when unset
+    symbols: Optional[List[str]] = None
+    points: Optional[List[Dict[str, Any]]] = None  # {symbol, timestamp}; all rows when unset
+    feature_config: Optional[Dict] = None  # the model's training config when unset
+    latest_only: bool = False
+
+
 class BacktestRequest(BaseModel):
     """Backtest request schema."""
     model_id: Optional[str] = None
@@ -74,6 +183,23 @@ class BacktestRequest(BaseModel):
     sell_threshold: float = 0.4
 
 
+@app.on_event("startup")
+async def start_worker_pool():
+    """Start running queued jobs, including ones interrupted by a restart."""
+    worker_pool.start()
+    online_service.start()
+
+    # Index reports saved before the catalog existed
+    artifact_catalog.sync()
+
+
+@app.on_event("shutdown")
+async def stop_worker_pool():
+    """Stop dispatching; running jobs finish in their own processes."""
+    worker_pool.stop()
+    await online_service.stop()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -89,104 +215,123 @@ async def root():
 @api_v1_router.post("/train/start")
 async def start_training(request: TrainRequest):
     """
-    Start model training job.
+    Queue a model training job.
 
-    Returns job_id for tracking progress.
+    Returns job_id for tracking progress; the job runs in a worker process.
     """
-    job_id = str(uuid.uuid4())
+    job = job_store.create("train", request.dict())
 
-    jobs[job_id] = {
-        "job_id": job_id,
-        "status": "running",
-        "progress": 0,
-        "created_at": datetime.utcnow().isoformat(),
-        "type": "train",
-        "request": request.dict()
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "model_id": None
     }
 
-    try:
-        # Load dataset
-        hf_token = os.getenv("HF_TOKEN")
-        df = load_hf_dataset(request.dataset, token=hf_token)
 
-        jobs[job_id]["progress"] = 20
+@api_v1_router.post("/train/multi")
+async def start_multi_training(request: MultiTrainRequest):
+    """
+    Queue a job training several model candidates on one feature matrix.
 
-        # Filter by symbols if needed
-        if "symbol" in df.columns:
-            df = df[df["symbol"].isin(request.symbols)]
+    The job result holds a leaderboard ranked by ``rank_by``.
+    """
+    if not request.candidates:
+        raise HTTPException(status_code=400, detail="At least one candidate is required")
 
-        # Feature engineering
-        feature_config = request.feature_config or {}
-        df = feature_engineering(df, feature_config)
+    job = job_store.create("train_multi", request.dict())
 
-        jobs[job_id]["progress"] = 40
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "candidates": len(request.candidates)
+    }
 
-        # Labeling
-        df, target = labeling(df, request.target_horizon, request.task)
-        df["target"] = target
 
-        # Time series split
-        train_ratio = 0.7
-        valid_ratio = 0.15
-        train_df, valid_df, _ = time_series_split(df, train_ratio, valid_ratio)
+@api_v1_router.post("/train/search")
+async def start_hyperparameter_search(request: SearchRequest):
+    """
+    Queue a hyperparameter search job (successive halving or Hyperband).
 
-        jobs[job_id]["progress"] = 60
+    The job result holds the best configuration, the model refitted with
+    it and every trial ranked by ``rank_by``.
+    """
+    try:
+        validate_space(request.search_space)
+        validate_budget(
+            request.model, request.resource, request.min_resource, request.max_resource, request.eta
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Create model
-        model_config = request.model_config or {}
-        model = MLModel(request.model, request.task, model_config)
+    job = job_store.create("train_search", request.dict())
 
-        # Train
-        trained_model, training_info = train_model(train_df, valid_df, model)
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "strategy": request.strategy
+    }
 
-        jobs[job_id]["progress"] = 80
 
-        # Save artifacts
-        model_id = f"{request.model}_{request.task}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-        dataset_info = {
-            "dataset": request.dataset,
-            "symbols": request.symbols,
-            "timeframe": request.timeframe,
-            "samples": len(df),
-            "train_samples": len(train_df),
-            "valid_samples": len(valid_df),
-            "target_horizon": request.target_horizon
-        }
+@api_v1_router.get("/train/status")
+async def get_training_status(job_id: str):
+    """Get training job status, progress and per-stage progress."""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-        model_dir = save_training_artifacts(
-            trained_model,
-            training_info,
-            model_id,
-            dataset_info
-        )
+    return job
 
-        jobs[job_id]["progress"] = 100
-        jobs[job_id]["status"] = "completed"
-        jobs[job_id]["result"] = {
-            "model_id": model_id,
-            "model_dir": model_dir,
-            "metrics": training_info["metrics"]
-        }
 
-    except Exception as e:
-        jobs[job_id]["status"] = "failed"
-        jobs[job_id]["error"] = str(e)
-        raise HTTPException(status_code=500, detail=str(e))
+@api_v1_router.post("/train/cancel")
+async def cancel_training(job_id: str):
+    """Cancel a queued or running training job."""
+    job = job_store.request_cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-    return {
-        "job_id": job_id,
-        "status": jobs[job_id]["status"],
-        "model_id": jobs[job_id].get("result", {}).get("model_id")
-    }
+    return job
 
 
-@api_v1_router.get("/train/status")
-async def get_training_status(job_id: str):
-    """Get training job status and progress."""
-    if job_id not in jobs:
+@api_v1_router.get("/train/jobs")
+async def list_training_jobs(status: Optional[str] = None, limit: int = 100):
+    """List training jobs, most recent first."""
+    jobs_list = job_store.list(status=status, limit=limit)
+    return {"jobs": jobs_list, "count": len(jobs_list)}
+
+
+@api_v1_router.get("/jobs/{job_id}/metrics")
+async def get_job_metrics(job_id: str):
+    """
+    Wall time, CPU time and peak RSS of a training job's or backtest's
+    stages, with the steps measured inside each (dataset load, symbol
+    filter, feature engineering, labeling, walk-forward folds, ...).
+    """
+    job = job_store.get(job_id)
+    if job is not None:
+        stages = [
+            {"name": name, "status": stage["status"], **stage.get("metrics", {})}
+            for name, stage in (job["stages"] or {}).items()
+        ]
+    elif job_id in jobs:
+        job = jobs[job_id]
+        stages = list(job.get("metrics", {}).get("steps", []))
+    else:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return jobs[job_id]
+    measured = [stage for stage in stages if "wall_seconds" in stage]
+    peaks = [stage["peak_rss_mb"] for stage in measured if stage.get("peak_rss_mb") is not None]
+    return {
+        "job_id": job_id,
+        "type": job["type"],
+        "status": job["status"],
+        "stages": stages,
+        "total": {
+            "wall_seconds": round(sum(stage["wall_seconds"] for stage in measured), 4),
+            "cpu_seconds": round(sum(stage["cpu_seconds"] for stage in measured), 4),
+            "child_cpu_seconds": round(sum(stage["child_cpu_seconds"] for stage in measured), 4),
+            "peak_rss_mb": max(peaks) if peaks else None
+        }
+    }
 
 
 @api_v1_router.post("/backtest/run")
@@ -208,109 +353,117 @@ async def run_backtest(request: BacktestRequest):
     }
 
     try:
-        # Load or train model
-        if request.model_id:
-            # Use existing model
-            if request.model_id == "latest":
-                models_list = list_models()
-                if not models_list:
-                    raise ValueError("No trained models found")
-                model_id = models_list[0]["model_id"]
+        # Stage timings, CPU time and peak RSS; filled in as the run ends
+        with measure("backtest") as metrics:
+            jobs[job_id]["metrics"] = metrics
+
+            # Load or train model
+            if request.model_id:
+                # Use existing model
+                if request.model_id == "latest":
+                    model_id = model_registry.latest_model_id()
+                    if model_id is None:
+                        raise ValueError("No trained models found")
+                else:
+                    model_id = request.model_id
+
+                # The backtest refits the model, so it gets its own copy
+                with model_registry.use(model_id) as (cached_model, metadata):
+                    model = copy.deepcopy(cached_model)
+                dataset_id = metadata["dataset"]["dataset"]
+                raw_df = None
             else:
-                model_id = request.model_id
-
-            model, metadata = load_model_with_metadata(model_id)
-            dataset_id = metadata["dataset"]["dataset"]
-        else:
-            # Auto-train mode
-            if not request.dataset:
-                raise ValueError("Either model_id or dataset must be provided")
-
-            dataset_id = request.dataset
-
-            # Quick training
-            hf_token = os.getenv("HF_TOKEN")
-            df = load_hf_dataset(dataset_id, token=hf_token)
-
-            if "symbol" in df.columns:
-                df = df[df["symbol"].isin(request.symbols)]
-
-            df = feature_engineering(df, {})
-            df, target = labeling(df, 12, "classification")
-            df["target"] = target
-
-            train_df, valid_df, _ = time_series_split(df, 0.7, 0.15)
-
-            model = MLModel("gbc", "classification", {})
-            model, _ = train_model(train_df, valid_df, model)
-
-        jobs[job_id]["progress"] = 30
-
-        # Load backtest dataset
-        hf_token = os.getenv("HF_TOKEN")
-        df = load_hf_dataset(dataset_id, token=hf_token)
-
-        if "symbol" in df.columns:
-            df = df[df["symbol"].isin(request.symbols)]
-
-        # Feature engineering
-        df = feature_engineering(df, {})
-
-        # Labeling
-        df, target = labeling(df, 12, model.task)
-        df["target"] = target
-
-        jobs[job_id]["progress"] = 50
-
-        # Parse window sizes
-        train_window_days = int(request.train_window.replace("d", ""))
-        test_window_days = int(request.test_window.replace("d", ""))
-
-        # Run backtest
-        backtest = WalkForwardBacktest(
-            model=model,
-            train_window_days=train_window_days,
-            test_window_days=test_window_days,
-            online_learning=request.online,
-            fees_bps=request.fees_bps,
-            slippage_bps=request.slippage_bps
-        )
-
-        results = backtest.run(
-            df,
-            buy_threshold=request.buy_threshold,
-            sell_threshold=request.sell_threshold
-        )
-
-        jobs[job_id]["progress"] = 80
-
-        # Save artifacts
-        run_id = f"backtest_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-        artifact_dir = backtest.save_artifacts(run_id)
-
-        # Save report
-        report = {
-            "run_id": run_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "config": request.dict(),
-            "results": results
-        }
-
-        with open(os.path.join(artifact_dir, "report.json"), "w") as f:
-            json.dump(report, f, indent=2)
-
-        # Save updated model if online learning
-        if request.online and request.save_updates and model.supports_partial_fit():
-            updated_model_id = f"{request.model_id or 'auto'}_updated_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-            model.save(os.path.join(os.path.dirname(__file__), "..", "models", updated_model_id))
-
-        jobs[job_id]["progress"] = 100
-        jobs[job_id]["status"] = "completed"
-        jobs[job_id]["result"] = {
-            "run_id": run_id,
-            "artifact_dir": artifact_dir,
-            "results": results
-        }
+                # Auto-train mode
+                if not request.dataset:
+                    raise ValueError("Either model_id or dataset must be provided")
+
+                dataset_id = request.dataset
+                model_id = None
+
+                # Quick training
+                hf_token = os.getenv("HF_TOKEN")
+                raw_df, revision = load_dataset_cached(dataset_id, request.symbols, token=hf_token)
+
+                df = build_features_cached(
+                    raw_df, dataset_id, revision, request.symbols, {}, 12, "classification"
+                )
+
+                train_df, valid_df, _ = split_frame(df, 0.7, 0.15)
+
+                with measure("fit"):
+                    model = MLModel("gbc", "classification", {})
+                    model, _ = train_model(train_df, valid_df, model)
+
+            jobs[job_id]["progress"] = 30
+
+            # Load backtest dataset (already loaded when auto-training)
+            if raw_df is None:
+                hf_token = os.getenv("HF_TOKEN")
+                raw_df, revision = load_dataset_cached(dataset_id, request.symbols, token=hf_token)
+
+            # Feature engineering and labeling (cached per dataset revision)
+            df = build_features_cached(
+                raw_df, dataset_id, revision, request.symbols, {}, 12, model.task
+            )
+
+            jobs[job_id]["progress"] = 50
+
+            # Parse window sizes
+            train_window_days = int(request.train_window.replace("d", ""))
+            test_window_days = int(request.test_window.replace("d", ""))
+
+            # Run backtest (folds in parallel unless online learning chains them)
+            backtest = ParallelWalkForward(
+                model=model,
+                train_window_days=train_window_days,
+                test_window_days=test_window_days,
+                online_learning=request.online,
+                fees_bps=request.fees_bps,
+                slippage_bps=request.slippage_bps,
+                max_workers=BACKTEST_WORKERS
+            )
+
+            with measure("walk_forward"):
+                results = backtest.run(
+                    df,
+                    buy_threshold=request.buy_threshold,
+                    sell_threshold=request.sell_threshold
+                )
+
+            jobs[job_id]["progress"] = 80
+
+            # Save artifacts
+            run_id = f"backtest_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+            with measure("artifact_save"):
+                artifact_dir = backtest.save_artifacts(run_id)
+
+            # Save report
+            report = {
+                "run_id": run_id,
+                "created_at": datetime.utcnow().isoformat(),
+                "model_id": model_id,
+                "dataset": dataset_id,
+                "config": request.dict(),
+                "results": results
+            }
+
+            with open(os.path.join(artifact_dir, "report.json"), "w") as f:
+                json.dump(report, f, indent=2)
+
+            artifact_catalog.add(report)
+
+            # Save updated model if online learning
+            if request.online and request.save_updates and model.supports_partial_fit():
+                updated_model_id = f"{request.model_id or 'auto'}_updated_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+                model.save(os.path.join(os.path.dirname(__file__), "..", "models", updated_model_id))
+
+            jobs[job_id]["progress"] = 100
+            jobs[job_id]["status"] = "completed"
+            jobs[job_id]["result"] = {
+                "run_id": run_id,
+                "artifact_dir": artifact_dir,
+                "results": results
+            }
 
     except Exception as e:
         jobs[job_id]["status"] = "failed"
@@ -338,17 +491,23 @@ async def get_backtest_status(job_id: str):
 async def get_models():
     """List all saved models with metadata."""
     try:
-        models = list_models()
+        models = model_registry.list()
         return {"models": models, "count": len(models)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@api_v1_router.get("/models/cache")
+async def get_model_cache_stats():
+    """Loaded models, pinned models and hit/miss counters of the registry."""
+    return model_registry.get_stats()
+
+
 @api_v1_router.get("/models/{model_id}/metrics")
 async def get_model_metrics(model_id: str):
     """Get detailed metrics for a specific model."""
     try:
-        _, metadata = load_model_with_metadata(model_id)
+        metadata = model_registry.get_metadata(model_id)
         return metadata
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Model not found")
@@ -356,33 +515,195 @@ async def get_model_metrics(model_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _score(request: ScoreRequest, candles: Optional[pd.DataFrame]):
+    """Score a batch with the registry's cached model; returns (model_id, scores)."""
+    model_id = request.model_id
+    if model_id == "latest":
+        model_id = model_registry.latest_model_id()
+        if model_id is None:
+            raise ValueError("No trained models found")
+
+    points = pd.DataFrame(request.points) if request.points else None
+    with model_registry.use(model_id) as (model, metadata):
+        dataset_info = metadata.get("dataset", {})
+        feature_config = request.feature_config
+        if feature_config is None:
+            feature_config = dataset_info.get("feature_config") or {}
+
+        if candles is not None:
+            return model_id, score_candles(model, candles, feature_config, points, request.latest_only)
+
+        # Score rows of a dataset. Features only: labeling would drop the
+        # newest ``target_horizon`` rows, which latest_only asks for
+        dataset_id = request.dataset or dataset_info["dataset"]
+        symbols = request.symbols or dataset_info.get("symbols")
+        hf_token = os.getenv("HF_TOKEN")
+        raw_df, _ = load_dataset_cached(dataset_id, symbols, token=hf_token)
+        return model_id, score_candles(model, raw_df, feature_config, points, request.latest_only)
+
+
+@api_v1_router.post("/score")
+async def score(request: Request, model_id: str = "latest", latest_only: bool = False):
+    """
+    Score a batch of candles or dataset points with a saved model.
+
+    The body is either a JSON ``ScoreRequest`` or an Arrow IPC stream of
+    candles (``Content-Type: application/vnd.apache.arrow.stream``), with
+    the options passed as query parameters. Results come back as Arrow
+    when the ``Accept`` header asks for it, JSON otherwise.
+    """
+    try:
+        if request.headers.get("content-type", "").startswith(ARROW_STREAM_TYPE):
+            candles = read_arrow_stream(await request.body())
+            score_request = ScoreRequest(model_id=model_id, latest_only=latest_only)
+        else:
+            score_request = ScoreRequest(**await request.json())
+            candles = pd.DataFrame(score_request.candles) if score_request.candles else None
+            if candles is None and not score_request.points and not score_request.latest_only:
+                raise ValueError("Provide candles, points or latest_only")
+
+        # Feature engineering and predict are CPU-bound; keep the event loop free
+        model_id, scores = await asyncio.to_thread(_score, score_request, candles)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Model not found")
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if ARROW_STREAM_TYPE in request.headers.get("accept", ""):
+        return Response(content=write_arrow_stream(scores), media_type=ARROW_STREAM_TYPE)
+
+    scores["timestamp"] = scores["timestamp"].astype(str)
+    return {
+        "model_id": model_id,
+        "scores": scores.to_dict(orient="records"),
+        "count": len(scores)
+    }
+
+
+def _start_online_session(request: OnlineStartRequest):
+    """Load the model if needed and start a session on it."""
+    with model_registry.use(request.model_id) as (model, metadata):
+        horizon = request.target_horizon or metadata["dataset"]["target_horizon"]
+        task = model.task
+    return online_service.start_session(
+        request.model_id,
+        horizon=horizon,
+        task=task,
+        feature_config=request.feature_config,
+        batch_size=request.batch_size,
+        max_wait_seconds=request.max_wait_seconds,
+        checkpoint_seconds=request.checkpoint_minutes * 60
+    )
+
+
+@api_v1_router.post("/online/start")
+async def start_online_learning(request: OnlineStartRequest):
+    """Start updating a served sgdc/sgdr model from incoming candles."""
+    try:
+        # Loading the model reads it from disk; keep the event loop free
+        session = await asyncio.to_thread(_start_online_session, request)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Model not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return session.get_status()
+
+
+@api_v1_router.post("/online/{session_id}/candles")
+async def ingest_online_candles(session_id: str, batch: CandleBatch):
+    """Feed new candles to a session; samples are learned once labels mature."""
+    session = online_service.sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    # Featurizing is CPU-bound; keep the event loop free
+    matured = await asyncio.to_thread(session.ingest, batch.candles) if batch.candles else 0
+    return {"accepted": len(batch.candles), "matured": matured, "pending": session.pending_rows}
+
+
+@api_v1_router.get("/online")
+async def list_online_sessions():
+    """List online learning sessions."""
+    sessions = [session.get_status() for session in online_service.sessions.values()]
+    return {"sessions": sessions, "count": len(sessions)}
+
+
+@api_v1_router.get("/online/{session_id}")
+async def get_online_session(session_id: str):
+    """Get an online learning session's update and checkpoint status."""
+    session = online_service.sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return session.get_status()
+
+
+@api_v1_router.post("/online/{session_id}/stop")
+async def stop_online_session(session_id: str):
+    """Learn pending samples, checkpoint the model and end the session."""
+    if session_id not in online_service.sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return await online_service.stop_session(session_id)
+
+
 @api_v1_router.get("/artifacts")
-async def list_artifacts():
-    """List all saved backtest artifacts."""
-    base_dir = os.path.join(os.path.dirname(__file__), "..", "artifacts")
-
-    if not os.path.exists(base_dir):
-        return {"artifacts": [], "count": 0}
-
-    artifacts = []
-    for run_id in os.listdir(base_dir):
-        report_path = os.path.join(base_dir, run_id, "report.json")
-        if os.path.exists(report_path):
-            with open(report_path, "r") as f:
-                report = json.load(f)
-                artifacts.append({
-                    "run_id": run_id,
-                    "created_at": report.get("created_at"),
-                    "summary": {
-                        "total_return_pct": report.get("results", {}).get("total_return_pct"),
-                        "sharpe_ratio": report.get("results", {}).get("sharpe_ratio"),
-                        "win_rate": report.get("results", {}).get("win_rate")
-                    }
-                })
-
-    artifacts.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-
-    return {"artifacts": artifacts, "count": len(artifacts)}
+async def list_artifacts(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    sort_by: str = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    dataset: Optional[str] = None,
+    symbol: Optional[str] = None,
+    model_id: Optional[str] = None,
+    min_total_return_pct: Optional[float] = None,
+    min_sharpe_ratio: Optional[float] = None,
+    min_win_rate: Optional[float] = None,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None
+):
+    """
+    List saved backtest artifacts from the catalog, one page at a time.
+
+    Pass a response's ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    min_values = {
+        field: value
+        for field, value in (
+            ("total_return_pct", min_total_return_pct),
+            ("sharpe_ratio", min_sharpe_ratio),
+            ("win_rate", min_win_rate)
+        )
+        if value is not None
+    }
+
+    try:
+        limit = min(max(limit, 1), 1000)
+        artifacts, total, next_cursor = artifact_catalog.list(
+            limit=limit,
+            cursor=cursor,
+            sort_by=sort_by,
+            order=order,
+            dataset=dataset,
+            symbol=symbol,
+            model_id=model_id,
+            min_values=min_values,
+            created_after=created_after,
+            created_before=created_before,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "artifacts": artifacts,
+        "count": len(artifacts),
+        "total": total,
+        "limit": limit,
+        "next_cursor": next_cursor
+    }
 
 
 # Include API v1 router
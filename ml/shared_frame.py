@@ -0,0 +1,80 @@
+"""DataFrames shared between processes through shared memory."""
+
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SharedFrame:
+    """
+    Copies the columns of a DataFrame into shared memory once, so worker
+    processes can rebuild it without pickling the data.
+
+    Only ``spec`` (segment names, dtypes and the index) is sent to workers.
+    Object and categorical columns are stored as category codes and rebuilt
+    as categoricals. The creating process owns the segments and must call
+    ``release`` when the workers are done.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.segments: List[shared_memory.SharedMemory] = []
+        columns = []
+        for name in df.columns:
+            series = df[name]
+            categories = None
+            if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+                categorical = series.astype("category")
+                categories = list(categorical.cat.categories)
+                values = categorical.cat.codes.to_numpy()
+            else:
+                values = series.to_numpy()
+
+            segment = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, values.dtype, buffer=segment.buf)[:] = values
+            self.segments.append(segment)
+            columns.append({
+                "name": name,
+                "segment": segment.name,
+                "dtype": values.dtype.str,
+                "length": len(values),
+                "categories": categories
+            })
+
+        self.spec: Dict[str, Any] = {"columns": columns, "index": df.index}
+
+    def release(self):
+        """Free the shared memory segments."""
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+        self.segments = []
+
+
+def attach_frame(spec: Dict[str, Any]) -> Tuple[pd.DataFrame, List[shared_memory.SharedMemory]]:
+    """
+    Rebuild a shared DataFrame in a worker process without copying numeric
+    columns. Treat it as read-only: writes are visible to other workers.
+
+    Returns:
+        (frame, segments); drop the frame before calling ``detach`` on the
+        segments
+    """
+    segments = []
+    data = {}
+    for column in spec["columns"]:
+        segment = shared_memory.SharedMemory(name=column["segment"])
+        segments.append(segment)
+        values = np.ndarray((column["length"],), np.dtype(column["dtype"]), buffer=segment.buf)
+        if column["categories"] is not None:
+            values = pd.Categorical.from_codes(values, column["categories"])
+        data[column["name"]] = values
+
+    return pd.DataFrame(data, index=spec["index"], copy=False), segments
+
+
+def detach(segments: List[shared_memory.SharedMemory]):
+    """Close a worker's view of the shared segments."""
+    for segment in segments:
+        segment.close()
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from artifact_catalog import ArtifactCatalog
+
+
+def report(run_id, created_at, total_return, symbols=("BTC",), dataset="org/candles", **results):
+    return {
+        "run_id": run_id,
+        "created_at": created_at,
+        "config": {
+            "model_id": "gbc_1",
+            "dataset": dataset,
+            "timeframe": "1h",
+            "symbols": list(symbols),
+            "online": False
+        },
+        "results": dict(total_return_pct=total_return, sharpe_ratio=1.0, **results)
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ArtifactCatalog(artifacts_dir=str(tmp_path))
+    catalog.add(report("a", "2024-01-01", 5.0, symbols=("BTC", "ETH")))
+    catalog.add(report("b", "2024-01-02", -2.0, dataset="org/other"))
+    catalog.add(report("c", "2024-01-03", None, symbols=("ETH",)))
+    return catalog
+
+
+def run_ids(page):
+    return [artifact["run_id"] for artifact in page[0]]
+
+
+def all_pages(catalog, limit, **kwargs):
+    pages, cursor = [], None
+    while True:
+        artifacts, _, cursor = catalog.list(limit=limit, cursor=cursor, **kwargs)
+        pages.append([artifact["run_id"] for artifact in artifacts])
+        if cursor is None:
+            return pages
+
+
+def test_newest_runs_first(catalog):
+    artifacts, total, cursor = catalog.list()
+
+    assert total is None and cursor is None
+    assert run_ids((artifacts,)) == ["c", "b", "a"]
+    assert artifacts[2]["summary"]["total_return_pct"] == 5.0
+    assert artifacts[2]["online"] is False
+    assert catalog.list(include_total=True, limit=1)[1] == 3
+
+
+def test_pages_and_sorting(catalog):
+    assert all_pages(catalog, 2) == [["c", "b"], ["a"]]
+    # Runs without the field sort as its smallest value
+    assert run_ids(catalog.list(sort_by="total_return_pct", order="asc")) == ["c", "b", "a"]
+
+    with pytest.raises(ValueError):
+        catalog.list(sort_by="rowid")
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "run_id", "total_return_pct", "sharpe_ratio"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_match_a_single_listing(catalog, sort_by, order):
+    # Ties and missing values on both sides of page boundaries
+    catalog.add(report("d", "2024-01-02", 5.0))
+    catalog.add(report("e", "2024-01-04", None))
+    catalog.add(report("f", "2024-01-02", -2.0))
+
+    expected = run_ids(catalog.list(sort_by=sort_by, order=order))
+    for limit in (1, 2, 4):
+        pages = all_pages(catalog, limit, sort_by=sort_by, order=order)
+        assert sum(pages, []) == expected
+
+
+def test_cursor_must_match_the_listing(catalog):
+    cursor = catalog.list(limit=1)[2]
+
+    with pytest.raises(ValueError):
+        catalog.list(cursor=cursor, order="asc")
+    with pytest.raises(ValueError):
+        catalog.list(cursor="not a cursor")
+
+
+def test_filters(catalog):
+    assert run_ids(catalog.list(symbol="ETH")) == ["c", "a"]
+    assert run_ids(catalog.list(dataset="org/other")) == ["b"]
+    assert run_ids(catalog.list(min_values={"total_return_pct": 0})) == ["a"]
+    assert run_ids(catalog.list(created_after="2024-01-02", created_before="2024-01-03")) == ["b"]
+    assert catalog.list(model_id="missing", include_total=True) == ([], 0, None)
+
+    with pytest.raises(ValueError):
+        catalog.list(min_values={"run_id": 0})
+
+
+def test_reindexing_replaces_symbols(catalog):
+    catalog.add(report("a", "2024-01-01", 6.0, symbols=("SOL",)))
+
+    assert run_ids(catalog.list(symbol="SOL")) == ["a"]
+    assert run_ids(catalog.list(symbol="BTC")) == ["b"]
+    assert catalog.list(include_total=True)[1] == 3
+
+
+def test_sync_indexes_reports_written_elsewhere(catalog, tmp_path):
+    run_dir = tmp_path / "d"
+    run_dir.mkdir()
+    payload = report("d", "2024-01-04", 1.0)
+    del payload["run_id"]
+    (run_dir / "report.json").write_text(json.dumps(payload))
+    broken = tmp_path / "e"
+    broken.mkdir()
+    (broken / "report.json").write_text("{")
+    (tmp_path / "f").mkdir()
+
+    assert catalog.sync() == 1
+    assert run_ids(catalog.list(limit=1)) == ["d"]
+    assert catalog.sync() == 0
@@ -0,0 +1,110 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("core.data")
+pytest.importorskip("huggingface_hub")
+dataset_cache = pytest.importorskip("dataset_cache")
+
+
+class FakeHub:
+    def __init__(self, sha="abc123"):
+        self.sha = sha
+        self.calls = 0
+
+    def dataset_info(self, dataset_id, token=None):
+        self.calls += 1
+        if self.sha is None:
+            raise ConnectionError("offline")
+        return type("Info", (), {"sha": self.sha})()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    loads = []
+
+    def load_hf_dataset(dataset_id, token=None):
+        loads.append(dataset_id)
+        return pd.DataFrame({
+            "symbol": ["BTC", "ETH", "BTC", "SOL"],
+            "timestamp": ["2024-01-01", "2024-01-01", "2024-01-02", "2024-01-02"],
+            "close": [1.0, 2.0, 3.0, 4.0]
+        })
+
+    hub = FakeHub()
+    monkeypatch.setattr(dataset_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(dataset_cache, "load_hf_dataset", load_hf_dataset)
+    monkeypatch.setattr(dataset_cache, "HfApi", lambda: hub)
+    monkeypatch.setattr(dataset_cache, "loads", loads, raising=False)
+    monkeypatch.setattr(dataset_cache, "hub", hub, raising=False)
+    return dataset_cache
+
+
+def test_second_load_is_served_from_cache(cache):
+    first, revision = cache.load_dataset_cached("org/candles", ["BTC", "ETH"])
+    second, _ = cache.load_dataset_cached("org/candles", ["ETH", "BTC"])
+
+    assert revision == "abc123"
+    assert cache.loads == ["org/candles"]
+    pd.testing.assert_frame_equal(first.reset_index(drop=True), second)
+    assert set(second["symbol"]) == {"BTC", "ETH"}
+    assert isinstance(second["symbol"].dtype, pd.CategoricalDtype)
+    assert second["close"].dtype == "float64"
+
+
+def test_symbols_and_revisions_get_their_own_entries(cache, monkeypatch):
+    cache.load_dataset_cached("org/candles", ["BTC"])
+    cache.load_dataset_cached("org/candles", ["SOL"])
+    assert len(cache.loads) == 2
+
+    # A new commit on the Hub invalidates the entry once the TTL expires
+    monkeypatch.setattr(cache, "REVISION_TTL", 0)
+    cache.hub.sha = "def456"
+    _, revision = cache.load_dataset_cached("org/candles", ["BTC"])
+    assert revision == "def456"
+    assert len(cache.loads) == 3
+
+
+def test_revision_is_reused_within_ttl(cache):
+    assert cache.dataset_revision("org/candles") == "abc123"
+    cache.hub.sha = "def456"
+    assert cache.dataset_revision("org/candles") == "abc123"
+    assert cache.hub.calls == 1
+
+
+def test_last_known_revision_is_used_offline(cache, monkeypatch):
+    cache.dataset_revision("org/candles")
+    monkeypatch.setattr(cache, "REVISION_TTL", 0)
+    cache.hub.sha = None
+    assert cache.dataset_revision("org/candles") == "abc123"
+    assert cache.dataset_revision("org/other") is None
+
+
+def test_unknown_revision_loads_without_caching(cache, tmp_path):
+    cache.hub.sha = None
+    df, revision = cache.load_dataset_cached("org/candles")
+
+    assert revision is None
+    assert len(df) == 4
+    assert not any(name.endswith(".feather") for name in os.listdir(tmp_path))
+
+
+def test_local_file_revision_follows_its_contents(cache, tmp_path):
+    path = tmp_path / "candles.csv"
+    path.write_text("a\n1\n")
+    first = cache.dataset_revision(str(path))
+    path.write_text("a\n1\n2\n")
+    assert cache.dataset_revision(str(path)) != first
+
+
+def test_unreadable_entry_is_replaced(cache, tmp_path):
+    cache.load_dataset_cached("org/candles")
+    entry = next(name for name in os.listdir(tmp_path) if name.endswith(".feather"))
+    (tmp_path / entry).write_bytes(b"not feather")
+
+    df, _ = cache.load_dataset_cached("org/candles")
+
+    assert len(df) == 4
+    assert len(cache.loads) == 2
+    assert cache.load_dataset_cached("org/candles")[0].equals(df)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("core.data")
+feature_cache = pytest.importorskip("feature_cache")
+
+CONFIG = {"ema": [12, 26]}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    calls = []
+
+    def feature_engineering(df, feature_config):
+        calls.append("features")
+        df = df.copy()
+        df["ret"] = df["close"].pct_change()
+        return df
+
+    def labeling(df, horizon, task):
+        calls.append("labels")
+        return df, (df["close"].shift(-horizon) > df["close"]).astype(int)
+
+    monkeypatch.setattr(feature_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(feature_cache, "feature_engineering", feature_engineering)
+    monkeypatch.setattr(feature_cache, "labeling", labeling)
+    monkeypatch.setattr(feature_cache, "calls", calls, raising=False)
+    return feature_cache
+
+
+def candles():
+    index = pd.date_range("2024-01-01", periods=6, freq="h", name="timestamp")
+    return pd.DataFrame({"symbol": "BTC", "close": np.arange(1.0, 7.0)}, index=index)
+
+
+def build(cache, revision="abc", **overrides):
+    args = dict(symbols=["BTC"], feature_config=CONFIG, horizon=1, task="classification")
+    args.update(overrides)
+    return cache.build_features_cached(candles(), "org/candles", revision, **args)
+
+
+def test_fingerprint_ignores_symbol_order_and_tracks_inputs():
+    fingerprint = feature_cache.feature_fingerprint
+    base = fingerprint("d", "r", ["BTC", "ETH"], CONFIG, 1, "classification")
+
+    assert fingerprint("d", "r", ["ETH", "BTC"], CONFIG, 1, "classification") == base
+    assert fingerprint("d", "r2", ["BTC", "ETH"], CONFIG, 1, "classification") != base
+    assert fingerprint("d", "r", ["BTC", "ETH"], {"ema": [12]}, 1, "classification") != base
+    assert fingerprint("d", "r", ["BTC", "ETH"], CONFIG, 2, "classification") != base
+    assert fingerprint("d", "r", ["BTC", "ETH"], CONFIG, 1, "regression") != base
+
+
+def test_features_and_targets_are_cached(cache):
+    first = build(cache)
+    second = build(cache)
+
+    assert cache.calls == ["features", "labels"]
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert list(second["target"]) == [1, 1, 1, 1, 1, 0]
+    assert second["ret"].dtype == np.float32
+    assert second["close"].dtype == np.float64
+
+
+def test_changed_inputs_are_rebuilt(cache):
+    build(cache)
+    build(cache, horizon=2)
+    build(cache, revision="def")
+    assert cache.calls.count("features") == 3
+
+
+def test_nothing_is_cached_without_revision(cache, tmp_path):
+    build(cache, revision=None)
+    build(cache, revision=None)
+
+    assert cache.calls.count("features") == 2
+    assert not list(tmp_path.iterdir())
+
+
+def test_unreadable_entry_is_rebuilt(cache, tmp_path):
+    build(cache)
+    for entry in tmp_path.glob("*.feather"):
+        entry.write_bytes(b"not feather")
+
+    assert len(build(cache)) == 6
+    assert cache.calls.count("features") == 2
+
+
+def test_feature_columns_prefer_fitted_names():
+    features = pd.DataFrame({
+        "symbol": ["BTC"], "target": [1], "ret": [0.1], "rsi": [50.0], "note": ["x"]
+    })
+    assert feature_cache.feature_columns(object(), features) == ["ret", "rsi"]
+
+    model = type("Model", (), {"feature_names": ["rsi"]})()
+    assert feature_cache.feature_columns(model, features) == ["rsi"]
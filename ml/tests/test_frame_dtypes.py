@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from frame_dtypes import compact_frame, parse_timestamps, split_frame
+
+
+def candles(symbol: str, periods: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=periods, freq="h"),
+        "symbol": symbol,
+        "close": np.arange(periods, dtype=float),
+        "rsi": np.linspace(0, 100, periods)
+    })
+
+
+def test_split_of_ordered_rows_is_a_view():
+    df = candles("BTC", 100)
+    train, valid, test = split_frame(df, 0.7, 0.15)
+
+    assert (len(train), len(valid), len(test)) == (70, 15, 15)
+    assert np.shares_memory(train["close"].to_numpy(), df["close"].to_numpy())
+
+
+def test_split_of_concatenated_symbols_is_chronological():
+    df = pd.concat([candles("BTC", 100), candles("ETH", 100)], ignore_index=True)
+    train, valid, test = split_frame(df, 0.7, 0.15)
+
+    assert len(train) + len(valid) + len(test) == 200
+    assert train["timestamp"].max() < valid["timestamp"].min()
+    assert valid["timestamp"].max() < test["timestamp"].min()
+    for part in (train, valid, test):
+        assert set(part["symbol"]) == {"BTC", "ETH"}
+
+
+def test_split_never_puts_a_timestamp_in_two_sets():
+    df = pd.concat([candles("BTC", 10), candles("ETH", 10), candles("SOL", 10)])
+    train, valid, test = split_frame(df.set_index("timestamp"), 0.5, 0.25)
+
+    assert len(train) == 15
+    assert not set(train.index) & set(valid.index)
+    assert not set(valid.index) & set(test.index)
+
+
+def test_compact_frame_keeps_prices_and_labels_exact():
+    df = candles("BTC", 10).assign(timestamp=lambda d: d["timestamp"].astype(str), target=1.0)
+    compact = compact_frame(df)
+
+    assert isinstance(compact["symbol"].dtype, pd.CategoricalDtype)
+    assert compact["rsi"].dtype == np.float32
+    assert compact["close"].dtype == np.float64
+    assert compact["target"].dtype == np.float64
+    assert pd.api.types.is_datetime64_any_dtype(compact["timestamp"])
+    assert compact_frame(df, downcast_floats=False)["rsi"].dtype == np.float64
+
+
+def test_parse_timestamps():
+    expected = pd.Timestamp("2024-01-01 01:00")
+    assert parse_timestamps(pd.Series([1704070800000]))[0] == expected
+    assert parse_timestamps(pd.Series(["2024-01-01T03:00:00+02:00"]))[0] == expected
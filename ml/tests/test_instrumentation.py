@@ -0,0 +1,69 @@
+import threading
+
+import instrumentation
+from instrumentation import measure, record_step, step
+
+
+def test_nested_blocks_are_listed_as_steps():
+    with measure("stage") as record:
+        with step("load"):
+            with step("parse"):
+                pass
+        record_step({"name": "fold_0", "wall_seconds": 1.0})
+
+    assert [s["name"] for s in record["steps"]] == ["load", "fold_0"]
+    assert record["steps"][0]["steps"][0]["name"] == "parse"
+    for field in ("wall_seconds", "cpu_seconds", "child_cpu_seconds", "peak_rss_scope"):
+        assert field in record
+
+
+def test_step_without_an_active_block_is_a_no_op():
+    with step("orphan") as record:
+        pass
+    assert record == {}
+    record_step({"name": "ignored"})
+
+
+def test_failed_block_is_marked():
+    try:
+        with measure("stage") as record:
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert record["failed"] is True
+    assert instrumentation._open_spans == {}
+
+
+def test_overlapping_threads_report_process_peaks(monkeypatch):
+    resets = []
+    monkeypatch.setattr(instrumentation, "_reset_peak_rss", lambda: resets.append(1) or True)
+
+    started, release = threading.Event(), threading.Event()
+    records = {}
+
+    def other():
+        with measure("other") as record:
+            started.set()
+            release.wait()
+        records["other"] = record
+
+    with measure("alone") as record:
+        pass
+    assert record["peak_rss_scope"] == "stage"
+    assert len(resets) == 1
+
+    with measure("first") as first:
+        thread = threading.Thread(target=other)
+        thread.start()
+        started.wait()
+        with step("inner") as inner:
+            pass
+        release.set()
+        thread.join()
+
+    # Neither thread reset the counter the other was reading
+    assert len(resets) == 2
+    assert first["peak_rss_scope"] == "process"
+    assert inner["peak_rss_scope"] == "process"
+    assert records["other"]["peak_rss_scope"] == "process"
+    assert instrumentation._open_spans == {}
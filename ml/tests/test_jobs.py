@@ -0,0 +1,140 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import jobs
+
+
+@pytest.fixture
+def store(tmp_path):
+    return jobs.JobStore(str(tmp_path / "jobs.db"))
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_claim_takes_oldest_queued_job(store):
+    first = store.create("train", {"n": 1})
+    second = store.create("train", {"n": 2})
+
+    claimed = store.claim_next()
+    assert claimed["job_id"] == first["job_id"]
+    assert claimed["status"] == jobs.RUNNING
+    assert claimed["started_at"] is not None
+    assert store.claim_next()["job_id"] == second["job_id"]
+    assert store.claim_next() is None
+
+
+def test_claim_records_the_claiming_process(store):
+    store.create("train", {})
+    assert store.claim_next()["pid"] == os.getpid()
+
+
+def test_freshly_claimed_job_is_not_requeued(store):
+    job = store.create("train", {})
+    store.claim_next()
+
+    assert store.requeue_orphans() == 0
+    assert store.get(job["job_id"])["status"] == jobs.RUNNING
+
+
+def test_job_of_dead_process_is_requeued(store):
+    job = store.create("train", {})
+    store.claim_next()
+    store.update(job["job_id"], pid=dead_pid(), progress=40.0, stage="fit")
+
+    assert store.requeue_orphans() == 1
+    requeued = store.get(job["job_id"])
+    assert requeued["status"] == jobs.QUEUED
+    assert requeued["pid"] is None
+    assert requeued["progress"] == 0
+    assert requeued["stage"] is None
+
+
+def test_orphan_flagged_for_cancellation_is_cancelled(store):
+    job = store.create("train", {})
+    store.claim_next()
+    store.request_cancel(job["job_id"])
+    store.update(job["job_id"], pid=dead_pid())
+
+    assert store.requeue_orphans() == 0
+    assert store.get(job["job_id"])["status"] == jobs.CANCELLED
+
+
+def test_cancel_queued_job_immediately(store):
+    job = store.create("train", {})
+
+    assert store.request_cancel(job["job_id"])["status"] == jobs.CANCELLED
+    assert store.claim_next() is None
+
+
+def test_finish_keeps_first_final_status(store):
+    job = store.create("train", {})
+    store.claim_next()
+    store.finish(job["job_id"], jobs.COMPLETED, result={"model_id": "m"})
+    store.finish(job["job_id"], jobs.FAILED, error="late")
+
+    finished = store.get(job["job_id"])
+    assert finished["status"] == jobs.COMPLETED
+    assert finished["result"] == {"model_id": "m"}
+    assert finished["pid"] is None
+
+
+def test_one_pool_dispatches_per_store(store):
+    first = jobs.WorkerPool(store, {})
+    second = jobs.WorkerPool(jobs.JobStore(store.path), {})
+    try:
+        assert first._acquire_dispatch_lock()
+        assert not second._acquire_dispatch_lock()
+        assert first.is_dispatcher and not second.is_dispatcher
+
+        # The other pool takes over once the dispatcher stops
+        first.stop()
+        assert second._acquire_dispatch_lock()
+    finally:
+        first.stop()
+        second.stop()
+
+
+def test_new_dispatcher_requeues_orphans(store):
+    job = store.create("train", {})
+    store.claim_next()
+    store.update(job["job_id"], pid=dead_pid())
+
+    pool = jobs.WorkerPool(store, {})
+    try:
+        assert pool._acquire_dispatch_lock()
+    finally:
+        pool.stop()
+    assert store.get(job["job_id"])["status"] == jobs.QUEUED
+
+
+def sleep_job(request, ctx):
+    time.sleep(request["seconds"])
+
+
+def test_stop_terminates_and_requeues_running_jobs(store):
+    job = store.create("sleep", {"seconds": 60})
+    cancelled = store.create("sleep", {"seconds": 60})
+    pool = jobs.WorkerPool(store, {"sleep": (sleep_job, [])}, poll_interval=0.05)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 30
+        while len(pool.processes) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert store.get(job["job_id"])["status"] == jobs.RUNNING
+        store.request_cancel(cancelled["job_id"])
+    finally:
+        started = time.monotonic()
+        pool.stop()
+
+    assert time.monotonic() - started < 10
+    assert store.get(job["job_id"])["status"] == jobs.QUEUED
+    assert store.get(cancelled["job_id"])["status"] == jobs.CANCELLED
+    assert not pool.is_dispatcher
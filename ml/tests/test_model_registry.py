@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+pytest.importorskip("core.train")
+model_registry = pytest.importorskip("model_registry")
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    loads = []
+
+    def load_model_with_metadata(model_id):
+        loads.append(model_id)
+        return f"model-{model_id}", {"model_id": model_id, "loaded": True}
+
+    monkeypatch.setattr(model_registry, "load_model_with_metadata", load_model_with_metadata)
+    monkeypatch.setattr(model_registry, "list_models", lambda: [
+        {"model_id": "b", "metrics": {"accuracy": 0.6}},
+        {"model_id": "a", "metrics": {"accuracy": 0.5}}
+    ])
+    for model_id, accuracy in (("a", 0.5), ("b", 0.6)):
+        (tmp_path / model_id).mkdir()
+        (tmp_path / model_id / "metadata.json").write_text(json.dumps({
+            "model_id": model_id, "metrics": {"accuracy": accuracy}
+        }))
+    registry = model_registry.ModelRegistry(models_dir=str(tmp_path), max_models=2)
+    registry.loads = loads
+    return registry
+
+
+def test_metadata_is_read_without_loading(registry):
+    assert registry.get_metadata("a")["metrics"] == {"accuracy": 0.5}
+    assert registry.loads == []
+    assert registry.get_stats()["loaded"] == []
+
+
+def test_metadata_is_the_same_once_loaded(registry):
+    before = registry.get_metadata("a")
+    registry.acquire("a")
+    assert registry.get_metadata("a") == before
+
+
+def test_metadata_of_unknown_model(registry):
+    with pytest.raises(FileNotFoundError):
+        registry.get_metadata("missing")
+
+
+def test_failed_load_can_be_retried(registry, monkeypatch):
+    def failing_load(model_id):
+        raise OSError("truncated file")
+
+    original = model_registry.load_model_with_metadata
+    monkeypatch.setattr(model_registry, "load_model_with_metadata", failing_load)
+    with pytest.raises(OSError):
+        registry.acquire("a")
+    assert registry.loading == {}
+
+    monkeypatch.setattr(model_registry, "load_model_with_metadata", original)
+    with registry.use("a") as (model, _):
+        assert model == "model-a"
+
+
+def test_latest_model_is_first_in_index(registry):
+    assert registry.latest_model_id() == "b"
+
+
+def test_loaded_models_are_reused(registry):
+    with registry.use("a") as (model, _):
+        assert model == "model-a"
+    with registry.use("a"):
+        pass
+
+    assert registry.loads == ["a"]
+    stats = registry.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_least_recently_used_model_is_evicted(registry):
+    for model_id in ("a", "b", "a", "c"):
+        with registry.use(model_id):
+            pass
+
+    assert registry.get_stats()["loaded"] == ["a", "c"]
+
+
+def test_pinned_models_are_not_evicted(registry):
+    registry.acquire("a")
+    for model_id in ("b", "c"):
+        with registry.use(model_id):
+            pass
+    assert "a" in registry.get_stats()["loaded"]
+    assert registry.get_stats()["in_use"] == {"a": 1}
+
+    registry.release("a")
+    with registry.use("d"):
+        pass
+    assert "a" not in registry.get_stats()["loaded"]
+
+
+def test_swap_replaces_served_instance(registry):
+    with pytest.raises(KeyError):
+        registry.swap("a", "updated")
+
+    held, _ = registry.acquire("a")
+    registry.swap("a", "updated")
+    with registry.use("a") as (model, _):
+        assert model == "updated"
+    assert held == "model-a"
@@ -0,0 +1,138 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("core.train")
+online = pytest.importorskip("online")
+
+HORIZON = 2
+LOOKBACK = 3
+
+
+class FakeModel:
+    task = "classification"
+
+    def __init__(self):
+        self.seen = []
+
+    def supports_partial_fit(self):
+        return True
+
+    def partial_fit(self, X, y):
+        self.seen.extend(X.index)
+
+
+class FakeRegistry:
+    def __init__(self, model):
+        self.model = model
+
+    def acquire(self, model_id):
+        return self.model, {"dataset": {"target_horizon": HORIZON}, "metrics": {"accuracy": 0.6}}
+
+    def release(self, model_id):
+        pass
+
+    def swap(self, model_id, model):
+        self.model = model
+
+
+def fake_features(df, feature_config, horizon, task):
+    # An indicator that needs LOOKBACK candles of history
+    features = pd.DataFrame({"sma": df["close"].rolling(LOOKBACK + 1).mean()}, index=df.index)
+    features["target"] = (df["close"].shift(-horizon) > df["close"]).astype(float)
+    # Like labeling, drop the newest rows, which have no future to label them
+    return features.iloc[:-horizon]
+
+
+def candles(start, count):
+    return [
+        {"symbol": "BTC", "timestamp": 1704067200000 + i * 3600000, "close": float(i % 7)}
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def learner(monkeypatch):
+    calls = []
+
+    def features(df, *args):
+        calls.append(len(df))
+        return fake_features(df, *args)
+
+    monkeypatch.setattr(online, "build_features", features)
+    monkeypatch.setattr(online, "feature_columns", lambda model, df: ["sma"])
+    learner = online.OnlineLearner(
+        FakeRegistry(FakeModel()), "m1", HORIZON, "classification", lookback=LOOKBACK
+    )
+    learner.feature_calls = calls
+    return learner
+
+
+def test_ingest_featurizes_only_new_rows_and_their_lookback(learner):
+    assert learner.ingest(candles(0, 20)) == 20 - HORIZON - LOOKBACK
+    for start in range(20, 60, 5):
+        assert learner.ingest(candles(start, 5)) == 5
+        assert learner.feature_calls[-1] == LOOKBACK + 5 + HORIZON
+
+
+def test_incremental_samples_match_featurizing_everything(learner):
+    for start in range(0, 60, 4):
+        learner.ingest(candles(start, 4))
+    learned = pd.concat(learner.pending)
+
+    buffer = learner.buffers["BTC"]
+    expected = fake_features(buffer, {}, HORIZON, "classification").dropna()
+    pd.testing.assert_frame_equal(learned, expected)
+
+
+def test_ingest_of_old_candles_matures_nothing(learner):
+    learner.ingest(candles(0, 20))
+    assert learner.ingest(candles(5, 5)) == 0
+
+
+def test_checkpoint_is_saved_with_metadata(learner, monkeypatch):
+    saved = {}
+
+    def save_training_artifacts(model, training_info, model_id, dataset_info):
+        saved.update(model=model, info=training_info, model_id=model_id, dataset=dataset_info)
+        return model_id
+
+    monkeypatch.setattr(online, "save_training_artifacts", save_training_artifacts)
+    learner.ingest(candles(0, 20))
+    learner.update()
+    checkpoint_id = learner.checkpoint()
+
+    assert saved["model_id"] == checkpoint_id and checkpoint_id.startswith("m1_online_")
+    assert saved["model"] is learner.model
+    assert saved["dataset"] == {"target_horizon": HORIZON}
+    assert saved["info"]["metrics"] == {"accuracy": 0.6}
+    assert saved["info"]["online"]["updates"] == 1
+    assert saved["info"]["online"]["samples_learned"] == 20 - HORIZON - LOOKBACK
+    assert saved["info"]["online"]["source_model_id"] == "m1"
+    assert not learner.dirty
+
+
+def test_stop_waits_for_a_running_update(learner, monkeypatch):
+    checkpoints = []
+    monkeypatch.setattr(
+        online, "save_training_artifacts",
+        lambda model, info, model_id, dataset: checkpoints.append(info["online"]["updates"])
+    )
+    service = online.OnlineLearningService(learner.registry)
+    service.sessions[learner.session_id] = learner
+    learner.ingest(candles(0, 20))
+
+    async def run():
+        # As if the service's loop were in the middle of an update
+        await learner.session_lock.acquire()
+        stopping = asyncio.create_task(service.stop_session(learner.session_id))
+        await asyncio.sleep(0.01)
+        assert not stopping.done()
+        learner.update()
+        learner.session_lock.release()
+        return await stopping
+
+    status = asyncio.run(run())
+    assert checkpoints == [1]
+    assert status["updates"] == 1 and status["pending_samples"] == 0
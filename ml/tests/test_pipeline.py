@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("core.train")
+pipeline = pytest.importorskip("pipeline")
+
+
+class FakeModel:
+    def __init__(self, name, task, config):
+        self.name = name
+        self.config = config
+
+
+def fake_train_model(train_df, valid_df, model):
+    if model.config["depth"] > 3:
+        raise ValueError("too deep for this data")
+    # Splits are rebuilt from shared memory with their dtypes
+    assert valid_df["feature_a"].dtype == np.float64
+    # Shallower candidates score higher
+    return model, {"metrics": {"accuracy": 0.6 - 0.05 * model.config["depth"]}}
+
+
+class InlineExecutor(ThreadPoolExecutor):
+    """Runs candidates on threads, so the fakes above apply."""
+
+    def __init__(self, max_workers, mp_context=None):
+        super().__init__(max_workers)
+
+
+class FakeContext:
+    def __init__(self):
+        self.stages = []
+        self.progress = []
+
+    @contextmanager
+    def stage(self, name):
+        self.stages.append(name)
+        yield
+
+    def report(self, fraction):
+        self.progress.append(fraction)
+
+
+@pytest.fixture
+def features(monkeypatch):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "close": rng.normal(size=300).cumsum(),
+        "feature_a": rng.normal(size=300),
+        "symbol": "BTC",
+        "target": rng.integers(0, 2, 300)
+    }, index=pd.date_range("2024-01-01", periods=300, freq="h", name="timestamp"))
+
+    saved = []
+    monkeypatch.setattr(pipeline, "MLModel", FakeModel)
+    monkeypatch.setattr(pipeline, "train_model", fake_train_model)
+    monkeypatch.setattr(pipeline, "ProcessPoolExecutor", InlineExecutor)
+    monkeypatch.setattr(pipeline, "load_dataset_cached", lambda *args, **kwargs: (df, "abc"))
+    monkeypatch.setattr(pipeline, "build_features_cached", lambda df, *args: df)
+    monkeypatch.setattr(
+        pipeline, "save_training_artifacts",
+        lambda model, info, model_id, dataset: saved.append(model_id) or f"/models/{model_id}"
+    )
+    return saved
+
+
+def request(**overrides):
+    request = {
+        "dataset": "org/candles",
+        "symbols": ["BTC"],
+        "timeframe": "1h",
+        "task": "classification",
+        "target_horizon": 1,
+        "max_workers": 2,
+        "candidates": [
+            {"model": "gbc", "model_config": {"depth": 2}},
+            {"model": "gbc", "model_config": {"depth": 1}},
+            {"model": "rfc", "model_config": {"depth": 4}}
+        ]
+    }
+    request.update(overrides)
+    return request
+
+
+def test_candidates_are_ranked_and_the_best_is_saved(features):
+    ctx = FakeContext()
+    result = pipeline.run_multi_training(request(), ctx)
+
+    leaderboard = result["leaderboard"]
+    assert [entry["candidate"] for entry in leaderboard] == [1, 0, 2]
+    assert [entry["rank"] for entry in leaderboard] == [1, 2, 3]
+    assert leaderboard[0]["score"] > leaderboard[1]["score"]
+    assert leaderboard[2]["score"] is None and "too deep" in leaderboard[2]["error"]
+
+    assert result["rank_by"] == "accuracy"
+    assert result["best_model_id"] == leaderboard[0]["model_id"]
+    assert features == [result["best_model_id"]]
+    assert ctx.stages == ["load", "features", "split", "train", "save"]
+    assert ctx.progress[-1] == 1
+
+
+def test_every_scored_candidate_can_be_saved(features):
+    result = pipeline.run_multi_training(request(save_models="all"), FakeContext())
+
+    assert len(features) == 2
+    assert "model_id" not in result["leaderboard"][2]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("core.data")
+scoring = pytest.importorskip("scoring")
+
+
+class FakeClassifier:
+    task = "classification"
+    classes_ = np.array([0, 1])
+    feature_names_in_ = ["momentum"]
+
+    def predict_proba(self, X):
+        p = 1 / (1 + np.exp(-X["momentum"].to_numpy()))
+        return np.column_stack([1 - p, p])
+
+
+def fake_feature_matrix(df, feature_config):
+    # Needs two candles of history, like an indicator warming up
+    return pd.DataFrame({"momentum": df["close"].diff(2)}, index=df.index)
+
+
+@pytest.fixture(autouse=True)
+def features(monkeypatch):
+    monkeypatch.setattr(scoring, "build_feature_matrix", fake_feature_matrix)
+    monkeypatch.setattr(scoring, "feature_columns", lambda model, df: model.feature_names_in_)
+
+
+def candles():
+    times = pd.date_range("2024-01-01", periods=6, freq="h")
+    rows = []
+    for symbol, step in (("BTC", 1.0), ("ETH", -1.0)):
+        rows += [
+            {"symbol": symbol, "timestamp": t.isoformat(), "close": 100 + step * i}
+            for i, t in enumerate(times)
+        ]
+    return rows[::-1]
+
+
+def test_latest_only_scores_the_newest_candle_of_each_symbol():
+    scores = scoring.score_candles(FakeClassifier(), candles(), {}, latest_only=True)
+
+    assert list(scores["symbol"]) == ["BTC", "ETH"]
+    assert (scores["timestamp"] == pd.Timestamp("2024-01-01 05:00")).all()
+    assert list(scores["prediction"]) == [1, 0]
+    assert scores["proba_1"].iloc[0] > 0.5
+
+
+def test_warm_up_rows_are_skipped_and_points_filter():
+    scores = scoring.score_candles(FakeClassifier(), candles(), {})
+    assert len(scores) == 8
+
+    points = pd.DataFrame({"symbol": ["ETH"], "timestamp": ["2024-01-01T03:00:00Z"]})
+    scores = scoring.score_candles(FakeClassifier(), candles(), {}, points=points)
+    assert scores[["symbol", "timestamp"]].values.tolist() == [["ETH", pd.Timestamp("2024-01-01 03:00")]]
+
+
+def test_arrow_stream_round_trip():
+    df = pd.DataFrame({"symbol": ["BTC"], "close": [1.5]})
+    pd.testing.assert_frame_equal(scoring.read_arrow_stream(scoring.write_arrow_stream(df)), df)
+
+
+def test_candles_need_symbol_and_timestamp():
+    with pytest.raises(ValueError):
+        scoring.candles_frame([{"close": 1.0}])
@@ -0,0 +1,86 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared_frame import SharedFrame, attach_frame, detach
+
+
+def sample_frame():
+    return pd.DataFrame({
+        "close": np.linspace(1.0, 2.0, 5),
+        "ret": np.arange(5, dtype=np.float32),
+        "symbol": ["BTC", "ETH", "BTC", None, "SOL"],
+        "side": pd.Categorical(["buy", "sell", "buy", "buy", "sell"]),
+        "timestamp": pd.date_range("2024-01-01", periods=5, freq="h")
+    }, index=pd.RangeIndex(10, 15))
+
+
+def column_sums(spec):
+    df, segments = attach_frame(spec)
+    try:
+        return float(df["close"].sum()), df["symbol"].value_counts().to_dict()
+    finally:
+        del df
+        detach(segments)
+
+
+def test_attached_frame_matches_original():
+    original = sample_frame()
+    shared = SharedFrame(original)
+    try:
+        df, segments = attach_frame(shared.spec)
+        expected = original.assign(symbol=original["symbol"].astype("category"))
+        pd.testing.assert_frame_equal(df, expected)
+        del df
+        detach(segments)
+    finally:
+        shared.release()
+
+
+def test_numeric_columns_are_views_on_shared_memory():
+    shared = SharedFrame(sample_frame())
+    try:
+        first, first_segments = attach_frame(shared.spec)
+        second, second_segments = attach_frame(shared.spec)
+        first["close"].to_numpy()[0] = 42.0
+        assert second["close"].iloc[0] == 42.0
+        del first, second
+        detach(first_segments + second_segments)
+    finally:
+        shared.release()
+
+
+def test_worker_process_reads_shared_frame():
+    shared = SharedFrame(sample_frame())
+    try:
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            total, symbols = pool.apply(column_sums, (shared.spec,))
+    finally:
+        shared.release()
+
+    assert total == pytest.approx(7.5)
+    assert symbols == {"BTC": 2, "ETH": 1, "SOL": 1}
+
+
+def test_release_frees_segments():
+    shared = SharedFrame(sample_frame())
+    names = [column["segment"] for column in shared.spec["columns"]]
+    shared.release()
+
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_empty_frame_round_trips():
+    shared = SharedFrame(pd.DataFrame({"close": np.array([], dtype=np.float64)}))
+    try:
+        df, segments = attach_frame(shared.spec)
+        assert df.empty and list(df.columns) == ["close"]
+        del df
+        detach(segments)
+    finally:
+        shared.release()
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from tuning import (
+    best_trial,
+    hyperband_brackets,
+    rank_trials,
+    resource_amount,
+    sample_config,
+    successive_halving_rungs,
+    validate_budget,
+    validate_space
+)
+
+
+def test_successive_halving_keeps_a_third_on_three_times_the_budget():
+    rungs = successive_halving_rungs(27, 1 / 27, 1.0, 3)
+    assert [n for n, _ in rungs] == [27, 9, 3, 1]
+    assert [r for _, r in rungs] == pytest.approx([1 / 27, 1 / 9, 1 / 3, 1.0])
+
+
+def test_successive_halving_stops_at_the_max_resource():
+    rungs = successive_halving_rungs(81, 1, 9, 3)
+    assert rungs == [(81, 1), (27, 3), (9, 9)]
+
+
+def test_successive_halving_stops_at_one_config():
+    rungs = successive_halving_rungs(4, 1, 1000, 2)
+    assert [n for n, _ in rungs] == [4, 2, 1]
+
+
+def test_hyperband_brackets():
+    brackets = hyperband_brackets(1 / 27, 1.0, 3)
+    assert [[n for n, _ in rungs] for rungs in brackets] == [
+        [27, 9, 3, 1], [12, 4, 1], [6, 2], [4]
+    ]
+    for rungs in brackets:
+        assert rungs[-1][1] == pytest.approx(1.0)
+    assert brackets[0][0][1] == pytest.approx(1 / 27)
+
+
+def test_hyperband_on_estimators_gives_whole_budgets():
+    brackets = hyperband_brackets(10, 270, 3)
+    amounts = {resource_amount("n_estimators", r) for rungs in brackets for _, r in rungs}
+    assert amounts == {10, 30, 90, 270}
+
+
+def test_resource_amount():
+    assert resource_amount("n_estimators", 0.2) == 1
+    assert resource_amount("n_estimators", 3.2) == 4
+    assert resource_amount("n_estimators", 270.00000000001) == 270
+    assert resource_amount("samples", 0.25) == 0.25
+
+
+@pytest.mark.parametrize("model, resource, low, high, eta", [
+    ("sgdc", "n_estimators", 10, 100, 3),
+    ("sgdr", "n_estimators", 10, 100, 3),
+    ("gbc", "n_estimators", 0.5, 100, 3),
+    ("gbc", "n_estimators", 100, 10, 3),
+    ("gbc", "samples", 0.1, 2, 3),
+    ("gbc", "samples", 0, 1, 3),
+    ("gbc", "samples", 0.1, 1, 1),
+    ("gbc", "depth", 1, 2, 3)
+])
+def test_validate_budget_rejects(model, resource, low, high, eta):
+    with pytest.raises(ValueError):
+        validate_budget(model, resource, low, high, eta)
+
+
+def test_validate_budget_accepts():
+    validate_budget("rfc", "n_estimators", 10, 270, 3)
+    validate_budget("sgdc", "samples", 1 / 27, 1.0, 3)
+
+
+def test_validate_space():
+    validate_space({"alpha": {"low": 1e-5, "high": 1e-1, "log": True}, "loss": ["hinge"]})
+    for space in ({}, {"a": []}, {"a": {"values": []}}, {"a": {"low": 2, "high": 1}},
+                  {"a": {"low": 0, "high": 1, "log": True}}, {"a": 3}):
+        with pytest.raises(ValueError):
+            validate_space(space)
+
+
+def test_sample_config_types():
+    rng = random.Random(0)
+    space = {
+        "depth": {"low": 2, "high": 8},
+        "rate": {"low": 0.01, "high": 0.3, "log": True},
+        "loss": ["hinge", "log_loss"]
+    }
+    for _ in range(20):
+        config = sample_config(space, rng)
+        assert isinstance(config["depth"], int) and 2 <= config["depth"] <= 8
+        assert 0.01 <= config["rate"] <= 0.3
+        assert config["loss"] in space["loss"]
+
+
+def test_rank_and_best_trial():
+    trials = [
+        {"score": 0.6, "resource": 1.0},
+        {"score": None, "resource": 1.0},
+        {"score": 0.9, "resource": 0.5},
+        {"score": 0.7, "resource": 1.0}
+    ]
+    assert [t["score"] for t in rank_trials(trials, False)] == [0.9, 0.7, 0.6, None]
+    assert [t["score"] for t in rank_trials(trials, True)] == [0.6, 0.7, 0.9, None]
+    # The best trial comes from the largest budget reached
+    assert best_trial(trials, False)["score"] == 0.7
+    assert best_trial([{"score": None, "resource": 1.0}], False) is None
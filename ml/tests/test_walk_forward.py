@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("core.backtest")
+core_model = pytest.importorskip("core.model")
+
+from walk_forward import ParallelWalkForward, _chain_equity, equity_metrics, merge_folds
+
+SUMMARY_FIELDS = ("total_return_pct", "sharpe_ratio", "win_rate", "max_drawdown_pct", "total_trades")
+
+
+def hourly_frame(days: int, seed: int = 0) -> pd.DataFrame:
+    """A featurized-looking hourly frame: random-walk OHLCV plus two features."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=days * 24, freq="h", name="timestamp")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+        "volume": rng.uniform(1, 10, len(index)),
+        "feature_a": rng.normal(size=len(index)), "feature_b": rng.normal(size=len(index)),
+        "target": (rng.uniform(size=len(index)) > 0.5).astype(int)
+    }, index=index)
+
+
+def test_fold_rows_reach_the_first_bar_after_each_window():
+    df = hourly_frame(12)
+    backtest = ParallelWalkForward(core_model.MLModel("gbc", "classification", {}), 5, 2)
+    folds = backtest.fold_rows(df)
+
+    assert len(folds) == 3
+    for index, rows in enumerate(folds):
+        times = df.index[rows]
+        assert times[0] == df.index[0] + pd.Timedelta(days=2 * index)
+        assert times[-1] - times[0] == pd.Timedelta(days=7)
+
+
+def test_parallel_matches_sequential():
+    df = hourly_frame(40)
+    model = core_model.MLModel("gbc", "classification", {})
+
+    sequential = ParallelWalkForward(model, 10, 5, max_workers=1).run(df)
+    parallel_backtest = ParallelWalkForward(model, 10, 5, max_workers=2)
+    parallel = parallel_backtest.run(df)
+
+    assert parallel_backtest.sequential is None
+    assert parallel["num_folds"] == 5
+    for field in SUMMARY_FIELDS:
+        assert parallel[field] == pytest.approx(sequential[field]), field
+
+
+def test_metrics_come_from_the_chained_curve():
+    folds = [
+        {"equity_curve": np.array([100.0, 110.0, 121.0]), "trades": [{"id": 1}],
+         "total_trades": 2, "win_rate": 1.0},
+        {"equity_curve": np.array([100.0, 50.0, 60.0]), "trades": [{"id": 2}],
+         "total_trades": 2, "win_rate": 0.5}
+    ]
+    merged = merge_folds(folds, bars_per_year=365)
+
+    assert merged["equity_curve"] == pytest.approx([100, 110, 121, 60.5, 72.6])
+    assert [trade["id"] for trade in merged["trades"]] == [1, 2]
+
+    results = merged["results"]
+    assert results["total_return_pct"] == pytest.approx(-27.4)
+    assert results["max_drawdown_pct"] == pytest.approx(-50.0)
+    assert results["total_trades"] == 4
+    assert results["win_rate"] == pytest.approx(0.75)
+    assert results == {**results, **equity_metrics(merged["equity_curve"], 4, 3, 365)}
+    assert [fold["total_return_pct"] for fold in results["folds"]] == pytest.approx([21.0, -40.0])
+
+
+def test_chain_equity_rebases_each_fold():
+    chained = _chain_equity([np.array([1.0, 2.0]), np.array([10.0, 5.0]), np.array([3.0, 6.0])])
+    assert chained == pytest.approx([1.0, 2.0, 1.0, 2.0])
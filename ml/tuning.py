@@ -0,0 +1,136 @@
+"""Search spaces and successive halving / Hyperband schedules for tuning."""
+
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+# Budgets a trial can be given: the most recent fraction of the training
+# rows, or the number of estimators of an ensemble
+RESOURCES = ("samples", "n_estimators")
+
+# Models a resource applies to, when not every model has it
+RESOURCE_MODELS = {"n_estimators": ("gbc", "rfc", "gbr")}
+
+# (configurations, resource per configuration) of each rung
+Rungs = List[Tuple[int, float]]
+
+
+def validate_space(space: Dict[str, Any]):
+    """Raise ValueError unless every parameter has a usable definition."""
+    if not space:
+        raise ValueError("The search space is empty")
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            if not spec:
+                raise ValueError(f"No values to choose from for {name}")
+        elif isinstance(spec, dict) and "values" in spec:
+            if not spec["values"]:
+                raise ValueError(f"No values to choose from for {name}")
+        elif isinstance(spec, dict) and "low" in spec and "high" in spec:
+            if spec["low"] > spec["high"]:
+                raise ValueError(f"low is above high for {name}")
+            if spec.get("log") and spec["low"] <= 0:
+                raise ValueError(f"A log scale needs a positive low for {name}")
+        else:
+            raise ValueError(f"{name} needs a list of values or low/high bounds")
+
+
+def validate_budget(model: str, resource: str, min_resource: float, max_resource: float, eta: int):
+    """Raise ValueError unless ``model`` can be tuned on this resource range."""
+    if resource not in RESOURCES:
+        raise ValueError(f"Unknown resource {resource}")
+    if model not in RESOURCE_MODELS.get(resource, (model,)):
+        raise ValueError(f"{model} has no {resource} to budget")
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    if not 0 < min_resource <= max_resource:
+        raise ValueError("Need 0 < min_resource <= max_resource")
+    if resource == "samples" and max_resource > 1:
+        raise ValueError("The samples resource is a fraction of at most 1")
+    if resource == "n_estimators" and min_resource < 1:
+        raise ValueError("The n_estimators resource needs min_resource >= 1")
+
+
+def resource_amount(resource: str, amount: float) -> float:
+    """A rung's budget as given to a model: estimators are rounded up to a whole number."""
+    if resource == "n_estimators":
+        # Rungs multiply by eta, so allow for float error before rounding up
+        return max(int(math.ceil(amount - 1e-9)), 1)
+    return amount
+
+
+def sample_config(space: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """
+    Draw one configuration from a search space.
+
+    Each parameter is a list of values, ``{"values": [...]}``, or a range
+    ``{"low": ..., "high": ..., "log": bool, "type": "int" | "float"}``;
+    ranges are integer when both bounds are integers unless ``type`` says
+    otherwise.
+    """
+    config = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            config[name] = rng.choice(spec)
+        elif "values" in spec:
+            config[name] = rng.choice(spec["values"])
+        else:
+            low, high = spec["low"], spec["high"]
+            is_int = spec.get("type", "int" if isinstance(low, int) and isinstance(high, int) else "float") == "int"
+            if spec.get("log"):
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            else:
+                value = rng.uniform(low, high)
+            config[name] = int(round(value)) if is_int else value
+    return config
+
+
+def successive_halving_rungs(n_configs: int, min_resource: float, max_resource: float, eta: int = 3) -> Rungs:
+    """
+    Rungs of one successive halving run: every rung keeps the best
+    ``1/eta`` of the configurations and gives them ``eta`` times the
+    resource, until one configuration is left or the resource reaches
+    ``max_resource``.
+    """
+    rungs = []
+    n = n_configs
+    resource = min_resource
+    while True:
+        rungs.append((n, min(resource, max_resource)))
+        if n <= 1 or resource >= max_resource:
+            return rungs
+        n = max(n // eta, 1)
+        resource *= eta
+
+
+def hyperband_brackets(min_resource: float, max_resource: float, eta: int = 3) -> List[Rungs]:
+    """
+    Brackets of Hyperband: successive halving runs trading many
+    configurations on a small resource against few on the full resource,
+    from the most aggressive bracket to plain full-resource evaluation.
+    """
+    s_max = int(math.floor(math.log(max_resource / min_resource, eta) + 1e-9))
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        resource = max_resource * eta ** -s
+        rungs = []
+        for i in range(s + 1):
+            rungs.append((max(int(n * eta ** -i), 1), resource * eta ** i))
+        brackets.append(rungs)
+    return brackets
+
+
+def rank_trials(trials: List[Dict[str, Any]], lower_is_better: bool) -> List[Dict[str, Any]]:
+    """Trials best first; failed trials and ones without a score rank last."""
+    sign = 1 if lower_is_better else -1
+    return sorted(trials, key=lambda t: (t.get("score") is None, sign * (t.get("score") or 0)))
+
+
+def best_trial(trials: List[Dict[str, Any]], lower_is_better: bool) -> Optional[Dict[str, Any]]:
+    """Best scored trial among those run on the largest resource any trial reached."""
+    scored = [trial for trial in trials if trial.get("score") is not None]
+    if not scored:
+        return None
+    top = max(trial["resource"] for trial in scored)
+    return rank_trials([trial for trial in scored if trial["resource"] == top], lower_is_better)[0]
@@ -0,0 +1,256 @@
+"""Walk-forward backtests with folds run in parallel worker processes."""
+
+import json
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from core.backtest import WalkForwardBacktest
+
+from instrumentation import measure, record_step
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "..", "artifacts")
+
+
+def _timestamps(df: pd.DataFrame) -> pd.Series:
+    if isinstance(df.index, pd.DatetimeIndex):
+        times = pd.Series(df.index, index=df.index)
+    else:
+        times = pd.to_datetime(df["timestamp"])
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert(None)
+    return times
+
+
+def _run_fold(
+    path: str,
+    rows: np.ndarray,
+    model,
+    backtest_kwargs: Dict[str, Any],
+    run_kwargs: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Backtest one train/test window read from the memory-mapped dataset.
+
+    Returns:
+        (fold, metrics): the window's equity curve, trades and trade
+        statistics, and the worker's ``measure`` record
+    """
+    with measure("fold") as metrics:
+        fold_df = feather.read_table(path, memory_map=True).take(rows).to_pandas()
+        backtest = WalkForwardBacktest(model=model, online_learning=False, **backtest_kwargs)
+        results = backtest.run(fold_df, **run_kwargs)
+        fold = {
+            "equity_curve": np.asarray(backtest.equity_curve, dtype=float).ravel(),
+            "trades": list(backtest.trades),
+            "total_trades": results["total_trades"],
+            "win_rate": results["win_rate"],
+            "feature_importance": results.get("feature_importance")
+        }
+    return fold, metrics
+
+
+def _chain_equity(curves: List[np.ndarray]) -> np.ndarray:
+    """Join per-fold equity curves, rebasing each onto the previous fold's end."""
+    equity = curves[0]
+    for segment in curves[1:]:
+        scale = equity[-1] / segment[0] if segment[0] else 1.0
+        equity = np.concatenate([equity, segment[1:] * scale])
+    return equity
+
+
+def periods_per_year(df: pd.DataFrame) -> float:
+    """Bars per year at the dataset's typical bar spacing."""
+    times = np.unique(_timestamps(df).to_numpy())
+    if len(times) < 2:
+        return 1.0
+    spacing = np.median(np.diff(times)) / np.timedelta64(1, "s")
+    return 365 * 24 * 3600 / spacing
+
+
+def equity_metrics(equity: np.ndarray, total_trades: int, wins: float, bars_per_year: float) -> Dict[str, Any]:
+    """Report metrics of one equity curve, as the sequential backtest reports them."""
+    returns = np.diff(equity) / equity[:-1]
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    peaks = np.maximum.accumulate(equity)
+    return {
+        "total_return_pct": float((equity[-1] / equity[0] - 1) * 100),
+        "sharpe_ratio": float(returns.mean() / std * math.sqrt(bars_per_year)) if std > 0 else 0.0,
+        "win_rate": wins / total_trades if total_trades else 0.0,
+        "max_drawdown_pct": float(((equity - peaks) / peaks).min() * 100),
+        "total_trades": int(total_trades)
+    }
+
+
+def merge_folds(folds: List[Dict[str, Any]], bars_per_year: float) -> Dict[str, Any]:
+    """
+    Merge fold outputs, in fold order, into one walk-forward result.
+
+    Metrics are computed once over the chained equity curve, as if the
+    folds had run back to back; win rates are pooled over every trade.
+
+    Returns:
+        The result in the schema of the sequential backtest, plus the
+        chained ``equity_curve`` and the concatenated ``trades``
+    """
+    per_fold = []
+    total_trades = 0
+    wins = 0.0
+    for index, fold in enumerate(folds):
+        fold_wins = fold["win_rate"] * fold["total_trades"]
+        total_trades += fold["total_trades"]
+        wins += fold_wins
+        per_fold.append({
+            "fold": index,
+            **equity_metrics(fold["equity_curve"], fold["total_trades"], fold_wins, bars_per_year)
+        })
+
+    equity = _chain_equity([fold["equity_curve"] for fold in folds])
+    results = equity_metrics(equity, total_trades, round(wins), bars_per_year)
+    results.update(num_folds=len(folds), folds=per_fold)
+    return {
+        "results": results,
+        "equity_curve": equity,
+        "trades": [trade for fold in folds for trade in fold["trades"]]
+    }
+
+
+class ParallelWalkForward:
+    """
+    Drop-in replacement for ``WalkForwardBacktest`` that runs folds in
+    parallel.
+
+    Without online learning every train/test window is independent: the
+    dataset is written once to an uncompressed Feather file, each worker
+    memory-maps it and backtests the rows of one window (train window
+    followed by one test window), and the folds' equity curves and trades
+    are merged in order. Results and artifacts have the same layout as the
+    sequential run. With online learning the model carries state from fold
+    to fold, so the backtest runs sequentially in ``WalkForwardBacktest``.
+    """
+
+    def __init__(
+        self,
+        model,
+        train_window_days: int,
+        test_window_days: int,
+        online_learning: bool = False,
+        fees_bps: float = 5.0,
+        slippage_bps: float = 5.0,
+        max_workers: Optional[int] = None
+    ):
+        self.model = model
+        self.train_window_days = train_window_days
+        self.test_window_days = test_window_days
+        self.online_learning = online_learning
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.backtest_kwargs = {
+            "train_window_days": train_window_days,
+            "test_window_days": test_window_days,
+            "fees_bps": fees_bps,
+            "slippage_bps": slippage_bps
+        }
+        self.sequential: Optional[WalkForwardBacktest] = None
+        self.results: Optional[Dict[str, Any]] = None
+        self.equity_curve: Optional[np.ndarray] = None
+        self.trades: List[Dict[str, Any]] = []
+        self.feature_importance: Optional[Dict[str, Any]] = None
+
+    def fold_rows(self, df: pd.DataFrame) -> List[np.ndarray]:
+        """
+        Row positions of each fold's train and test window, in time order.
+
+        ``WalkForwardBacktest`` only runs a window that ends at or before
+        the last timestamp it is given, so each fold also includes the
+        first bar at or after its window's end.
+        """
+        times = _timestamps(df).to_numpy()
+        train = np.timedelta64(timedelta(days=self.train_window_days))
+        test = np.timedelta64(timedelta(days=self.test_window_days))
+        bar_times = np.unique(times)
+
+        folds = []
+        start = times.min()
+        end = times.max()
+        while start + train + test <= end:
+            last = bar_times[np.searchsorted(bar_times, start + train + test)]
+            mask = (times >= start) & (times <= last)
+            folds.append(np.flatnonzero(mask))
+            start = start + test
+        return folds
+
+    def run(self, df: pd.DataFrame, **run_kwargs) -> Dict[str, Any]:
+        """Run the backtest; keyword arguments go to ``WalkForwardBacktest.run``."""
+        folds = [] if self.online_learning else self.fold_rows(df)
+        if self.online_learning or len(folds) < 2 or self.max_workers == 1:
+            self.sequential = WalkForwardBacktest(
+                model=self.model, online_learning=self.online_learning, **self.backtest_kwargs
+            )
+            self.results = self.sequential.run(df, **run_kwargs)
+            return self.results
+
+        tmp_dir = tempfile.mkdtemp(prefix="walk_forward_")
+        try:
+            path = os.path.join(tmp_dir, "dataset.feather")
+            feather.write_feather(df, path, compression="uncompressed")
+
+            with ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(folds)),
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                # map() yields results in submission order, i.e. fold order
+                fold_outputs = list(executor.map(
+                    _run_fold,
+                    [path] * len(folds),
+                    folds,
+                    [self.model] * len(folds),
+                    [self.backtest_kwargs] * len(folds),
+                    [run_kwargs] * len(folds)
+                ))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        fold_results = []
+        for index, (fold, metrics) in enumerate(fold_outputs):
+            metrics.update(name=f"fold_{index}", rows=len(folds[index]))
+            record_step(metrics)
+            fold_results.append(fold)
+
+        logger.info(f"Ran {len(folds)} walk-forward folds on {self.max_workers} workers")
+        merged = merge_folds(fold_results, periods_per_year(df))
+        self.equity_curve = merged["equity_curve"]
+        self.trades = merged["trades"]
+        # The last fold's model is the one a sequential run ends with
+        self.feature_importance = fold_results[-1]["feature_importance"]
+        self.results = merged["results"]
+        return self.results
+
+    def save_artifacts(self, run_id: str) -> str:
+        """Save run artifacts, laid out as the sequential run saves them, and return their directory."""
+        if self.sequential is not None:
+            return self.sequential.save_artifacts(run_id)
+
+        artifact_dir = os.path.join(ARTIFACTS_DIR, run_id)
+        os.makedirs(artifact_dir, exist_ok=True)
+
+        pd.DataFrame({"equity": self.equity_curve}).to_csv(
+            os.path.join(artifact_dir, "equity_curve.csv"), index_label="step"
+        )
+        pd.DataFrame(self.trades).to_csv(os.path.join(artifact_dir, "trades.csv"), index=False)
+        if self.feature_importance is not None:
+            with open(os.path.join(artifact_dir, "feature_importance.json"), "w") as f:
+                json.dump(self.feature_importance, f, indent=2, default=str)
+
+        return artifact_dir
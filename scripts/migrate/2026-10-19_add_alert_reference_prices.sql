@@ -0,0 +1,11 @@
+-- scripts/migrate/2026-10-19_add_alert_reference_prices.sql
+-- Idempotent migration for the alert engine's price_change reference prices
+-- Safe to run multiple times
+
+-- One row per price_change alert, written once by the active alert engine
+-- worker with the first price it saw after the alert was created.
+-- Read back with the active alerts whenever the engine reloads its index.
+CREATE TABLE IF NOT EXISTS alert_reference_prices (
+  alert_id INTEGER PRIMARY KEY REFERENCES alerts(id) ON DELETE CASCADE,
+  reference_price DOUBLE PRECISION NOT NULL
+);